@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Request
 from modules.Auth.auth_router import auth_router
 from modules.Seller.seller_router import seller_router
 from modules.Buyer.buyer_router import buyer_router
@@ -6,6 +7,17 @@ from modules.RegisteredUser.registered_user_router import registered_user_router
 from modules.Guest.guest_router import guest_router
 from bulk.bulk_router import bulk_router
 from fastapi.middleware.cors import CORSMiddleware
+from setup.mongo_setup.mongo_indexes import ensure_mongo_indexes
+from setup.neo4j_setup.neo4j_indexes import ensure_neo4j_indexes
+from entities.MongoDB.PropertyOnSale.random_property_pool import random_property_pool
+from entities.Redis.ReservationJobs.reservation_jobs_worker import reservation_jobs_worker
+from config.config import settings
+from setup.load_monitor.load_monitor import load_monitor
+from modules.Auth.helpers.password_hasher import password_hasher
+from entities.MongoDB.user_profile_cache import buyer_profile_cache, seller_profile_cache
+import logging
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="HomeXplore API",
@@ -28,6 +40,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def count_in_flight_requests(request: Request, call_next):
+    # The requests being served are part of the load signal of the deferred jobs
+    load_monitor.request_started()
+    try:
+        return await call_next(request)
+    finally:
+        load_monitor.request_finished()
+
 app.include_router(guest_router)
 app.include_router(auth_router)
 app.include_router(registered_user_router)
@@ -36,6 +57,77 @@ app.include_router(seller_router)
 app.include_router(bulk_router)
 
 
+@app.on_event("startup")
+def create_indexes():
+    # Index creation is idempotent, a failure must not prevent the API from starting
+    try:
+        ensure_mongo_indexes()
+    except Exception as e:
+        logger.error("Error ensuring MongoDB indexes: %s", e)
+    try:
+        ensure_neo4j_indexes()
+    except Exception as e:
+        logger.error("Error ensuring Neo4j indexes: %s", e)
+
+
+@app.on_event("startup")
+def fill_random_property_pool():
+    # Warm the landing page pool so that the first requests do not hit MongoDB
+    if random_property_pool.refresh() == 500:
+        logger.error("Error filling the random property pool.")
+    random_property_pool.start()
+
+
+@app.on_event("shutdown")
+def stop_random_property_pool():
+    random_property_pool.stop()
+
+
+@app.on_event("startup")
+async def start_load_monitor():
+    load_monitor.start()
+    # The probe measures the lag of the loop serving the requests
+    app.state.event_loop_probe = asyncio.create_task(load_monitor.probe_event_loop())
+
+
+@app.on_event("shutdown")
+async def stop_load_monitor():
+    app.state.event_loop_probe.cancel()
+    load_monitor.stop()
+
+
+@app.on_event("startup")
+def start_reservation_jobs_worker():
+    # The deferred reservation jobs are in Redis, a deployment can run them with worker.py instead
+    if settings.reservation_worker_embedded:
+        reservation_jobs_worker.start()
+
+
+@app.on_event("shutdown")
+def stop_reservation_jobs_worker():
+    reservation_jobs_worker.stop()
+
+
+@app.on_event("startup")
+def start_password_hasher():
+    password_hasher.start()
+
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.shutdown()
+
+
+@app.get("/metrics")
+def read_metrics():
+    # Queue depth and counters of the password hashing pool, and hit rates of the profile caches, of this process
+    return {
+        "password_hasher": password_hasher.metrics(),
+        "buyer_profile_cache": buyer_profile_cache.metrics(),
+        "seller_profile_cache": seller_profile_cache.metrics(),
+    }
+
+
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
\ No newline at end of file
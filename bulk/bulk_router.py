@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from bulk.neo4j import populate_neo4j_db, update_livability_scores, reset_neo4j_db
-from bulk.redis import populate_redis_db, reset_redis_db, verify_redis_data
-from bulk.mongodb import populate_mongodb, clear_mongodb, verify_mongodb_data
+from bulk.redis import populate_redis_db, reset_redis_db, verify_redis_data, migrate_reservations_seller_to_hash
+from bulk.mongodb import populate_mongodb, clear_mongodb, verify_mongodb_data, backfill_address_tokens, rebuild_analytics_rollups, migrate_sold_properties
+from setup.mongo_setup.mongo_indexes import ensure_mongo_indexes, get_mongo_index_report
+from setup.neo4j_setup.neo4j_indexes import ensure_neo4j_indexes
 import os
 
 bulk_router = APIRouter(prefix="/bulk", tags=["bulk"])
@@ -42,6 +44,17 @@ def update_score():
         raise HTTPException(status_code=500, detail=str(e))
     return {"message": "Livability scores updated successfully!"}
 
+@bulk_router.post("/neo4j/indexes")
+def create_neo4j_indexes():
+    """
+    This function creates the constraint and the indexes declared in the Neo4j schema registry, existing ones are left untouched.
+    """
+    try:
+        result = ensure_neo4j_indexes()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Indexes ensured.", "result": result}
+
 @bulk_router.delete("/neo4j")
 def delete_neo4j():
     """
@@ -110,6 +123,23 @@ def verify_redis():
         raise HTTPException(status_code=500, detail=str(e))
     return {"message": "Data verified successfully!"}
 
+@bulk_router.put("/redis/reservations_seller")
+def migrate_reservations_seller():
+    """
+    Converts the seller reservations stored as JSON lists into the hash layout used by ReservationsSellerDB.
+
+    Returns:
+        dict: A dictionary containing either a success message or an error.
+
+    Raises:
+        Exception: Propagates the exception as an error string if something goes wrong.
+    """
+    try:
+        converted = migrate_reservations_seller_to_hash()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": f"{converted} seller reservations converted successfully!"}
+
 @bulk_router.post("/mongodb")
 def populate_mongodb_data():
     """
@@ -141,4 +171,59 @@ def verify_mongodb():
         verify_mongodb_data()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return {"message": "Data verified successfully."}
\ No newline at end of file
+    return {"message": "Data verified successfully."}
+
+@bulk_router.post("/mongodb/indexes")
+def create_mongodb_indexes():
+    """
+    This function creates the indexes declared in the MongoDB index registry, existing indexes are left untouched.
+    """
+    try:
+        result = ensure_mongo_indexes()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Indexes ensured.", "result": result}
+
+@bulk_router.get("/mongodb/indexes")
+def get_mongodb_indexes():
+    """
+    This function reports the missing, unmanaged and unused indexes of the MongoDB collections.
+    """
+    try:
+        result = get_mongo_index_report()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Index report generated.", "result": result}
+
+@bulk_router.put("/mongodb/address_tokens")
+def update_address_tokens():
+    """
+    This function computes the address search tokens for the properties on sale loaded before they were introduced.
+    """
+    try:
+        updated = backfill_address_tokens()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": f"Address tokens computed for {updated} properties."}
+
+@bulk_router.put("/mongodb/analytics_rollups")
+def update_analytics_rollups():
+    """
+    This function rebuilds the analytics rollups of the properties on sale.
+    """
+    try:
+        rebuild_analytics_rollups()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Analytics rollups rebuilt successfully."}
+
+@bulk_router.put("/mongodb/sold_properties")
+def update_sold_properties():
+    """
+    This function moves the sold properties embedded in the sellers to the SoldProperty collection, keeping only the most recent ones embedded.
+    """
+    try:
+        copied = migrate_sold_properties()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": f"{copied} sold properties moved successfully."}
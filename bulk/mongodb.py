@@ -3,6 +3,13 @@ from datetime import datetime
 import json
 from bson import ObjectId
 from setup.mongo_setup.mongo_setup import get_default_mongo_db
+from setup.mongo_setup.mongo_indexes import ensure_mongo_indexes
+from entities.MongoDB.PropertyOnSale.property_on_sale import tokenize_address
+from entities.MongoDB.PropertyOnSale.db_property_on_sale_rollup import ROLLUP_COLLECTION, PropertyOnSaleRollupDB
+from entities.MongoDB.Seller.db_seller import SOLD_PROPERTY_COLLECTION, build_embedded_sold_properties_push
+from pymongo import UpdateOne
+from setup.redis_setup.redis_setup import unlink_redis_keys
+from entities.MongoDB.user_profile_cache import USER_PROFILE_KEY_PREFIX
 
 # Database and collection names
 BUYER_COLLECTION = "Buyer"
@@ -150,6 +157,10 @@ def populate_mongodb():
 
     # Convert date fields
     properties_records = [convert_date_fields(record, ['registration_date']) for record in properties_records]
+
+    # Add the tokens used by the address search
+    for record in properties_records:
+        record['address_tokens'] = tokenize_address(record.get('address'))
     
     for record in sellers_records:
         record = convert_nested_date_fields(record, 'sold_properties', ['registration_date', 'sell_date'])
@@ -160,8 +171,89 @@ def populate_mongodb():
     db[SELLER_COLLECTION].insert_many(sellers_records)
     db[PROPERTY_COLLECTION].insert_many(properties_records)
 
+    # Build the indexes once the data is loaded
+    ensure_mongo_indexes()
+    rebuild_analytics_rollups()
+    migrate_sold_properties()
+
     print("Data successfully inserted into MongoDB.")
 
+def rebuild_analytics_rollups():
+    """
+    Recomputes the analytics rollups from the properties on sale, e.g. after a bulk load or if the
+    incremental updates drifted.
+
+    Raises:
+        RuntimeError: If the rollups cannot be rebuilt.
+    """
+    if PropertyOnSaleRollupDB().rebuild() != 200:
+        raise RuntimeError("Error rebuilding the analytics rollups.")
+    print("Analytics rollups rebuilt successfully.")
+
+def migrate_sold_properties(batch_size: int = 1000):
+    """
+    Copies the sold properties embedded in the sellers into the SoldProperty collection, then trims
+    the embedded arrays to the most recent ones. The copy does not overwrite the sold properties
+    already in the collection, so the migration can be run again.
+
+    Args:
+        batch_size (int): Number of sellers migrated in a single bulk write.
+
+    Returns:
+        int: The number of sold properties copied.
+    """
+    db = get_default_mongo_db()
+
+    copied = 0
+    copies = []
+    trims = []
+
+    def flush():
+        nonlocal copied
+        # The embedded arrays are only trimmed once their properties are in the collection
+        if copies:
+            copied += db[SOLD_PROPERTY_COLLECTION].bulk_write(copies, ordered=False).upserted_count
+        if trims:
+            db[SELLER_COLLECTION].bulk_write(trims, ordered=False)
+
+    for seller in db[SELLER_COLLECTION].find({"sold_properties.0": {"$exists": True}}, {"sold_properties": 1}):
+        for sold_property in seller["sold_properties"]:
+            copies.append(UpdateOne({"_id": sold_property["_id"]}, {"$setOnInsert": {**sold_property, "seller_id": seller["_id"]}}, upsert=True))
+        trims.append(UpdateOne({"_id": seller["_id"]}, {"$push": build_embedded_sold_properties_push([])}))
+        if len(trims) == batch_size:
+            flush()
+            copies = []
+            trims = []
+    flush()
+
+    print(f"{copied} sold properties moved to the {SOLD_PROPERTY_COLLECTION} collection.")
+    return copied
+
+def backfill_address_tokens(batch_size: int = 1000):
+    """
+    Computes the address search tokens for the properties on sale that do not have them yet.
+
+    Args:
+        batch_size (int): Number of updates sent to MongoDB in a single bulk write.
+
+    Returns:
+        int: The number of updated properties.
+    """
+    db = get_default_mongo_db()
+
+    updated = 0
+    operations = []
+    for record in db[PROPERTY_COLLECTION].find({"address_tokens": {"$exists": False}}, {"address": 1}):
+        operations.append(UpdateOne({"_id": record["_id"]}, {"$set": {"address_tokens": tokenize_address(record.get("address"))}}))
+        if len(operations) == batch_size:
+            updated += db[PROPERTY_COLLECTION].bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += db[PROPERTY_COLLECTION].bulk_write(operations, ordered=False).modified_count
+
+    print(f"Address tokens computed for {updated} properties.")
+    return updated
+
 # Function to clear MongoDB collections
 def clear_mongodb():
     db = get_default_mongo_db()
@@ -169,6 +261,10 @@ def clear_mongodb():
     db[BUYER_COLLECTION].delete_many({})
     db[SELLER_COLLECTION].delete_many({})
     db[PROPERTY_COLLECTION].delete_many({})
+    db[ROLLUP_COLLECTION].delete_many({})
+    db[SOLD_PROPERTY_COLLECTION].delete_many({})
+    # The cached profiles refer to the removed users
+    unlink_redis_keys(USER_PROFILE_KEY_PREFIX + '*')
 
     print("All collections cleared successfully.")
 
@@ -1,29 +1,135 @@
 import pandas as pd
+import numpy as np
 from setup.neo4j_setup.neo4j_setup import get_neo4j_driver
+from setup.neo4j_setup.neo4j_indexes import ensure_neo4j_indexes
+from entities.Neo4J.PropertyOnSaleNeo4J.db_property_on_sale_neo4j import METERS_PER_DEGREE
+from entities.Neo4J.PropertyOnSaleNeo4J.livability_score import NEAR_DISTANCE_METERS, recompute_livability_scores
+from entities.Redis.MapResponseCache.db_map_response_cache import MAP_RESPONSE_KEY_PREFIX
+from setup.redis_setup.redis_setup import unlink_redis_keys
 import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Helper function to execute queries in Neo4j
+def clear_map_responses():
+    """
+    Drop all the cached map responses of the guest routes, after a bulk change of the graph.
+    """
+    unlink_redis_keys(MAP_RESPONSE_KEY_PREFIX + '*')
+
 def create_nodes(tx, query, parameters):
     tx.run(query, parameters)
 
-def parse_coordinates(latitude: str, longitude: str) -> dict:
+# Rows written per UNWIND transaction by the node loaders
+NODE_BATCH_SIZE = 1000
+
+def write_rows_in_batches(session, query: str, rows: list, label: str, batch_size: int = NODE_BATCH_SIZE):
     """
-    Parse latitude and longitude strings into a dictionary.
-    
+    Write rows with UNWIND $rows transactions of batch_size rows, printing the throughput.
+
     Args:
-        latitude (str): The latitude string
-        longitude (str): The longitude string
-    
-    Returns:
-        dict: A dictionary with 'latitude' and 'longitude' keys as floats.
+        session: The Neo4j session.
+        query (str): The UNWIND $rows Cypher query.
+        rows (list): The query parameters, one dictionary per row.
+        label (str): The name of the nodes, used in the progress messages.
+        batch_size (int): The number of rows per transaction (default is NODE_BATCH_SIZE).
+    """
+    start_time = time.perf_counter()
+    for start in range(0, len(rows), batch_size):
+        session.write_transaction(create_nodes, query, {"rows": rows[start:start + batch_size]})
+        written = min(start + batch_size, len(rows))
+        elapsed = time.perf_counter() - start_time
+        print(f"{label}: {written}/{len(rows)} rows written ({written / max(elapsed, 1e-9):.0f} rows/s)")
+
+def load_cities_neighbourhoods_and_properties(cities_rows: list, neighbourhoods_rows: list, properties_rows: list, batch_size: int):
+    """
+    Load City, Neighbourhood and PropertyOnSale nodes, in this order since each label is linked to the previous one.
+
+    Args:
+        cities_rows (list): The parameters of the City nodes.
+        neighbourhoods_rows (list): The parameters of the Neighbourhood nodes.
+        properties_rows (list): The parameters of the PropertyOnSale nodes.
+        batch_size (int): The number of rows per transaction.
     """
-    return {"latitude": float(latitude), "longitude": float(longitude)}
+    neo4j_driver = get_neo4j_driver()
+    with neo4j_driver.session() as session:
+        # Create City nodes
+        write_rows_in_batches(
+            session,
+            """
+            UNWIND $rows AS row
+            CREATE (c:City {
+                name: row.name,
+                coordinates: point({latitude: row.latitude, longitude: row.longitude}),
+                safety_index: row.safety_index,
+                health_care_index: row.health_care_index,
+                cost_of_living_index: row.cost_of_living_index,
+                pollution_index: row.pollution_index
+            })
+            """,
+            cities_rows, "City", batch_size
+        )
+        # Create Neighbourhood nodes and link them to the corresponding City
+        write_rows_in_batches(
+            session,
+            """
+            UNWIND $rows AS row
+            MATCH (c:City {name: row.city_name})
+            CREATE (n:Neighbourhood {
+                name: row.name,
+                coordinates: point({latitude: row.latitude, longitude: row.longitude})
+            })-[:BELONGS_TO_CITY]->(c)
+            """,
+            neighbourhoods_rows, "Neighbourhood", batch_size
+        )
+        # Create Property nodes and link them to the corresponding Neighbourhood
+        write_rows_in_batches(
+            session,
+            """
+            UNWIND $rows AS row
+            MATCH (n:Neighbourhood {name: row.neighbourhood_name})
+            MERGE (p:PropertyOnSale { property_on_sale_id: row.property_on_sale_id })
+            ON CREATE SET p.coordinates = point({latitude: row.latitude, longitude: row.longitude}),
+                        p.price = row.price,
+                        p.type = row.type,
+                        p.thumbnail = row.thumbnail
+            CREATE (p)-[:LOCATED_IN_NEIGHBOURHOOD]->(n)
+            """,
+            properties_rows, "PropertyOnSale", batch_size
+        )
+
+def load_pois(pois_rows: list, batch_size: int):
+    """
+    Load POI nodes, which are not linked to the other labels on creation.
 
-def populate_neo4j_db():
+    Args:
+        pois_rows (list): The parameters of the POI nodes.
+        batch_size (int): The number of rows per transaction.
+    """
+    neo4j_driver = get_neo4j_driver()
+    with neo4j_driver.session() as session:
+        write_rows_in_batches(
+            session,
+            """
+            UNWIND $rows AS row
+            CREATE (poi:POI {
+                name: row.name,
+                type: row.type,
+                coordinates: point({latitude: row.latitude, longitude: row.longitude})
+            })
+            """,
+            pois_rows, "POI", batch_size
+        )
+
+def populate_neo4j_db(batch_size: int = NODE_BATCH_SIZE, parallel: bool = True):
     """
     Populate the Neo4j database with the data from the CSV files.
     This function creates nodes for cities, neighbourhoods, properties, and POIs.
     It also establishes relationships between the nodes based on proximity.
+
+    Args:
+        batch_size (int): The number of rows per UNWIND transaction (default is NODE_BATCH_SIZE).
+        parallel (bool): Load the POIs in a separate session, concurrently with the other labels (default is True).
     """
     
     cities_df = pd.read_csv('bulk/files/Neo4J/cities.csv')
@@ -38,256 +144,285 @@ def populate_neo4j_db():
     # Remove POI rows with name "Unknown"
     pois_df = pois_df[pois_df["name"] != "Unknown"]
 
-    neo4j_driver = get_neo4j_driver()
-    with neo4j_driver.session() as session:
-        # Set constraint
-        #session.write_transaction(lambda tx: tx.run("CREATE CONSTRAINT FOR (p:PropertyOnSale) REQUIRE p.property_on_sale_id IS UNIQUE"))
-        
-        counter = 1
-        # Create City nodes
-        for _, row in cities_df.iterrows():
-            print(f"Processing city {row['city']} ({counter}/{len(cities_df)})")
-            session.write_transaction(
-                create_nodes,
-                """
-                CREATE (c:City {
-                    name: $name,
-                    coordinates: point({latitude: $latitude, longitude: $longitude}),
-                    safety_index: $safety_index,
-                    health_care_index: $health_care_index,
-                    cost_of_living_index: $cost_of_living_index,
-                    pollution_index: $pollution_index
-                })
-                """,
-                {
-                    "name": row["city"],
-                    "latitude": row["latitude"],
-                    "longitude": row["longitude"],
-                    "safety_index": row["safety_index"],
-                    "health_care_index": row["health_care_index"],
-                    "cost_of_living_index": row["cost_of_living_index"],
-                    "pollution_index": row["pollution_index"]
-                }
-            )
-            counter += 1
-        
-        counter = 1
-        # Create Neighbourhood nodes and link them to the corresponding City
-        for _, row in neighbourhoods_df.iterrows():
-            print(f"Processing neighbourhood {row['name']} ({counter}/{len(neighbourhoods_df)})")
-            session.write_transaction(
-                create_nodes,
-                """
-                MATCH (c:City {name: $city_name})
-                CREATE (n:Neighbourhood {
-                    name: $name,
-                    coordinates: point({latitude: $latitude, longitude: $longitude})
-                })-[:BELONGS_TO_CITY]->(c)
-                """,
-                {
-                    "city_name": row["city"],
-                    "name": row["name"],
-                    "latitude": row["latitude"],
-                    "longitude": row["longitude"]
-                }
-            )
-            counter += 1
-        
-        counter = 1
-        # Create Property nodes and link them to the corresponding Neighbourhood
-        for _, row in properties_df.iterrows():
-            print(f"Processing property {row['property_on_sale_id']} ({counter}/{len(properties_df)})")
-            # Use separate latitude and longitude columns to build the coordinate
-            coordinates = parse_coordinates(row["latitude"], row["longitude"])
-            session.write_transaction(
-                create_nodes,
-                """
-                MATCH (n:Neighbourhood {name: $neighbourhood_name})
-                MERGE (p:PropertyOnSale { property_on_sale_id: $property_on_sale_id })
-                ON CREATE SET p.coordinates = point($coordinates),
-                            p.price = $price,
-                            p.type = $type,
-                            p.thumbnail = $thumbnail
-                CREATE (p)-[:LOCATED_IN_NEIGHBOURHOOD]->(n)
-                """,
-                {
-                    "property_on_sale_id": row["property_on_sale_id"],
-                    "coordinates": coordinates,
-                    "price": row["price"],
-                    "type": row["type"],
-                    "thumbnail": row["thumbnail"],
-                    "neighbourhood_name": row["neighbourhood"]
-                }
-            )
-            counter += 1
-        
-        counter = 1
-        # Create POI nodes
-        for _, row in pois_df.iterrows():
-            print(f"Processing POI {row['name']} ({counter}/{len(pois_df)})")
-            session.write_transaction(
-                create_nodes,
-                """
-                CREATE (poi:POI {
-                    name: $name,
-                    type: $type,
-                    coordinates: point({latitude: $latitude, longitude: $longitude})
-                })
-                """,
-                {
-                    "name": row["name"],
-                    "type": row["type"],
-                    "latitude": row["latitude"],
-                    "longitude": row["longitude"]
-                }
-            )
-            counter += 1
+    # Constraint and indexes are created before the load, so that the MERGE by id and the linking use them
+    ensure_neo4j_indexes()
+
+    # Query parameters built with column operations, one dictionary per row
+    cities_rows = cities_df.rename(columns={"city": "name"})[
+        ["name", "latitude", "longitude", "safety_index", "health_care_index", "cost_of_living_index", "pollution_index"]
+    ].to_dict("records")
+    neighbourhoods_rows = neighbourhoods_df.rename(columns={"city": "city_name"})[
+        ["city_name", "name", "latitude", "longitude"]
+    ].to_dict("records")
+    properties_rows = properties_df.assign(
+        latitude=properties_df["latitude"].astype(float),
+        longitude=properties_df["longitude"].astype(float)
+    ).rename(columns={"neighbourhood": "neighbourhood_name"})[
+        ["property_on_sale_id", "latitude", "longitude", "price", "type", "thumbnail", "neighbourhood_name"]
+    ].to_dict("records")
+    pois_rows = pois_df[["name", "type", "latitude", "longitude"]].to_dict("records")
+
+    start_time = time.perf_counter()
+    if parallel:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(load_cities_neighbourhoods_and_properties, cities_rows, neighbourhoods_rows, properties_rows, batch_size),
+                executor.submit(load_pois, pois_rows, batch_size)
+            ]
+            # Propagate the first error of the loaders
+            for future in futures:
+                future.result()
+    else:
+        load_cities_neighbourhoods_and_properties(cities_rows, neighbourhoods_rows, properties_rows, batch_size)
+        load_pois(pois_rows, batch_size)
+    total_rows = len(cities_rows) + len(neighbourhoods_rows) + len(properties_rows) + len(pois_rows)
+    elapsed = time.perf_counter() - start_time
+    print(f"{total_rows} nodes loaded in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):.0f} rows/s)")
 
-    # After nodes are created, use Cypher with the built-in distance function to create relationships.
+    # After nodes are created, the proximity relationships are computed client-side and written in batches.
     create_near_relationships()
     create_near_property_relationships()
+    clear_map_responses()
+
+
+# Relationships written per UNWIND transaction by the proximity join
+NEAR_BATCH_SIZE = 5000
+# Properties scored per transaction by update_livability_scores
+SCORE_BATCH_SIZE = 1000
+# Earth radius used by Neo4j for point.distance on WGS-84 points, so that the join agrees with the linking queries
+EARTH_RADIUS_METERS = 6378140
+
+def haversine_distance(latitudes_1: np.ndarray, longitudes_1: np.ndarray, latitudes_2: np.ndarray, longitudes_2: np.ndarray) -> np.ndarray:
+    """
+    Compute the great-circle distance in meters between two sets of coordinates, with NumPy broadcasting.
+
+    Args:
+        latitudes_1 (np.ndarray): The latitudes of the first set.
+        longitudes_1 (np.ndarray): The longitudes of the first set.
+        latitudes_2 (np.ndarray): The latitudes of the second set.
+        longitudes_2 (np.ndarray): The longitudes of the second set.
 
+    Returns:
+        np.ndarray: The distances in meters.
+    """
+    latitudes_1, longitudes_1, latitudes_2, longitudes_2 = map(np.radians, (latitudes_1, longitudes_1, latitudes_2, longitudes_2))
+    a = np.sin((latitudes_2 - latitudes_1) / 2) ** 2 + np.cos(latitudes_1) * np.cos(latitudes_2) * np.sin((longitudes_2 - longitudes_1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
 
-def create_near_relationships():
+def grid_proximity_join(sources: np.ndarray, targets: np.ndarray, distance: float = NEAR_DISTANCE_METERS, same_set: bool = False):
+    """
+    Find every (source, target) pair closer than distance. The targets are bucketed in a grid
+    of cells at least distance wide, and every source is only compared with the targets
+    of its own cell and of the 8 neighbouring ones.
+
+    Args:
+        sources (np.ndarray): The (latitude, longitude) rows of the sources.
+        targets (np.ndarray): The (latitude, longitude) rows of the targets.
+        distance (float): The maximum distance in meters (default is NEAR_DISTANCE_METERS).
+        same_set (bool): True if sources and targets are the same set, each pair is then returned once with source < target.
+
+    Returns:
+        tuple: The source indexes, the target indexes and the distances of the pairs, as NumPy arrays.
+    """
+    source_indexes, target_indexes, distances = [], [], []
+    if len(sources) and len(targets):
+        # The cells are sized on the highest latitude, where a degree of longitude is the shortest
+        max_latitude = max(np.abs(sources[:, 0]).max(), np.abs(targets[:, 0]).max())
+        cell_size = np.array([
+            distance / METERS_PER_DEGREE,
+            distance / (METERS_PER_DEGREE * max(math.cos(math.radians(max_latitude)), 0.01))
+        ])
+        source_buckets = grid_buckets(np.floor(sources / cell_size).astype(np.int64))
+        target_buckets = grid_buckets(np.floor(targets / cell_size).astype(np.int64))
+
+        for (cell_latitude, cell_longitude), cell_sources in source_buckets.items():
+            neighbours = [
+                target_buckets[(cell_latitude + i, cell_longitude + j)]
+                for i in (-1, 0, 1) for j in (-1, 0, 1)
+                if (cell_latitude + i, cell_longitude + j) in target_buckets
+            ]
+            if not neighbours:
+                continue
+            candidates = np.concatenate(neighbours)
+            pair_distances = haversine_distance(
+                sources[cell_sources, 0][:, None], sources[cell_sources, 1][:, None],
+                targets[candidates, 0][None, :], targets[candidates, 1][None, :]
+            )
+            mask = pair_distances <= distance
+            if same_set:
+                mask &= cell_sources[:, None] < candidates[None, :]
+            rows, columns = np.nonzero(mask)
+            source_indexes.append(cell_sources[rows])
+            target_indexes.append(candidates[columns])
+            distances.append(pair_distances[rows, columns])
+
+    if not source_indexes:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(source_indexes), np.concatenate(target_indexes), np.concatenate(distances)
+
+def grid_buckets(cells: np.ndarray) -> dict:
+    """
+    Group the row indexes by grid cell.
+
+    Args:
+        cells (np.ndarray): The (cell latitude, cell longitude) rows.
+
+    Returns:
+        dict: The row indexes of every occupied cell, keyed by cell.
+    """
+    order = np.lexsort((cells[:, 1], cells[:, 0]))
+    # np.unique sorts the rows in the same order as lexsort, so the starts index the sorted rows
+    unique_cells, starts, counts = np.unique(cells[order], axis=0, return_index=True, return_counts=True)
+    return {(int(cell[0]), int(cell[1])): order[start:start + count] for cell, start, count in zip(unique_cells, starts, counts)}
+
+def fetch_coordinates(session, query: str):
+    """
+    Run a query returning id, latitude and longitude of nodes, ordered by id.
+
+    Args:
+        session: The Neo4j session.
+        query (str): The Cypher query.
+
+    Returns:
+        tuple: The list of ids and the (latitude, longitude) rows as a NumPy array.
+    """
+    records = list(session.run(query))
+    ids = [record["id"] for record in records]
+    coordinates = np.array([(record["latitude"], record["longitude"]) for record in records], dtype=float).reshape(-1, 2)
+    return ids, coordinates
+
+def write_relationships_in_batches(session, query: str, rows, total: int, label: str, batch_size: int, start_batch: int):
+    """
+    Write relationships with UNWIND transactions of batch_size rows, printing the progress.
+    The queries use MERGE, so a batch written twice does not duplicate the relationships.
+
+    Args:
+        session: The Neo4j session.
+        query (str): The UNWIND $rows Cypher query.
+        rows: A function returning the list of rows between two positions.
+        total (int): The number of rows.
+        label (str): The name of the relationship, used in the progress messages.
+        batch_size (int): The number of rows per transaction.
+        start_batch (int): The first batch to write, to resume an interrupted join.
+    """
+    total_batches = math.ceil(total / batch_size)
+    start_time = time.perf_counter()
+    for batch in range(start_batch, total_batches):
+        session.write_transaction(create_nodes, query, {"rows": rows(batch * batch_size, min((batch + 1) * batch_size, total))})
+        elapsed = time.perf_counter() - start_time
+        print(f"{label}: batch {batch + 1}/{total_batches} written ({min((batch + 1) * batch_size, total)}/{total} relationships, {elapsed:.1f}s). "
+              f"Resume with start_batch={batch + 1}")
+
+def create_near_relationships(batch_size: int = NEAR_BATCH_SIZE, start_batch: int = 0):
     """
     Create NEAR relationships between PropertyOnSale and POI nodes in Neo4j.
     Relationships are created only if the distance between a property and a POI is ≤ 500 meters.
+    The pairs are found client-side with grid_proximity_join and written with batched UNWIND transactions.
 
     Args:
-        None
+        batch_size (int): The number of relationships per transaction (default is NEAR_BATCH_SIZE).
+        start_batch (int): The first batch to write, printed in the progress messages to resume an interrupted run.
     
     Returns:
         bool: True if the relationships are successfully created, False otherwise.
     """
     neo4j_driver = get_neo4j_driver()
     with neo4j_driver.session() as session:
-        session.write_transaction(lambda tx: tx.run(
-            """
-            MATCH (p:PropertyOnSale), (poi:POI)
-            WHERE point.distance(p.coordinates, poi.coordinates) <= 500
-            CREATE (p)-[:NEAR { distance: point.distance(p.coordinates, poi.coordinates) }]->(poi)
+        property_ids, property_coordinates = fetch_coordinates(session, """
+            MATCH (p:PropertyOnSale) WHERE p.coordinates IS NOT NULL
+            RETURN p.property_on_sale_id AS id, p.coordinates.latitude AS latitude, p.coordinates.longitude AS longitude
+            ORDER BY id
+            """)
+        # POI nodes have no business id, their element id is stable for the lifetime of the database
+        poi_ids, poi_coordinates = fetch_coordinates(session, """
+            MATCH (poi:POI) WHERE poi.coordinates IS NOT NULL
+            RETURN elementId(poi) AS id, poi.coordinates.latitude AS latitude, poi.coordinates.longitude AS longitude
+            ORDER BY id
+            """)
+        property_indexes, poi_indexes, distances = grid_proximity_join(property_coordinates, poi_coordinates)
+        print(f"{len(distances)} NEAR relationships found between {len(property_ids)} properties and {len(poi_ids)} POIs.")
+
+        write_relationships_in_batches(
+            session,
             """
-        ))
+            UNWIND $rows AS row
+            MATCH (p:PropertyOnSale {property_on_sale_id: row.property_on_sale_id})
+            MATCH (poi:POI) WHERE elementId(poi) = row.poi_id
+            MERGE (p)-[r:NEAR]->(poi)
+            SET r.distance = row.distance
+            """,
+            lambda start, end: [
+                {"property_on_sale_id": property_ids[i], "poi_id": poi_ids[j], "distance": float(d)}
+                for i, j, d in zip(property_indexes[start:end], poi_indexes[start:end], distances[start:end])
+            ],
+            len(distances), "NEAR", batch_size, start_batch
+        )
         print("NEAR relationships between properties and POIs created.")
     return True
 
-def create_near_property_relationships():
+def create_near_property_relationships(batch_size: int = NEAR_BATCH_SIZE, start_batch: int = 0):
     """
     Create bidirectional NEAR_PROPERTY relationships between PropertyOnSale nodes.
     Only properties with a distance ≤ 500 meters will be linked.
-    To avoid duplicate links, we use a condition on property IDs.
+    Every pair is found once by grid_proximity_join and written in both directions with batched UNWIND transactions.
+
+    Args:
+        batch_size (int): The number of pairs per transaction (default is NEAR_BATCH_SIZE).
+        start_batch (int): The first batch to write, printed in the progress messages to resume an interrupted run.
     """
     neo4j_driver = get_neo4j_driver()
     with neo4j_driver.session() as session:
-        session.write_transaction(lambda tx: tx.run(
-            """
-            MATCH (p1:PropertyOnSale), (p2:PropertyOnSale)
-            WHERE p1.property_on_sale_id < p2.property_on_sale_id
-              AND point.distance(p1.coordinates, p2.coordinates) <= 500
-            CREATE (p1)-[:NEAR_PROPERTY { distance: point.distance(p1.coordinates, p2.coordinates) }]->(p2),
-                   (p2)-[:NEAR_PROPERTY { distance: point.distance(p1.coordinates, p2.coordinates) }]->(p1)
+        property_ids, property_coordinates = fetch_coordinates(session, """
+            MATCH (p:PropertyOnSale) WHERE p.coordinates IS NOT NULL
+            RETURN p.property_on_sale_id AS id, p.coordinates.latitude AS latitude, p.coordinates.longitude AS longitude
+            ORDER BY id
+            """)
+        first_indexes, second_indexes, distances = grid_proximity_join(property_coordinates, property_coordinates, same_set=True)
+        print(f"{len(distances)} NEAR_PROPERTY pairs found between {len(property_ids)} properties.")
+
+        write_relationships_in_batches(
+            session,
             """
-        ))
+            UNWIND $rows AS row
+            MATCH (p1:PropertyOnSale {property_on_sale_id: row.first_id})
+            MATCH (p2:PropertyOnSale {property_on_sale_id: row.second_id})
+            MERGE (p1)-[r1:NEAR_PROPERTY]->(p2)
+            SET r1.distance = row.distance
+            MERGE (p2)-[r2:NEAR_PROPERTY]->(p1)
+            SET r2.distance = row.distance
+            """,
+            lambda start, end: [
+                {"first_id": property_ids[i], "second_id": property_ids[j], "distance": float(d)}
+                for i, j, d in zip(first_indexes[start:end], second_indexes[start:end], distances[start:end])
+            ],
+            len(distances), "NEAR_PROPERTY", batch_size, start_batch
+        )
         print("NEAR_PROPERTY relationships between properties created.")
     return True
 
-def calculate_livability_score(poi_weights, distances, counts):
+def update_livability_scores(batch_size: int = SCORE_BATCH_SIZE):
     """
-    Calculate the livability score based on the given POI weights, distances, and counts.
-    
-    For each key in poi_weights, if a key is missing in distances or counts, defaults are set:
-      - Count default: 0
-      - Distance default: 500 meters
-      
-    Args:
-        poi_weights (dict): A dictionary of POI types and their corresponding weights.
-        distances (dict): A dictionary of POI types and their minimum distances from the property.
-        counts (dict): A dictionary of POI types and their counts near the property.
-
-    Returns:
-        float: The calculated livability score.
-    """
-    # For every expected POI type, set default values if missing.
-    for poi in poi_weights.keys():
-        if poi not in distances:
-            distances[poi] = 500
-        if poi not in counts:
-            counts[poi] = 0
-
-    # Calculate total contribution (x)
-    x = sum(counts[poi] * weight * math.exp(-distances[poi]/1000) for poi, weight in poi_weights.items())
-    # Normalize the score using the exponential function
-    score = 100 - 100 * math.exp(-x)
-    return score
+    Update the livability scores for each PropertyOnSale node in the Neo4j database.
 
+    The properties are scored in batches: for every batch, one set-based query aggregates the count and
+    the minimum distance of the near POIs by type, the livability scoring engine computes all the scores
+    at once, and one UNWIND query stores them.
 
-def update_livability_scores():
-    """
-    Update the livability scores for each PropertyOnSale node in the Neo4j database.
-    
-    For each property, this function retrieves related POIs through the NEAR relationship,
-    groups the results by POI type, and constructs dictionaries for counts and minimum distances.
-    
-    If a particular POI type (e.g., hospital, school, etc.) is not found,
-    defaults are used (0 count and 500 meters distance).
-    
-    The function then calculates the livability score using calculate_livability_score() and updates the node.
+    Args:
+        batch_size (int): The number of properties per transaction (default is SCORE_BATCH_SIZE).
     """
-    # Define the weights for each POI type (all keys are in lowercase)
-    poi_weights = {
-        "hospital": 0.5,
-        "school": 0.2,
-        "park": 0.3,
-        "police": 0.2,
-        "supermarket": 0.3,
-        "kindergarten": 0.1,
-        "factory": -0.2,
-        "landfill": -0.3,
-        "prison": -0.4,
-        "grave_yard": -0.1
-    }
-    
     neo4j_driver = get_neo4j_driver()
     with neo4j_driver.session() as session:
-        # Retrieve all property nodes
-        properties = session.run("MATCH (p:PropertyOnSale) RETURN p.property_on_sale_id AS pid")
-        for record in properties:
-            print(f"Processing property {record['pid']}")
-            property_id = record["pid"]
-            # Retrieve POI information (group by type: count and minimum distance) for the current property
-            result = session.run(
-                """
-                MATCH (p:PropertyOnSale {property_on_sale_id: $property_id})- [r:NEAR] -> (poi:POI)
-                RETURN toLower(trim(poi.type)) AS poi_type, count(poi) AS cnt, min(r.distance) AS min_distance
-                """,
-                {"property_id": property_id}
-            )
-            counts = {}
-            distances = {}
-            for rec in result:
-                poi_type = rec["poi_type"]
-                counts[poi_type] = rec["cnt"]
-                distances[poi_type] = rec["min_distance"]
-            # For every expected POI type, if no data was found, assign defaults
-            for poi in poi_weights.keys():
-                if poi not in counts:
-                    counts[poi] = 0
-                if poi not in distances:
-                    distances[poi] = 500
-            try:
-                score = calculate_livability_score(poi_weights, distances, counts)
-            except Exception as e:
-                print(f"Error calculating livability score for property {property_id}: {e}")
-                score = 0
-            # Update the PropertyOnSale node with the calculated livability score
-            session.run(
-                """
-                MATCH (p:PropertyOnSale {property_on_sale_id: $property_id})
-                SET p.score = $score
-                """,
-                {"property_id": property_id, "score": score}
-            )
-            print(f"Updated property {property_id} with livability score {score:.2f}")
+        property_ids = [record["id"] for record in session.run(
+            "MATCH (p:PropertyOnSale) RETURN p.property_on_sale_id AS id ORDER BY id"
+        )]
+        start_time = time.perf_counter()
+        scored = 0
+        for start in range(0, len(property_ids), batch_size):
+            scored += session.write_transaction(recompute_livability_scores, property_ids[start:start + batch_size])
+            elapsed = time.perf_counter() - start_time
+            print(f"Livability score: {scored}/{len(property_ids)} properties updated ({scored / max(elapsed, 1e-9):.0f} rows/s)")
+    clear_map_responses()
 
 def reset_neo4j_db():
     """
@@ -300,6 +435,7 @@ def reset_neo4j_db():
         neo4j_driver = get_neo4j_driver()
         with neo4j_driver.session() as session:
             session.write_transaction(lambda tx: tx.run("MATCH (n) DETACH DELETE n"))
+        clear_map_responses()
         return {"status": "Database successfully reset"}
     except Exception as e:
         return {"status": "error", "detail": str(e)}
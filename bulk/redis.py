@@ -1,6 +1,6 @@
 import json
 import pandas as pd
-from setup.redis_setup.redis_setup import get_redis_client
+from setup.redis_setup.redis_setup import get_redis_client, scan_redis_keys, unlink_redis_keys
 
 seller_csv_path ='bulk/files/Redis/reservations_seller.csv'
 buyer_csv_path = 'bulk/files/Redis/reservations_buyer.csv'
@@ -18,11 +18,13 @@ def populate_redis_db():
     # Create a pipeline
     pipe = r.pipeline(transaction=False)
 
-    # Populate seller-side reservations
+    # Populate seller-side reservations, one hash field per buyer_id
     for _, row in seller_data.iterrows():
         key = row['redis_key']
         reservations = json.loads(row['reservations'])
-        pipe.set(key, json.dumps(reservations))
+        pipe.delete(key)
+        if reservations:
+            pipe.hset(key, mapping={reservation['buyer_id']: json.dumps(reservation) for reservation in reservations})
 
     # Populate buyer-side reservations
     for _, row in buyer_data.iterrows():
@@ -41,12 +43,11 @@ def reset_redis_db():
     Returns:
         None
     """
-    r = get_redis_client()
-
-    # Remove all keys related to reservations
-    keys_to_delete = r.keys('property_on_sale_id:*:reservations') + r.keys('buyer_id:*:reservations')
-    for key in keys_to_delete:
-        r.delete(key)
+    # Remove all keys related to reservations, scanning and unlinking them in batches
+    unlink_redis_keys('property_on_sale_id:*:reservations*')
+    unlink_redis_keys('buyer_id:*:reservations*')
+    # The pending reservation jobs refer to the removed reservations
+    unlink_redis_keys('reservation_job*')
 
     print("Database cleared successfully.")
 
@@ -59,18 +60,43 @@ def verify_redis_data():
     """
     r = get_redis_client()
 
-    # Verify a few random keys to ensure data is present
-    seller_keys = r.keys('property_on_sale_id:*:reservations*')
-    buyer_keys = r.keys('buyer_id:*:reservations*')
-    
+    # Verify a sample key of each kind to ensure data is present, the scan stops at the first match
+    seller_key = next(scan_redis_keys('property_on_sale_id:*:reservations*'), None)
+    buyer_key = next(scan_redis_keys('buyer_id:*:reservations*'), None)
 
-    if not seller_keys or not buyer_keys:
+    if seller_key is None or buyer_key is None:
         print("Verification failed: no data found.")
         raise Exception("No data found in Redis.")
 
     # Check sample keys for data integrity
-    seller_sample = r.get(seller_keys[0])
-    buyer_sample = r.get(buyer_keys[0])
+    seller_sample = r.hvals(seller_key)
+    buyer_sample = r.get(buyer_key)
 
-    print("Sample seller data:", json.loads(seller_sample))
-    print("Sample buyer data:", json.loads(buyer_sample))
\ No newline at end of file
+    print("Sample seller data:", [json.loads(reservation) for reservation in seller_sample])
+    print("Sample buyer data:", json.loads(buyer_sample))
+
+def migrate_reservations_seller_to_hash():
+    """
+    Converts the seller reservations stored as a JSON list into hashes with one field per buyer_id,
+    keeping their expiration. Keys that are already hashes are left untouched.
+
+    Returns:
+        int: The number of keys converted.
+    """
+    r = get_redis_client()
+    converted = 0
+    for key in scan_redis_keys('property_on_sale_id:*:reservations_seller'):
+        if r.type(key) not in (b'string', 'string'):
+            continue
+        reservations = json.loads(r.get(key) or '[]')
+        ttl = r.ttl(key)
+        pipe = r.pipeline(transaction=True)
+        pipe.delete(key)
+        if reservations:
+            pipe.hset(key, mapping={reservation['buyer_id']: json.dumps(reservation) for reservation in reservations})
+            if ttl > 0:
+                pipe.expire(key, ttl)
+        pipe.execute()
+        converted += 1
+    print(f"{converted} seller reservations converted to hashes.")
+    return converted
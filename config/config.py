@@ -5,6 +5,11 @@ class Settings(BaseSettings):
     sentinel_hosts: str
     redis_master_name: str
     redis_db: int
+    redis_listing_read_preference: str = "replica"
+    reservation_worker_embedded: bool = True
+    geocoding_providers: str = "nominatim,gazetteer"
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64
     neo4j_url: str
     neo4j_user: str
     neo4j_password: str
@@ -0,0 +1,331 @@
+from typing import Optional, List
+from bson.objectid import ObjectId
+from entities.MongoDB.PropertyOnSale.property_on_sale import PropertyOnSale, tokenize_address
+from entities.MongoDB.PropertyOnSale.db_property_on_sale import (
+    SUMMARY_PROJECTION, CURSOR_SORT_FIELD, FACET_COUNT_LIMIT,
+    build_search_query, encode_search_cursor, decode_search_cursor, build_cursor_predicate,
+    build_facets_pipeline, parse_facets, build_property_on_sale_update
+)
+from entities.MongoDB.PropertyOnSale.db_property_on_sale_rollup import ROLLUP_PROJECTION, ROLLUP_SOURCE_FIELDS
+from entities.MongoDB.PropertyOnSale.async_db_property_on_sale_rollup import AsyncPropertyOnSaleRollupDB
+from setup.mongo_setup.mongo_setup import get_default_async_mongo_db
+from datetime import datetime
+import logging
+from modules.Guest.models.guest_models import FilteredSearchInput
+
+logger = logging.getLogger(__name__)
+
+class AsyncPropertyOnSaleDB:
+    """
+    Async counterpart of PropertyOnSaleDB, used by the request path.
+    Same methods, same status codes and same attributes, backed by the Motor client.
+    """
+    def __init__(self, property_on_sale: Optional[PropertyOnSale] = None, property_on_sale_list: Optional[List[PropertyOnSale]] = None):
+        self.property_on_sale = property_on_sale
+        self.property_on_sale_list = property_on_sale_list
+        self.next_cursor = None
+        self.facets_result = None
+
+    async def filtered_search(self, input: FilteredSearchInput, page: int = 1, page_size: int = 10) -> int:
+        """
+        Search properties on sale based on provided filters and apply pagination.
+
+        Args:
+            input (FilteredSearchInput): Filter criteria for the search.
+            page (int): Current page number (default is 1).
+            page_size (int): Number of results per page (default is 10).
+
+        Returns:
+            int: 200 if properties are found,
+                404 if no properties match the criteria,
+                500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+
+        query = build_search_query(input)
+        skip = (page - 1) * page_size
+        try:
+            results_list = await mongo_client.PropertyOnSale.find(query, SUMMARY_PROJECTION).skip(skip).limit(page_size).to_list(length=page_size)
+        except Exception as e:
+            logger.error("Error during search: %s", e)
+            return 500
+
+        if not results_list:
+            return 404
+
+        self.property_on_sale_list = []
+        for result in results_list:
+            result["property_on_sale_id"] = str(result["_id"])
+            self.property_on_sale_list.append(PropertyOnSale(**result))
+        return 200
+
+    async def filtered_search_by_cursor(self, input: FilteredSearchInput, cursor: Optional[str] = None, page_size: int = 10) -> int:
+        """
+        Search properties on sale based on provided filters using keyset pagination, newest first.
+
+        Args:
+            input (FilteredSearchInput): Filter criteria for the search.
+            cursor (str, optional): The cursor returned with the previous page, None for the first page.
+            page_size (int): Number of results per page (default is 10).
+
+        Returns:
+            int: 200 if properties are found,
+                400 if the cursor or the page size is invalid,
+                404 if no properties match the criteria,
+                500 if a database error occurs.
+        """
+        if page_size < 1:
+            return 400
+        query = build_search_query(input)
+        if cursor:
+            position = decode_search_cursor(cursor)
+            if position is None:
+                return 400
+            query["$or"] = build_cursor_predicate(*position)
+
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            # One extra document is fetched to know whether a next page exists
+            results_list = await mongo_client.PropertyOnSale.find(query, SUMMARY_PROJECTION) \
+                .sort([(CURSOR_SORT_FIELD, -1), ("_id", -1)]) \
+                .limit(page_size + 1) \
+                .to_list(length=page_size + 1)
+        except Exception as e:
+            logger.error("Error during cursor search: %s", e)
+            return 500
+
+        if not results_list:
+            return 404
+
+        has_next = len(results_list) > page_size
+        results_list = results_list[:page_size]
+        self.next_cursor = encode_search_cursor(results_list[-1]) if has_next else None
+        self.property_on_sale_list = []
+        for result in results_list:
+            result["property_on_sale_id"] = str(result["_id"])
+            self.property_on_sale_list.append(PropertyOnSale(**result))
+        return 200
+
+    async def filtered_search_with_facets(self, input: FilteredSearchInput, page: int = 1, page_size: int = 10) -> int:
+        """
+        Search properties on sale based on provided filters and return, in a single aggregation, the requested page,
+        the total number of matches and the facet buckets. The pages beyond FACET_COUNT_LIMIT are rejected.
+
+        Args:
+            input (FilteredSearchInput): Filter criteria for the search.
+            page (int): Current page number (default is 1).
+            page_size (int): Number of results per page (default is 10).
+
+        Returns:
+            int: 200 if properties are found,
+                400 if page or page_size are invalid,
+                404 if no properties match the criteria,
+                500 if a database error occurs.
+        """
+        skip = (page - 1) * page_size
+        if page < 1 or page_size < 1 or skip + page_size > FACET_COUNT_LIMIT:
+            return 400
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+
+        scan_limit = FACET_COUNT_LIMIT
+        pipeline = build_facets_pipeline(input, skip, page_size, scan_limit)
+        try:
+            aggregation_list = await mongo_client.PropertyOnSale.aggregate(pipeline).to_list(length=1)
+        except Exception as e:
+            logger.error("Error during faceted search: %s", e)
+            return 500
+
+        facets = aggregation_list[0] if aggregation_list else {}
+        facets_result = parse_facets(facets, scan_limit)
+        if facets_result["total_count"] == 0:
+            return 404
+
+        self.facets_result = facets_result
+        self.property_on_sale_list = []
+        for result in facets["results"]:
+            result["property_on_sale_id"] = str(result["_id"])
+            self.property_on_sale_list.append(PropertyOnSale(**result))
+        return 200
+
+    async def delete_property_on_sale_by_id(self, property_on_sale_id: str) -> int:
+        """
+        Delete a property on sale by its ID.
+
+        Args:
+            property_on_sale_id (str): The ID of the property.
+
+        Returns:
+            int: 200 if deletion is successful,
+                 400 if invalid ID,
+                 404 if property not found,
+                 500 if a database error occurs.
+        """
+        if not ObjectId.is_valid(property_on_sale_id):
+            return 400
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            result = await mongo_client.PropertyOnSale.find_one_and_delete({"_id": ObjectId(property_on_sale_id)}, projection=ROLLUP_PROJECTION)
+        except Exception as e:
+            logger.error("Error deleting property on sale: %s", e)
+            return 500
+        if not result:
+            return 404
+        await AsyncPropertyOnSaleRollupDB().apply(result, None)
+        return 200
+
+    async def create_property_on_sale(self) -> int:
+        """
+        Create a new property on sale.
+
+        Returns:
+            int: 200 if creation is successful,
+                 400 if property data is missing,
+                 500 if a database error occurs.
+        """
+        if not self.property_on_sale:
+            return 400
+        self.property_on_sale.registration_date = datetime.now()
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            data = self.property_on_sale.model_dump(exclude_none=True, exclude={"property_on_sale_id"})
+            data["address_tokens"] = tokenize_address(self.property_on_sale.address)
+            result = await mongo_client.PropertyOnSale.insert_one(data)
+        except Exception as e:
+            logger.error("Error during property creation: %s", e)
+            return 500
+        if result.inserted_id:
+            self.property_on_sale.property_on_sale_id = str(result.inserted_id)
+            await AsyncPropertyOnSaleRollupDB().apply(None, data)
+            return 200
+        logger.error("Property not created")
+        return 500
+
+    async def update_property_on_sale(self) -> int:
+        """
+        Update an existing property on sale.
+
+        Returns:
+            int: 200 if update is successful,
+                 404 if property is not found,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        id = ObjectId(self.property_on_sale.property_on_sale_id)
+        update_data = build_property_on_sale_update(self.property_on_sale)
+        try:
+            # The property before the update, for the rollups
+            result = await mongo_client.PropertyOnSale.find_one_and_update({"_id": id}, update_data, projection=ROLLUP_PROJECTION)
+        except Exception as e:
+            logger.error("Error updating property on sale: %s", e)
+            return 500
+        if not result:
+            return 404
+        updated_fields = {field: value for field, value in update_data.get("$set", {}).items() if field in ROLLUP_SOURCE_FIELDS}
+        await AsyncPropertyOnSaleRollupDB().apply(result, {**result, **updated_fields})
+        return 200
+
+    async def get_property_on_sale_by_id(self, property_on_sale_id: str) -> int:
+        """
+        Retrieve a property on sale by its ID.
+
+        Args:
+            property_on_sale_id (str): The property ID.
+
+        Returns:
+            int: 200 if property is found,
+                 400 if invalid ID,
+                 404 if property is not found,
+                 500 if a database error occurs.
+        """
+        if not ObjectId.is_valid(property_on_sale_id):
+            return 400
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            result = await mongo_client.PropertyOnSale.find_one({"_id": ObjectId(property_on_sale_id)})
+        except Exception as e:
+            logger.error("Error retrieving property on sale with id: %s, error: %s", property_on_sale_id, e)
+            return 500
+        if not result:
+            return 404
+        self.property_on_sale = PropertyOnSale(**result, property_on_sale_id=str(result["_id"]))
+        return 200
+
+    async def delete_and_return_property(self, property_on_sale_id: str) -> int:
+        """
+        Delete a property on sale and return its data.
+
+        Args:
+            property_on_sale_id (str): The ID of the property to delete.
+
+        Returns:
+            int: 200 if deletion is successful and property is returned,
+                 500 if a database error occurs,
+                 404 if property is not found.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            result = await mongo_client.PropertyOnSale.find_one_and_delete({"_id": ObjectId(property_on_sale_id)})
+        except Exception as e:
+            logger.error("Error deleting property on sale with id: %s, error: %s", property_on_sale_id, e)
+            return 500
+        if not result:
+            return 404
+        await AsyncPropertyOnSaleRollupDB().apply(result, None)
+        self.property_on_sale = PropertyOnSale(**result, property_on_sale_id=str(result["_id"]))
+        return 200
+
+    async def insert_property(self) -> int:
+        """
+        Insert a property on sale document into the database, keeping its ID.
+
+        Returns:
+            int: 200 if insertion is successful,
+                 400 if property data is missing,
+                 500 if a database error occurs.
+        """
+        if not self.property_on_sale:
+            return 400
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        id = ObjectId(self.property_on_sale.property_on_sale_id)
+        try:
+            data = {
+                "_id": id,
+                **self.property_on_sale.model_dump(exclude_none=True, exclude={"property_on_sale_id"}),
+                "address_tokens": tokenize_address(self.property_on_sale.address)
+            }
+            result = await mongo_client.PropertyOnSale.insert_one(data)
+        except Exception as e:
+            logger.error("Error inserting property on sale: %s", e)
+            return 500
+        if result.inserted_id == id:
+            await AsyncPropertyOnSaleRollupDB().apply(None, data)
+            return 200
+        logger.error("Error inserting property on sale with id: %s", self.property_on_sale.property_on_sale_id)
+        return 500
@@ -0,0 +1,41 @@
+from typing import Optional, Dict, Any
+from entities.MongoDB.PropertyOnSale.db_property_on_sale_rollup import ROLLUP_COLLECTION, build_rollup_updates, rollup_key
+from setup.mongo_setup.mongo_setup import get_default_async_mongo_db
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncPropertyOnSaleRollupDB:
+    """
+    Async counterpart of PropertyOnSaleRollupDB, used by the writes of the request path.
+    """
+
+    async def apply(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> int:
+        """
+        Apply the write of a property on sale to the rollups.
+
+        Args:
+            before (dict, optional): The property before the write, None for a creation.
+            after (dict, optional): The property after the write, None for a deletion.
+
+        Returns:
+            int: 200 if the rollups are updated,
+                 500 if a database error occurs.
+        """
+        updates = build_rollup_updates(before, after)
+        if not updates:
+            return 200
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            await mongo_client[ROLLUP_COLLECTION].bulk_write(updates, ordered=False)
+            # The groups left without properties
+            rollup_keys = [rollup_key(property_on_sale) for property_on_sale in (before, after) if property_on_sale is not None]
+            await mongo_client[ROLLUP_COLLECTION].delete_many({"$or": rollup_keys, "count": {"$lte": 0}})
+        except Exception as e:
+            # The rollups drift until the next rebuild
+            logger.error("Error updating the analytics rollups: %s", e)
+            return 500
+        return 200
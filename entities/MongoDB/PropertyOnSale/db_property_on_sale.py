@@ -1,18 +1,268 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
 from bson.objectid import ObjectId
-from entities.MongoDB.PropertyOnSale.property_on_sale import PropertyOnSale
+from entities.MongoDB.PropertyOnSale.property_on_sale import PropertyOnSale, ADDRESS_ABBREVIATIONS, split_address, tokenize_address
+from entities.MongoDB.PropertyOnSale.db_property_on_sale_rollup import (
+    ROLLUP_COLLECTION, ROLLUP_PROJECTION, ROLLUP_SOURCE_FIELDS, PropertyOnSaleRollupDB,
+    analytics_1_from_rollups, analytics_4_from_rollups, analytics_5_from_rollups
+)
 from setup.mongo_setup.mongo_setup import get_default_mongo_db
 from datetime import datetime
+import base64
+import json
 import logging
+import re
 from modules.Guest.models.guest_models import FilteredSearchInput
 from modules.RegisteredUser.models.registered_user_models import Analytics1Input
 
 logger = logging.getLogger(__name__)
 
+# Fields returned by the guest search, matching SummaryPropertyOnSale
+SUMMARY_PROJECTION = {
+    "_id": 1,
+    "type": 1,
+    "address": 1,
+    "thumbnail": 1,
+    "price": 1,
+    "registration_date": 1,
+    "city": 1,
+    "neighbourhood": 1,
+    "area": 1
+}
+
+# Keyset pagination walks the results from the newest to the oldest listing,
+# using _id as tie-breaker so that the order is total.
+CURSOR_SORT_FIELD = "registration_date"
+
+def build_address_query(address: str) -> Dict[str, Any]:
+    """
+    Build the filter of the address search. Every complete word must match a token, the last word
+    may be partly typed and is matched as a prefix of the raw word, so that "10 St" still finds
+    "Stanton" and "street". If the last word is also an abbreviation, its expansion matches too.
+    All the clauses are seeks on the multikey address_tokens index.
+
+    >>> build_address_query("10 St")["$and"][-1]
+    {'$or': [{'address_tokens': {'$regex': '^st'}}, {'address_tokens': 'street'}]}
+    >>> build_address_query("Stanford Ave")["$and"]
+    [{'address_tokens': 'stanford'}, {'$or': [{'address_tokens': {'$regex': '^ave'}}, {'address_tokens': 'avenue'}]}]
+
+    Args:
+        address (str): The address typed by the user.
+
+    Returns:
+        dict: The MongoDB query document, empty if the address has no words.
+    """
+    words = split_address(address)
+    if not words:
+        return {}
+    clauses = [{"address_tokens": token} for token in tokenize_address(" ".join(words[:-1]))]
+    prefix_clause = {"address_tokens": {"$regex": "^" + re.escape(words[-1])}}
+    expanded = ADDRESS_ABBREVIATIONS.get(words[-1])
+    if expanded:
+        clauses.append({"$or": [prefix_clause, {"address_tokens": expanded}]})
+    else:
+        clauses.append(prefix_clause)
+    return {"$and": clauses}
+
+def build_search_query(input: FilteredSearchInput) -> Dict[str, Any]:
+    """
+    Build the MongoDB filter for a guest filtered search.
+
+    Args:
+        input (FilteredSearchInput): Filter criteria for the search.
+
+    Returns:
+        dict: The MongoDB query document.
+    """
+    query = {}
+    if input.city:
+        query["city"] = input.city
+    if input.address:
+        query.update(build_address_query(input.address))
+    if input.max_price:
+        query["price"] = {"$lte": input.max_price}
+    if input.neighbourhood:
+        query["neighbourhood"] = input.neighbourhood
+    if input.type:
+        query["type"] = input.type
+    if input.min_area:
+        query["area"] = {"$gte": input.min_area}
+    if input.min_bed_number:
+        query["bed_number"] = {"$gte": input.min_bed_number}
+    if input.min_bath_number:
+        query["bath_number"] = {"$gte": input.min_bath_number}
+    return query
+
+# Above this number of matches the faceted search stops counting, so that huge cities stay cheap.
+# The pages of the faceted search must lie within the counted matches.
+FACET_COUNT_LIMIT = 10000
+
+# Bounds of the price bands returned by the faceted search, the last band has no upper bound
+PRICE_BAND_BOUNDARIES = [0, 100000, 250000, 500000, 750000, 1000000, 2000000, float("inf")]
+# Band of the properties with a missing, null, negative or non numeric price
+UNKNOWN_PRICE_BAND = "unknown"
+
+def encode_search_cursor(document: Dict[str, Any]) -> str:
+    """
+    Build an opaque cursor pointing right after the given search result.
+
+    Args:
+        document (dict): The last document of the current page.
+
+    Returns:
+        str: The url-safe cursor string.
+    """
+    value = document.get(CURSOR_SORT_FIELD)
+    payload = {
+        "v": value.isoformat() if isinstance(value, datetime) else None,
+        "id": str(document["_id"])
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+def decode_search_cursor(cursor: str) -> Optional[Tuple[Optional[datetime], ObjectId]]:
+    """
+    Decode a cursor produced by encode_search_cursor.
+
+    Args:
+        cursor (str): The cursor received from the client.
+
+    Returns:
+        tuple | None: The sort value and the _id of the last seen document, None if the cursor is invalid.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        value = datetime.fromisoformat(payload["v"]) if payload["v"] is not None else None
+        return value, ObjectId(payload["id"])
+    except Exception:
+        return None
+
+def build_cursor_predicate(value: Optional[datetime], last_id: ObjectId) -> List[Dict[str, Any]]:
+    """
+    Build the range predicate that resumes a descending (registration_date, _id) scan after the given position.
+
+    Args:
+        value (datetime | None): The registration_date of the last seen document.
+        last_id (ObjectId): The _id of the last seen document.
+
+    Returns:
+        list: The clauses of the $or predicate.
+    """
+    if value is None:
+        # Documents without a registration_date sort last, only the _id is left to compare
+        return [{CURSOR_SORT_FIELD: None, "_id": {"$lt": last_id}}]
+    return [
+        {CURSOR_SORT_FIELD: {"$lt": value}},
+        {CURSOR_SORT_FIELD: value, "_id": {"$lt": last_id}},
+        {CURSOR_SORT_FIELD: None}
+    ]
+
+def build_facets_pipeline(input: FilteredSearchInput, skip: int, page_size: int, scan_limit: int) -> List[Dict[str, Any]]:
+    """
+    Build the faceted search aggregation: the matches are capped at scan_limit, then a single $facet
+    returns the requested page, the total count and the buckets of every facet.
+
+    Args:
+        input (FilteredSearchInput): Filter criteria for the search.
+        skip (int): Number of matches to skip before the page.
+        page_size (int): Number of results per page.
+        scan_limit (int): Maximum number of matches counted.
+
+    Returns:
+        list: The aggregation pipeline.
+    """
+    return [
+        {"$match": build_search_query(input)},
+        {"$limit": scan_limit},
+        {"$facet": {
+            "results": [{"$skip": skip}, {"$limit": page_size}, {"$project": SUMMARY_PROJECTION}],
+            "total": [{"$count": "count"}],
+            "type": [{"$group": {"_id": "$type", "count": {"$sum": 1}}}, {"$sort": {"count": -1}}],
+            "neighbourhood": [{"$group": {"_id": "$neighbourhood", "count": {"$sum": 1}}}, {"$sort": {"count": -1}}],
+            "price": [{"$bucket": {"groupBy": "$price", "boundaries": PRICE_BAND_BOUNDARIES, "default": UNKNOWN_PRICE_BAND, "output": {"count": {"$sum": 1}}}}],
+            "bed_number": [{"$group": {"_id": "$bed_number", "count": {"$sum": 1}}}, {"$sort": {"_id": 1}}]
+        }}
+    ]
+
+def parse_facets(facets: Dict[str, Any], scan_limit: int) -> Dict[str, Any]:
+    """
+    Convert the output of the $facet stage into the faceted search result.
+
+    Args:
+        facets (dict): The single document returned by build_facets_pipeline.
+        scan_limit (int): The cap applied to the matches.
+
+    Returns:
+        dict: The total count, whether it is capped, and the facets as lists of value/count pairs.
+    """
+    def price_band(lower_bound):
+        if lower_bound == UNKNOWN_PRICE_BAND:
+            return UNKNOWN_PRICE_BAND
+        upper_bound = PRICE_BAND_BOUNDARIES[PRICE_BAND_BOUNDARIES.index(lower_bound) + 1]
+        if upper_bound == float("inf"):
+            return f"{lower_bound}+"
+        return f"{lower_bound}-{upper_bound}"
+
+    total = facets["total"][0]["count"] if facets.get("total") else 0
+    return {
+        "total_count": total,
+        "total_count_capped": total >= scan_limit,
+        "facets": {
+            "type": [{"value": bucket["_id"], "count": bucket["count"]} for bucket in facets.get("type", [])],
+            "neighbourhood": [{"value": bucket["_id"], "count": bucket["count"]} for bucket in facets.get("neighbourhood", [])],
+            "price": [{"value": price_band(bucket["_id"]), "count": bucket["count"]} for bucket in facets.get("price", [])],
+            "bed_number": [{"value": bucket["_id"], "count": bucket["count"]} for bucket in facets.get("bed_number", [])]
+        }
+    }
+
+def build_property_on_sale_update(property_on_sale: PropertyOnSale) -> Dict[str, Any]:
+    """
+    Build the update document for a partial update of a property on sale: the scalar fields and the
+    disponibility fields provided are set, the photos provided are appended.
+
+    Args:
+        property_on_sale (PropertyOnSale): The property with the fields to update, the others set to None.
+
+    Returns:
+        dict: The MongoDB update document.
+    """
+    single_data = property_on_sale.model_dump(exclude_none=True, exclude={"property_on_sale_id", "photos", "disponibility"})
+    a= (property_on_sale.city is not None or property_on_sale.neighbourhood is not None or property_on_sale.address is not None or property_on_sale.price is not None or property_on_sale.thumbnail is not None or property_on_sale.type is not None or property_on_sale.area is not None or property_on_sale.registration_date is not None or property_on_sale.bed_number is not None or property_on_sale.bath_number is not None or property_on_sale.description is not None)
+    b= (property_on_sale.photos is not None)
+    c= (property_on_sale.disponibility is not None)
+    if c:
+        disponibility_data_property = {
+            f"disponibility.{field}": value
+            for field, value in {
+                "day": property_on_sale.disponibility.day,
+                "time": property_on_sale.disponibility.time,
+                "max_attendees": property_on_sale.disponibility.max_attendees,
+            }.items()
+            if value is not None
+        }
+    set_fields = {}
+    push_fields = {}
+
+    if a:
+        set_fields |= single_data
+        if property_on_sale.address is not None:
+            set_fields["address_tokens"] = tokenize_address(property_on_sale.address)
+    if c:
+        set_fields |= disponibility_data_property
+    if b:
+        push_fields["photos"] = {"$each": property_on_sale.photos}
+
+    update_data = {}
+    if set_fields:
+        update_data["$set"] = set_fields
+    if push_fields:
+        update_data["$push"] = push_fields
+    return update_data
+
 class PropertyOnSaleDB:
     def __init__(self, property_on_sale: Optional[PropertyOnSale] = None, property_on_sale_list: Optional[List[PropertyOnSale]] = None):
         self.property_on_sale = property_on_sale
         self.property_on_sale_list = property_on_sale_list
+        self.next_cursor = None
+        self.facets_result = None
         self.analytics_1_result = None
         self.analytics_4_result = None
         self.analytics_5_result = None
@@ -36,40 +286,11 @@ class PropertyOnSaleDB:
             logger.error("Mongo client not initialized.")
             return 500
 
-        query = {}
-        if input.city:
-            query["city"] = input.city
-        if input.address:
-            query["address"] = {"$regex": input.address, "$options": "i"}
-        if input.max_price:
-            query["price"] = {"$lte": input.max_price}
-        if input.neighbourhood:
-            query["neighbourhood"] = input.neighbourhood
-        if input.type:
-            query["type"] = input.type
-        if input.min_area:
-            query["area"] = {"$gte": input.min_area}
-        if input.min_bed_number:
-            query["bed_number"] = {"$gte": input.min_bed_number}
-        if input.min_bath_number:
-            query["bath_number"] = {"$gte": input.min_bath_number}
+        query = build_search_query(input)
 
         try:
             # Initialize the cursor with the query and projection
-            results_cursor = mongo_client.PropertyOnSale.find(
-            query,
-            {
-                "_id": 1,
-                "type": 1,
-                "address": 1,
-                "thumbnail": 1,
-                "price": 1,
-                "registration_date": 1,
-                "city": 1,
-                "neighbourhood": 1,
-                "area" :1
-            }
-            )
+            results_cursor = mongo_client.PropertyOnSale.find(query, SUMMARY_PROJECTION)
             # Apply pagination using skip and limit
             skip = (page - 1) * page_size
             results_cursor = results_cursor.skip(skip).limit(page_size)
@@ -87,9 +308,110 @@ class PropertyOnSaleDB:
             self.property_on_sale_list.append(PropertyOnSale(**result))
         return 200
 
-    def get_6_random_properties(self) -> int:
+    def filtered_search_by_cursor(self, input: FilteredSearchInput, cursor: Optional[str] = None, page_size: int = 10) -> int:
+        """
+        Search properties on sale based on provided filters using keyset pagination.
+        Results are ordered by registration_date and _id (newest first) and each page
+        resumes from the cursor with a range predicate, so deep pages cost as much as the first one.
+
+        Args:
+            input (FilteredSearchInput): Filter criteria for the search.
+            cursor (str, optional): The cursor returned with the previous page, None for the first page.
+            page_size (int): Number of results per page (default is 10).
+
+        Returns:
+            int: 200 if properties are found,
+                400 if the cursor or the page size is invalid,
+                404 if no properties match the criteria,
+                500 if a database error occurs.
+        """
+        if page_size < 1:
+            return 400
+        query = build_search_query(input)
+        if cursor:
+            position = decode_search_cursor(cursor)
+            if position is None:
+                return 400
+            query["$or"] = build_cursor_predicate(*position)
+
+        mongo_client = get_default_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            # One extra document is fetched to know whether a next page exists
+            results_cursor = mongo_client.PropertyOnSale.find(query, SUMMARY_PROJECTION) \
+                .sort([(CURSOR_SORT_FIELD, -1), ("_id", -1)]) \
+                .limit(page_size + 1)
+            results_list = list(results_cursor)
+        except Exception as e:
+            logger.error("Error during cursor search: %s", e)
+            return 500
+
+        if not results_list:
+            return 404
+
+        has_next = len(results_list) > page_size
+        results_list = results_list[:page_size]
+        self.next_cursor = encode_search_cursor(results_list[-1]) if has_next else None
+        self.property_on_sale_list = []
+        for result in results_list:
+            result["property_on_sale_id"] = str(result["_id"])
+            self.property_on_sale_list.append(PropertyOnSale(**result))
+        return 200
+
+    def filtered_search_with_facets(self, input: FilteredSearchInput, page: int = 1, page_size: int = 10) -> int:
+        """
+        Search properties on sale based on provided filters and return, in a single aggregation, the requested page,
+        the total number of matches and the facet buckets by type, neighbourhood, price band and bed number.
+        Counting stops after FACET_COUNT_LIMIT matches, in that case the total is a lower bound and the facets are
+        computed on the counted matches only. The pages beyond FACET_COUNT_LIMIT are rejected.
+
+        Args:
+            input (FilteredSearchInput): Filter criteria for the search.
+            page (int): Current page number (default is 1).
+            page_size (int): Number of results per page (default is 10).
+
+        Returns:
+            int: 200 if properties are found,
+                400 if page or page_size are invalid,
+                404 if no properties match the criteria,
+                500 if a database error occurs.
+        """
+        skip = (page - 1) * page_size
+        if page < 1 or page_size < 1 or skip + page_size > FACET_COUNT_LIMIT:
+            return 400
+        mongo_client = get_default_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+
+        scan_limit = FACET_COUNT_LIMIT
+        pipeline = build_facets_pipeline(input, skip, page_size, scan_limit)
+        try:
+            aggregation_list = list(mongo_client.PropertyOnSale.aggregate(pipeline))
+        except Exception as e:
+            logger.error("Error during faceted search: %s", e)
+            return 500
+
+        facets = aggregation_list[0] if aggregation_list else {}
+        facets_result = parse_facets(facets, scan_limit)
+        if facets_result["total_count"] == 0:
+            return 404
+
+        self.facets_result = facets_result
+        self.property_on_sale_list = []
+        for result in facets["results"]:
+            result["property_on_sale_id"] = str(result["_id"])
+            self.property_on_sale_list.append(PropertyOnSale(**result))
+        return 200
+
+    def get_random_properties(self, size: int = 6) -> int:
         """
-        Retrieve 6 random properties on sale.
+        Retrieve a random sample of properties on sale.
+
+        Args:
+            size (int): Number of properties to sample (default is 6).
 
         Returns:
             int: 200 if properties are retrieved,
@@ -102,7 +424,7 @@ class PropertyOnSaleDB:
             return 500
         try:
             results = mongo_client.PropertyOnSale.aggregate([
-                {"$sample": {"size": 6}},
+                {"$sample": {"size": size}},
                 {"$project": {
                    "_id": 1,
                     "address": 1,
@@ -144,12 +466,13 @@ class PropertyOnSaleDB:
             logger.error("Mongo client not initialized.")
             return 500
         try:
-            result = mongo_client.PropertyOnSale.delete_one({"_id": id})
+            result = mongo_client.PropertyOnSale.find_one_and_delete({"_id": id}, projection=ROLLUP_PROJECTION)
         except Exception as e:
             logger.error("Error deleting property on sale: %s", e)
             return 500
-        if result.deleted_count == 0:
+        if not result:
             return 404
+        PropertyOnSaleRollupDB().apply(result, None)
         return 200
     
     def create_property_on_sale(self) -> int:
@@ -169,12 +492,15 @@ class PropertyOnSaleDB:
             logger.error("Mongo client not initialized.")
             return 500
         try:
-            result = mongo_client.PropertyOnSale.insert_one(self.property_on_sale.model_dump(exclude_none=True, exclude={"property_on_sale_id"}))
+            data = self.property_on_sale.model_dump(exclude_none=True, exclude={"property_on_sale_id"})
+            data["address_tokens"] = tokenize_address(self.property_on_sale.address)
+            result = mongo_client.PropertyOnSale.insert_one(data)
         except Exception as e:
             logger.error("Error during property creation: %s", e)
             return 500
         if result.inserted_id:
             self.property_on_sale.property_on_sale_id = str(result.inserted_id)
+            PropertyOnSaleRollupDB().apply(None, data)
             return 200
         logger.error("Property not created")
         return 500
@@ -195,43 +521,18 @@ class PropertyOnSaleDB:
             return 500
         # Data preparation
         id=ObjectId(self.property_on_sale.property_on_sale_id)
-        single_data = self.property_on_sale.model_dump(exclude_none=True, exclude={"property_on_sale_id", "photos", "disponibility"})
-        a= (self.property_on_sale.city is not None or self.property_on_sale.neighbourhood is not None or self.property_on_sale.address is not None or self.property_on_sale.price is not None or self.property_on_sale.thumbnail is not None or self.property_on_sale.type is not None or self.property_on_sale.area is not None or self.property_on_sale.registration_date is not None or self.property_on_sale.bed_number is not None or self.property_on_sale.bath_number is not None or self.property_on_sale.description is not None)
-        b= (self.property_on_sale.photos is not None)
-        c= (self.property_on_sale.disponibility is not None)
-        if c:
-            disponibility_data_property = {
-                f"disponibility.{field}": value
-                for field, value in {
-                    "day": self.property_on_sale.disponibility.day,
-                    "time": self.property_on_sale.disponibility.time,
-                    "max_attendees": self.property_on_sale.disponibility.max_attendees,
-                }.items()
-                if value is not None
-            }
-        set_fields = {}
-        push_fields = {}
-
-        if a:
-            set_fields |= single_data
-        if c:
-            set_fields |= disponibility_data_property
-        if b:
-            push_fields["photos"] = {"$each": self.property_on_sale.photos}
-
-        update_data = {}
-        if set_fields:
-            update_data["$set"] = set_fields
-        if push_fields:
-            update_data["$push"] = push_fields
+        update_data = build_property_on_sale_update(self.property_on_sale)
 
         try:
-            result = mongo_client.PropertyOnSale.update_one({"_id": id}, update_data)
+            # The property before the update, for the rollups
+            result = mongo_client.PropertyOnSale.find_one_and_update({"_id": id}, update_data, projection=ROLLUP_PROJECTION)
         except Exception as e:
             logger.error("Error updating property on sale: %s", e)
             return 500
-        if result.matched_count == 0:
+        if not result:
             return 404
+        updated_fields = {field: value for field, value in update_data.get("$set", {}).items() if field in ROLLUP_SOURCE_FIELDS}
+        PropertyOnSaleRollupDB().apply(result, {**result, **updated_fields})
         return 200
     
     # seller route (sell_property) CONSISTENT
@@ -290,6 +591,7 @@ class PropertyOnSaleDB:
             return 500
         if not result:
             return 404
+        PropertyOnSaleRollupDB().apply(result, None)
         self.property_on_sale = PropertyOnSale(**result, property_on_sale_id=str(result["_id"]))
         return 200
     
@@ -311,57 +613,70 @@ class PropertyOnSaleDB:
             logger.error("Mongo client not initialized.")
             return 500
         try:
-            result=mongo_client.PropertyOnSale.insert_one({"_id": ObjectId(self.property_on_sale.property_on_sale_id), **self.property_on_sale.model_dump(exclude_none=True, exclude={"property_on_sale_id"})})
+            data = {
+                "_id": ObjectId(self.property_on_sale.property_on_sale_id),
+                **self.property_on_sale.model_dump(exclude_none=True, exclude={"property_on_sale_id"}),
+                "address_tokens": tokenize_address(self.property_on_sale.address)
+            }
+            result=mongo_client.PropertyOnSale.insert_one(data)
         except Exception as e:
             logger.error("Error inserting property on sale: %s", e)
             return 500
-        if result.inserted_id == self.property_on_sale.property_on_sale_id:
+        if result.inserted_id == data["_id"]:
+            PropertyOnSaleRollupDB().apply(None, data)
             return 200
         else:
             logger.error("Error inserting property on sale with id: %s", self.property_on_sale.property_on_sale_id)
             return 500
         
-    def get_avg_price_per_square_meter(self, input: Analytics1Input) -> int:
+    def get_rollups(self, rollup_filter: Dict[str, Any], analytics: str) -> Optional[List[Dict[str, Any]]]:
         """
-        Calculate the average price per square meter grouped by neighbourhood based on a filter.
+        Read the analytics rollups matching a filter.
 
         Args:
-            input (Analytics1Input): Filter criteria including order_by.
+            rollup_filter (dict): The filter on city, neighbourhood and type.
+            analytics (str): The name of the analytics, for the logs.
 
         Returns:
-            int: 200 if analytics are successful,
-                 404 if no data is found,
-                 500 if a database error occurs.
+            list: The rollups, None if a database error occurs.
         """
         mongo_client = get_default_mongo_db()
         if mongo_client is None:
             logger.error("Mongo client not initialized.")
-            return 500
+            return None
         try:
-            pipeline = [
-                {"$match": {**input.model_dump(exclude_none=True, exclude={"order_by"}), "area": {"$gt": 1}}},
-                {"$project": {"neighbourhood": 1, "price_per_square_meter": {"$divide": ["$price", "$area"]}}},
-                {"$group": {"_id": "$neighbourhood", "avg_price": {"$avg": "$price_per_square_meter"}}},
-                {"$project": {"neighbourhood": "$_id", "avg_price": 1, "_id": 0}},
-                {"$sort": {"avg_price": input.order_by}}
-            ]
-            aggregation_result = mongo_client.PropertyOnSale.aggregate(pipeline)
+            return list(mongo_client[ROLLUP_COLLECTION].find(rollup_filter, {"_id": 0}))
         except Exception as e:
-            logger.error("Error during analytics_1: %s", e)
+            logger.error("Error during %s: %s", analytics, e)
+            return None
+
+    def get_avg_price_per_square_meter(self, input: Analytics1Input) -> int:
+        """
+        Calculate the average price per square meter grouped by neighbourhood based on a filter,
+        from the analytics rollups.
+
+        Args:
+            input (Analytics1Input): Filter criteria including order_by.
+
+        Returns:
+            int: 200 if analytics are successful,
+                 404 if no data is found,
+                 500 if a database error occurs.
+        """
+        rollups = self.get_rollups(input.model_dump(exclude_none=True, exclude={"order_by"}), "analytics_1")
+        if rollups is None:
             return 500
-        
-        aggregation_list = list(aggregation_result)
-        
-        if not aggregation_list or len(aggregation_list) == 0:
+        aggregation_list = analytics_1_from_rollups(rollups, input.order_by)
+        if not aggregation_list:
             return 404
-        
         self.analytics_1_result = aggregation_list
         return 200
     
     
     def get_avg_price_per_square_meter_by_city(self, city: str) -> int:
         """
-        Calculate the average price per square meter and count of properties grouped by type for a given city.
+        Calculate the average price and count of properties grouped by type for a given city,
+        from the analytics rollups.
 
         Args:
             city (str): The city for filtering.
@@ -371,33 +686,19 @@ class PropertyOnSaleDB:
                  404 if no data is found,
                  500 if a database error occurs.
         """
-        mongo_client = get_default_mongo_db() 
-        if mongo_client is None:
-            logger.error("Mongo client not initialized.")
+        rollups = self.get_rollups({"city": city}, "analytics_4")
+        if rollups is None:
             return 500
-        try:
-            pipeline = [
-                {"$match": {"city": city, "area": {"$gt": 1}}},
-                {"$project": {"type": 1, "price": 1}},
-                {"$group": {"_id": "$type", "avg_price": {"$avg": "$price"}, "count": {"$sum": 1}}},
-                {"$project": {"type": "$_id", "avg_price": 1, "_id": 0, "count": 1}}
-            ]
-            aggregation_result = mongo_client.PropertyOnSale.aggregate(pipeline)
-        except Exception as e:
-            logger.error("Error during analytics_4: %s", e)
-            return 500
-        
-        aggregation_list = list(aggregation_result)
-        if not aggregation_list or len(aggregation_list) == 0:
+        aggregation_list = analytics_4_from_rollups(rollups)
+        if not aggregation_list:
             return 404
-        
         self.analytics_4_result = aggregation_list
         return 200
         
     def get_statistics_by_city_and_neighbourhood(self, city: str, neighbourhood: str) -> int:
         """
         Retrieve statistics for properties based on city and neighbourhood including average bed number,
-        bath number, and area grouped by property type.
+        bath number, and area grouped by property type, from the analytics rollups.
 
         Args:
             city (str): The city to filter.
@@ -408,24 +709,11 @@ class PropertyOnSaleDB:
                  404 if no data is found,
                  500 if a database error occurs.
         """
-        mongo_client = get_default_mongo_db()
-        if mongo_client is None:
-            logger.error("Mongo client not initialized.")
+        rollups = self.get_rollups({"city": city, "neighbourhood": neighbourhood}, "analytics_5")
+        if rollups is None:
             return 500
-        try:
-            pipeline = [
-            # Average bed_number, bath_number and area for each type of property
-                {"$match": {"city": city, "neighbourhood": neighbourhood}},
-                {"$group": {"_id": "$type", "avg_bed_number": {"$avg": "$bed_number"}, "avg_bath_number": {"$avg": "$bath_number"}, "avg_area": {"$avg": "$area"}}},
-                {"$project": {"type": "$_id", "avg_bed_number": 1, "avg_bath_number": 1, "avg_area": 1, "_id": 0}}
-            ]
-            aggregation_result = mongo_client.PropertyOnSale.aggregate(pipeline)
-        except Exception as e:
-            logger.error("Error during analytics_5: %s", e)
-            return 500
-        
-        aggregation_list = list(aggregation_result)
-        if not aggregation_list or len(aggregation_list) == 0:
+        aggregation_list = analytics_5_from_rollups(rollups)
+        if not aggregation_list:
             return 404
         self.analytics_5_result = aggregation_list
         return 200
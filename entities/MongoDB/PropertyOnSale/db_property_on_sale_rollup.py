@@ -0,0 +1,263 @@
+from typing import Optional, List, Dict, Any
+from pymongo import UpdateOne
+from setup.mongo_setup.mongo_setup import get_default_mongo_db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Precomputed sums and counts of the properties on sale, one document per (city, neighbourhood, type),
+# maintained by every write of PropertyOnSaleDB and AsyncPropertyOnSaleDB and rebuilt by rebuild().
+ROLLUP_COLLECTION = "PropertyOnSaleRollup"
+# Fields of a property on sale read by the rollups
+ROLLUP_SOURCE_FIELDS = ["city", "neighbourhood", "type", "price", "area", "bed_number", "bath_number"]
+ROLLUP_PROJECTION = {field: 1 for field in ROLLUP_SOURCE_FIELDS}
+ROLLUP_KEY_FIELDS = ["city", "neighbourhood", "type"]
+# Counters of a rollup. The price counters only cover the properties with an area greater than 1,
+# as analytics_1 and analytics_4 do. A sum only adds the numeric values, and its count counts them,
+# so that the averages ignore the missing values like $avg.
+ROLLUP_COUNTERS = [
+    "count",
+    "area_sum", "area_count",
+    "bed_number_sum", "bed_number_count",
+    "bath_number_sum", "bath_number_count",
+    "priced_count",
+    "price_sum", "price_count",
+    "price_per_square_meter_sum", "price_per_square_meter_count",
+]
+
+
+def is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def rollup_key(property_on_sale: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Args:
+        property_on_sale (dict): The property on sale document.
+
+    Returns:
+        dict: The city, neighbourhood and type of the rollup of the property.
+    """
+    return {field: property_on_sale.get(field) for field in ROLLUP_KEY_FIELDS}
+
+
+def rollup_increments(property_on_sale: Dict[str, Any], sign: int = 1) -> Dict[str, float]:
+    """
+    Args:
+        property_on_sale (dict): The property on sale document.
+        sign (int): 1 to add the property to its rollup, -1 to remove it.
+
+    Returns:
+        dict: The increments of the counters of the rollup of the property.
+    """
+    increments = {counter: 0 for counter in ROLLUP_COUNTERS}
+    increments["count"] = 1
+    for field in ("area", "bed_number", "bath_number"):
+        if is_number(property_on_sale.get(field)):
+            increments[f"{field}_sum"] = property_on_sale[field]
+            increments[f"{field}_count"] = 1
+    area = property_on_sale.get("area")
+    price = property_on_sale.get("price")
+    if is_number(area) and area > 1:
+        increments["priced_count"] = 1
+        if is_number(price):
+            increments["price_sum"] = price
+            increments["price_count"] = 1
+            increments["price_per_square_meter_sum"] = price / area
+            increments["price_per_square_meter_count"] = 1
+    return {counter: sign * value for counter, value in increments.items()}
+
+
+def build_rollup_updates(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> List[UpdateOne]:
+    """
+    Build the rollup updates of a write of a property on sale.
+
+    Args:
+        before (dict, optional): The property before the write, None for a creation.
+        after (dict, optional): The property after the write, None for a deletion.
+
+    Returns:
+        list: The UpdateOne operations on ROLLUP_COLLECTION, empty if the rollups do not change.
+    """
+    changes: Dict[tuple, Dict[str, float]] = {}
+    for property_on_sale, sign in ((before, -1), (after, 1)):
+        if property_on_sale is None:
+            continue
+        key = tuple(rollup_key(property_on_sale).items())
+        increments = changes.setdefault(key, {counter: 0 for counter in ROLLUP_COUNTERS})
+        for counter, value in rollup_increments(property_on_sale, sign).items():
+            increments[counter] += value
+    updates = []
+    for key, increments in changes.items():
+        increments = {counter: value for counter, value in increments.items() if value != 0}
+        if increments:
+            updates.append(UpdateOne(dict(key), {"$inc": increments}, upsert=True))
+    return updates
+
+
+def number_or_zero(field: str) -> Dict[str, Any]:
+    return {"$cond": [{"$isNumber": f"${field}"}, f"${field}", 0]}
+
+
+def one_if(condition: Dict[str, Any]) -> Dict[str, Any]:
+    return {"$cond": [condition, 1, 0]}
+
+
+# Properties with a numeric area greater than 1, and with a numeric price too
+PRICED_CONDITION = {"$and": [{"$isNumber": "$area"}, {"$gt": ["$area", 1]}]}
+PRICED_WITH_PRICE_CONDITION = {"$and": [PRICED_CONDITION, {"$isNumber": "$price"}]}
+
+# Full computation of the rollups, replacing ROLLUP_COLLECTION
+ROLLUP_REBUILD_PIPELINE = [
+    {"$project": ROLLUP_PROJECTION},
+    {"$group": {
+        "_id": {field: f"${field}" for field in ROLLUP_KEY_FIELDS},
+        "count": {"$sum": 1},
+        **{
+            counter: accumulator
+            for field in ("area", "bed_number", "bath_number")
+            for counter, accumulator in (
+                (f"{field}_sum", {"$sum": number_or_zero(field)}),
+                (f"{field}_count", {"$sum": one_if({"$isNumber": f"${field}"})}),
+            )
+        },
+        "priced_count": {"$sum": one_if(PRICED_CONDITION)},
+        "price_sum": {"$sum": {"$cond": [PRICED_WITH_PRICE_CONDITION, "$price", 0]}},
+        "price_count": {"$sum": one_if(PRICED_WITH_PRICE_CONDITION)},
+        "price_per_square_meter_sum": {"$sum": {"$cond": [PRICED_WITH_PRICE_CONDITION, {"$divide": ["$price", "$area"]}, 0]}},
+        "price_per_square_meter_count": {"$sum": one_if(PRICED_WITH_PRICE_CONDITION)},
+    }},
+    {"$project": {"_id": 0, **{field: f"$_id.{field}" for field in ROLLUP_KEY_FIELDS}, **{counter: 1 for counter in ROLLUP_COUNTERS}}},
+    {"$out": ROLLUP_COLLECTION},
+]
+
+
+def average(rollup: Dict[str, Any], field: str) -> Optional[float]:
+    return rollup[f"{field}_sum"] / rollup[f"{field}_count"] if rollup.get(f"{field}_count", 0) > 0 else None
+
+
+def merge_rollups(rollups: List[Dict[str, Any]], group_by: str) -> Dict[Any, Dict[str, float]]:
+    """
+    Args:
+        rollups (list): The rollups to merge.
+        group_by (str): The key field to group the rollups by.
+
+    Returns:
+        dict: The sums of the counters of the rollups, by value of the key field.
+    """
+    merged: Dict[Any, Dict[str, float]] = {}
+    for rollup in rollups:
+        totals = merged.setdefault(rollup.get(group_by), {counter: 0 for counter in ROLLUP_COUNTERS})
+        for counter in ROLLUP_COUNTERS:
+            totals[counter] += rollup.get(counter, 0)
+    return merged
+
+
+def analytics_1_from_rollups(rollups: List[Dict[str, Any]], order_by: int = 1) -> List[Dict[str, Any]]:
+    """
+    Args:
+        rollups (list): The rollups of the city, of the type if given.
+        order_by (int): 1 to sort by increasing average price, -1 by decreasing.
+
+    Returns:
+        list: The average price per square meter of every neighbourhood.
+    """
+    result = [
+        {"neighbourhood": neighbourhood, "avg_price": average(totals, "price_per_square_meter")}
+        for neighbourhood, totals in merge_rollups(rollups, "neighbourhood").items()
+        if totals["priced_count"] > 0
+    ]
+    # A missing average sorts first, as null in MongoDB
+    result.sort(key=lambda row: (row["avg_price"] is not None, row["avg_price"] or 0), reverse=order_by == -1)
+    return result
+
+
+def analytics_4_from_rollups(rollups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Args:
+        rollups (list): The rollups of the city.
+
+    Returns:
+        list: The average price and the number of properties of every type.
+    """
+    return [
+        {"type": property_type, "avg_price": average(totals, "price"), "count": totals["priced_count"]}
+        for property_type, totals in merge_rollups(rollups, "type").items()
+        if totals["priced_count"] > 0
+    ]
+
+
+def analytics_5_from_rollups(rollups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Args:
+        rollups (list): The rollups of the neighbourhood.
+
+    Returns:
+        list: The average bed_number, bath_number and area of every type.
+    """
+    return [
+        {
+            "type": property_type,
+            "avg_bed_number": average(totals, "bed_number"),
+            "avg_bath_number": average(totals, "bath_number"),
+            "avg_area": average(totals, "area"),
+        }
+        for property_type, totals in merge_rollups(rollups, "type").items()
+        if totals["count"] > 0
+    ]
+
+
+class PropertyOnSaleRollupDB:
+    """
+    Maintenance of the analytics rollups. Every write of a property on sale applies the difference
+    between the property before and after the write; rebuild recomputes them from PropertyOnSale.
+    """
+
+    def apply(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> int:
+        """
+        Apply the write of a property on sale to the rollups.
+
+        Args:
+            before (dict, optional): The property before the write, None for a creation.
+            after (dict, optional): The property after the write, None for a deletion.
+
+        Returns:
+            int: 200 if the rollups are updated,
+                 500 if a database error occurs.
+        """
+        updates = build_rollup_updates(before, after)
+        if not updates:
+            return 200
+        mongo_client = get_default_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            mongo_client[ROLLUP_COLLECTION].bulk_write(updates, ordered=False)
+            # The groups left without properties
+            rollup_keys = [rollup_key(property_on_sale) for property_on_sale in (before, after) if property_on_sale is not None]
+            mongo_client[ROLLUP_COLLECTION].delete_many({"$or": rollup_keys, "count": {"$lte": 0}})
+        except Exception as e:
+            # The rollups drift until the next rebuild
+            logger.error("Error updating the analytics rollups: %s", e)
+            return 500
+        return 200
+
+    def rebuild(self) -> int:
+        """
+        Recompute all the rollups from the properties on sale.
+
+        Returns:
+            int: 200 if the rollups are rebuilt,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            mongo_client.PropertyOnSale.aggregate(ROLLUP_REBUILD_PIPELINE)
+        except Exception as e:
+            logger.error("Error rebuilding the analytics rollups: %s", e)
+            return 500
+        return 200
@@ -107,4 +107,64 @@ class PropertyOnSale(BaseModel):
     
 
     
-    
\ No newline at end of file
+    
+
+# Common street abbreviations, expanded so that "123 Main St." and "123 main street" share the same tokens
+ADDRESS_ABBREVIATIONS = {
+    "st": "street",
+    "ave": "avenue",
+    "av": "avenue",
+    "rd": "road",
+    "blvd": "boulevard",
+    "dr": "drive",
+    "ln": "lane",
+    "ct": "court",
+    "pl": "place",
+    "sq": "square",
+    "pkwy": "parkway",
+    "hwy": "highway",
+    "ter": "terrace",
+    "cir": "circle",
+    "apt": "apartment",
+    "ste": "suite",
+    "fl": "floor",
+    "n": "north",
+    "s": "south",
+    "e": "east",
+    "w": "west",
+    "ne": "northeast",
+    "nw": "northwest",
+    "se": "southeast",
+    "sw": "southwest"
+}
+
+def split_address(address: str) -> List[str]:
+    """
+    Args:
+        address (str): The address to split (e.g. "123 Main St., Apt 4").
+
+    Returns:
+        List[str]: The lowercased words of the address without punctuation, abbreviations are not expanded
+                   (e.g. ["123", "main", "st", "apt", "4"]).
+    """
+    if not address:
+        return []
+    return re.sub(r"[^a-z0-9]+", " ", address.lower()).split()
+
+def tokenize_address(address: str) -> List[str]:
+    """
+    Normalize an address and split it into search tokens: the address is lowercased, punctuation
+    is removed and abbreviations are expanded, street numbers are kept as separate tokens.
+
+    Args:
+        address (str): The address to tokenize (e.g. "123 Main St., Apt 4").
+
+    Returns:
+        List[str]: The unique tokens in order of appearance (e.g. ["123", "main", "street", "apartment", "4"]).
+    """
+    tokens = []
+    for token in split_address(address):
+        token = ADDRESS_ABBREVIATIONS.get(token, token)
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
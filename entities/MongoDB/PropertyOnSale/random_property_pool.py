@@ -0,0 +1,206 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.base import ConflictingIdError
+from entities.MongoDB.PropertyOnSale.property_on_sale import PropertyOnSale
+from entities.MongoDB.PropertyOnSale.db_property_on_sale import PropertyOnSaleDB
+from setup.redis_setup.redis_setup import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Number of properties sampled from MongoDB at every refresh
+POOL_SIZE = 300
+# Period of the scheduled refresh
+REFRESH_INTERVAL_MINUTES = 10
+# Delay of the refresh triggered by a listing write, writes in this window share the same refresh
+REFRESH_DEBOUNCE_SECONDS = 5
+REFRESH_JOB_ID = "random_property_pool_refresh"
+# Sorted set of the properties discarded by any process, scored by the time of the discard. Every
+# process publishes its discards there and removes the ones of the others from its pool.
+DISCARDED_KEY = "random_property_pool:discarded"
+# Period of the exchange of the discards with the other processes
+DISCARD_SYNC_SECONDS = 5
+# A discard is kept until every process has refreshed its pool after it
+DISCARD_RETENTION_SECONDS = REFRESH_INTERVAL_MINUTES * 60 + 60
+# Tolerance on the clocks of the processes when comparing a discard with the time of a sample
+DISCARD_CLOCK_SKEW_SECONDS = 2
+
+
+class RandomPropertyPool:
+    """
+    In-process pool of pre-sampled property summaries used by the landing page,
+    so that picking random properties never queries MongoDB on the request path.
+    """
+
+    def __init__(self, size: int = POOL_SIZE):
+        self.size = size
+        # The pool is replaced as a whole, readers always see a consistent tuple
+        self.pool: tuple = ()
+        # Time of the sample the pool comes from
+        self.sampled_at = 0.0
+        # id -> time of the discards of every process, and the discards of this process not yet published
+        self.discarded: Dict[str, float] = {}
+        self.unpublished: Dict[str, float] = {}
+        # Reentrant, the cold start of pick refreshes while holding it
+        self.lock = threading.RLock()
+        # Scheduler of the periodic refresh and of the discard sync, started by the API process only
+        self.scheduler: Optional[BackgroundScheduler] = None
+
+    def is_discarded(self, property_on_sale_id: str, sampled_at: float) -> bool:
+        """
+        Args:
+            property_on_sale_id (str): The ID of the property.
+            sampled_at (float): The time of the sample the property comes from.
+
+        Returns:
+            bool: Whether the property was discarded after it was sampled, to be called holding the lock.
+        """
+        discarded_at = self.discarded.get(property_on_sale_id)
+        return discarded_at is not None and discarded_at >= sampled_at - DISCARD_CLOCK_SKEW_SECONDS
+
+    def refresh(self) -> int:
+        """
+        Replace the pool with a new random sample of properties on sale. The properties discarded
+        while the sample was running are removed from it.
+
+        Returns:
+            int: 200 if the pool is refreshed,
+                 404 if there are no properties on sale,
+                 500 if a database error occurs.
+        """
+        sampled_at = time.time()
+        db_property_on_sale = PropertyOnSaleDB(PropertyOnSale())
+        status = db_property_on_sale.get_random_properties(self.size)
+        if status == 404:
+            with self.lock:
+                self.pool = ()
+                self.sampled_at = sampled_at
+        if status != 200:
+            return status
+        # $sample can return the same document more than once
+        unique_properties = {p.property_on_sale_id: p for p in db_property_on_sale.property_on_sale_list}
+        with self.lock:
+            self.pool = tuple(p for p in unique_properties.values() if not self.is_discarded(p.property_on_sale_id, sampled_at))
+            self.sampled_at = sampled_at
+        return 200
+
+    def pick(self, n: int = 6) -> Optional[List[PropertyOnSale]]:
+        """
+        Pick n random properties from the pool. MongoDB is queried only if the pool is still empty (cold start).
+
+        Args:
+            n (int): Number of properties to pick (default is 6).
+
+        Returns:
+            list | None: The picked properties, an empty list if there are no properties on sale, None if the pool could not be filled.
+        """
+        pool = self.pool
+        if not pool:
+            with self.lock:
+                if not self.pool:
+                    status = self.refresh()
+                    if status == 500:
+                        return None
+            pool = self.pool
+        return random.sample(pool, min(n, len(pool)))
+
+    def discard(self, property_on_sale_id: str):
+        """
+        Remove a property from the pool, used when it is sold, deleted or its summary changes.
+        The discard reaches the other processes at their next sync_discards.
+
+        Args:
+            property_on_sale_id (str): The ID of the property to remove.
+        """
+        discarded_at = time.time()
+        with self.lock:
+            self.discarded[property_on_sale_id] = discarded_at
+            self.unpublished[property_on_sale_id] = discarded_at
+            self.pool = tuple(p for p in self.pool if p.property_on_sale_id != property_on_sale_id)
+
+    def sync_discards(self) -> int:
+        """
+        Publish the discards of this process to Redis and apply the recent discards of all the processes
+        to the pool. Runs in the scheduler, so that the request path never waits for Redis.
+
+        Returns:
+            int: 200 if the discards are exchanged,
+                 500 if there's a Redis error.
+        """
+        now = time.time()
+        with self.lock:
+            unpublished, self.unpublished = self.unpublished, {}
+        try:
+            pipe = get_redis_client().pipeline()
+            if unpublished:
+                pipe.zadd(DISCARDED_KEY, unpublished)
+            pipe.zremrangebyscore(DISCARDED_KEY, "-inf", now - DISCARD_RETENTION_SECONDS)
+            pipe.expire(DISCARDED_KEY, DISCARD_RETENTION_SECONDS)
+            pipe.zrange(DISCARDED_KEY, 0, -1, withscores=True)
+            discards = pipe.execute()[-1]
+        except Exception as e:
+            logger.error("Error exchanging the discarded properties of the random property pool: %s", e)
+            with self.lock:
+                # Published at the next sync
+                self.unpublished = {**unpublished, **self.unpublished}
+            return 500
+        with self.lock:
+            for member, discarded_at in discards:
+                property_on_sale_id = member.decode("utf-8") if isinstance(member, bytes) else member
+                self.discarded[property_on_sale_id] = max(discarded_at, self.discarded.get(property_on_sale_id, 0.0))
+            self.discarded = {
+                property_on_sale_id: discarded_at
+                for property_on_sale_id, discarded_at in self.discarded.items()
+                if discarded_at >= now - DISCARD_RETENTION_SECONDS
+            }
+            self.pool = tuple(p for p in self.pool if not self.is_discarded(p.property_on_sale_id, self.sampled_at))
+        return 200
+
+    def start(self) -> None:
+        """
+        Start the periodic refresh of the pool and the exchange of the discards, if not running yet.
+        """
+        with self.lock:
+            if self.scheduler is not None:
+                return
+            self.scheduler = BackgroundScheduler()
+            self.scheduler.add_job(self.refresh, 'interval', minutes=REFRESH_INTERVAL_MINUTES)
+            self.scheduler.add_job(self.sync_discards, 'interval', seconds=DISCARD_SYNC_SECONDS)
+            self.scheduler.start()
+
+    def stop(self) -> None:
+        """
+        Stop the scheduler of the pool, the pool keeps the properties it holds.
+        """
+        with self.lock:
+            scheduler, self.scheduler = self.scheduler, None
+        if scheduler is not None:
+            scheduler.shutdown(wait=False)
+
+    def schedule_refresh(self):
+        """
+        Schedule a background refresh after a listing write, if one is not already pending.
+        Nothing is scheduled if the pool is not started, e.g. in the bulk tools.
+        """
+        scheduler = self.scheduler
+        if scheduler is None:
+            return
+        try:
+            scheduler.add_job(
+                self.refresh,
+                'date',
+                run_date=datetime.now() + timedelta(seconds=REFRESH_DEBOUNCE_SECONDS),
+                id=REFRESH_JOB_ID
+            )
+        except ConflictingIdError:
+            # A refresh is already pending
+            pass
+        except Exception as e:
+            logger.error("Error scheduling the random property pool refresh: %s", e)
+
+
+random_property_pool = RandomPropertyPool()
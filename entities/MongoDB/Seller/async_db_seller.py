@@ -0,0 +1,464 @@
+from typing import Optional
+from datetime import datetime
+from bson.objectid import ObjectId
+from setup.mongo_setup.mongo_setup import get_default_async_mongo_db
+from entities.MongoDB.user_profile_cache import seller_profile_cache
+from entities.MongoDB.Seller.seller import Seller, SoldProperty, SellerPropertyOnSale
+from entities.MongoDB.Seller.db_seller import (
+    SOLD_PROPERTY_COLLECTION, build_properties_on_sale_filter_pipeline, build_sold_properties_filter, build_sold_property_document,
+    build_embedded_sold_properties_push, sold_property_from_document, build_embedded_property_update,
+    build_open_house_events, build_sold_properties_statistics_pipeline, build_avg_time_to_sell_pipeline
+)
+from modules.Seller.models.seller_models import Analytics2Input, Analytics3Input
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncSellerDB:
+    """
+    Async counterpart of SellerDB, used by the request path.
+    Same methods, same status codes and same attributes, backed by the Motor client.
+    """
+    def __init__(self, seller: Optional[Seller] = None):
+        self.seller = seller
+        self.current_open_house_events = None
+        self.analytics_2_result = None
+        self.analytics_3_result = None
+
+    async def get_profile_info(self) -> int:
+        """
+        Retrieve the profile information of the seller, excluding properties_on_sale, sold_properties and the password.
+
+        Returns:
+            int: 200 if the seller information is retrieved,
+                 400 if seller_id is invalid,
+                 404 if seller is not found,
+                 500 if a database error occurs.
+        """
+        if not ObjectId.is_valid(self.seller.seller_id):
+            return 400
+        cached, version = await seller_profile_cache.get(self.seller.seller_id)
+        if cached is not None:
+            self.seller = cached
+            return 200
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            result = await mongo_client.Seller.find_one({"_id": ObjectId(self.seller.seller_id)}, {"properties_on_sale": 0, "sold_properties": 0, "password": 0})
+        except Exception as e:
+            logger.error(f"Error retrieving seller with id {self.seller.seller_id}: {e}")
+            return 500
+        if not result:
+            return 404
+        result["seller_id"] = str(result.pop("_id"))
+        self.seller = Seller(**result)
+        await seller_profile_cache.put(self.seller, version)
+        return 200
+
+    async def get_seller_by_email(self, email: str, with_password: bool = False) -> int:
+        """
+        Retrieve the seller information by email.
+
+        Args:
+            email (str): The email of the seller.
+            with_password (bool): Whether the password hash is needed, it is read from MongoDB
+                                  as the cached profiles do not have it.
+
+        Returns:
+            int: 200 if seller is found,
+                 400 if email is not provided,
+                 404 if seller is not found,
+                 500 if a database error occurs.
+        """
+        if not email:
+            return 400
+        version = None
+        if not with_password:
+            cached, version = await seller_profile_cache.get_by_email(email)
+            if cached is not None:
+                self.seller = cached
+                return 200
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            result = await mongo_client.Seller.find_one({"email": email}, {"properties_on_sale": 0, "sold_properties": 0})
+        except Exception as e:
+            logger.error(f"Error retrieving seller with email {email}: {e}")
+            return 500
+        if not result:
+            return 404
+        result["seller_id"] = str(result.pop("_id"))
+        self.seller = Seller(**result)
+        await seller_profile_cache.put(self.seller, version)
+        return 200
+
+    async def create_seller(self) -> int:
+        """
+        Create a new seller in the MongoDB.
+
+        Returns:
+            int: 201 if the seller is created successfully,
+                 400 if seller is not provided,
+                 500 if there's an error during insertion.
+        """
+        if not self.seller:
+            return 400
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            result = await mongo_client.Seller.insert_one(
+                self.seller.model_dump(exclude_none=True, exclude={"seller_id"})
+            )
+        except Exception as e:
+            logger.error(f"Error inserting seller: {e}")
+            return 500
+        if result.inserted_id:
+            self.seller.seller_id = str(result.inserted_id)
+            return 201
+        logger.error("Creation of seller with email %s failed.", self.seller.email)
+        return 500
+
+    async def update_seller(self, seller: Seller) -> int:
+        """
+        Update seller information.
+
+        Args:
+            seller (Seller): The updated seller data.
+
+        Returns:
+            int: 200 if the update is successful,
+                 400 if seller_id is invalid,
+                 404 if seller is not found,
+                 500 if a database error occurs.
+        """
+        if not ObjectId.is_valid(self.seller.seller_id):
+            return 400
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            result = await mongo_client.Seller.update_one(
+                {"_id": ObjectId(self.seller.seller_id)},
+                {"$set": seller.model_dump(exclude_none=True, exclude={"seller_id"})}
+            )
+        except Exception as e:
+            logger.error(f"Error updating seller with id {self.seller.seller_id}: {e}")
+            return 500
+        await seller_profile_cache.invalidate(self.seller.seller_id)
+        if result.matched_count == 0:
+            return 404
+        return 200
+
+    async def get_property_on_sale_filtered(self, city: str, neighbourhood: str, address: str) -> int:
+        """
+        Retrieve properties on sale for the seller filtered by city, neighbourhood, and address.
+
+        Args:
+            city (str): The city to filter by.
+            neighbourhood (str): The neighbourhood to filter by.
+            address (str): The address to filter by.
+
+        Returns:
+            int: 200 if properties matching the filter are found,
+                 404 if no properties match,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        pipeline = build_properties_on_sale_filter_pipeline(self.seller.seller_id, city, neighbourhood, address)
+        try:
+            result = await mongo_client.Seller.aggregate(pipeline).to_list(length=1)
+        except Exception as e:
+            logger.error(f"Error retrieving filtered properties for seller {self.seller.seller_id}: {e}")
+            return 500
+        properties = result[0].get("properties_on_sale") if result else None
+        if not properties:
+            return 404
+        for property_on_sale in properties:
+            property_on_sale["property_on_sale_id"] = str(property_on_sale.pop("_id"))
+        self.seller.properties_on_sale = [SellerPropertyOnSale(**property_on_sale) for property_on_sale in properties]
+        return 200
+
+    async def get_sold_properties_filtered(self, city: str, neighbourhood: str) -> int:
+        """
+        Retrieve sold properties for the seller, sorted by sell_date descending.
+
+        Args:
+            city (str): The city to filter by.
+            neighbourhood (str): The neighbourhood to filter by.
+
+        Returns:
+            int: 200 if sold properties are found,
+                 404 if sold properties are not found,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        query = build_sold_properties_filter(self.seller.seller_id, city, neighbourhood)
+        try:
+            sold_properties = await mongo_client[SOLD_PROPERTY_COLLECTION].find(query).sort("sell_date", -1).to_list(length=None)
+        except Exception as e:
+            logger.error(f"Error retrieving sold properties for seller {self.seller.seller_id}: {e}")
+            return 500
+        if not sold_properties:
+            return 404
+        self.seller.sold_properties = [sold_property_from_document(sold_property) for sold_property in sold_properties]
+        return 200
+
+    async def insert_property_on_sale(self, property_on_sale: SellerPropertyOnSale) -> int:
+        """
+        Insert a new property on sale into the seller's document.
+
+        Args:
+            property_on_sale (SellerPropertyOnSale): The property data to insert.
+
+        Returns:
+            int: 200 if the property is inserted successfully,
+                 404 if the seller is not found,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        data = property_on_sale.model_dump(exclude_none=True, exclude={"property_on_sale_id"})
+        data = {"_id": ObjectId(property_on_sale.property_on_sale_id), **data}
+        try:
+            result = await mongo_client.Seller.update_one(
+                {"_id": ObjectId(self.seller.seller_id)},
+                {"$push": {"properties_on_sale": data}}
+            )
+        except Exception as e:
+            logger.error(f"Error inserting property on sale: {e}")
+            return 500
+        if result.matched_count == 0:
+            return 404
+        return 200
+
+    async def update_property_on_sale(self, property_on_sale: SellerPropertyOnSale) -> int:
+        """
+        Update an existing property on sale in the seller's document.
+
+        Args:
+            property_on_sale (SellerPropertyOnSale): The property data with updated fields.
+
+        Returns:
+            int: 200 if the property is updated successfully,
+                 404 if the property is not found,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        update_set = build_embedded_property_update(property_on_sale)
+        try:
+            result = await mongo_client.Seller.update_one(
+                {"_id": ObjectId(self.seller.seller_id), "properties_on_sale._id": ObjectId(property_on_sale.property_on_sale_id)},
+                {"$set": update_set}
+            )
+        except Exception as e:
+            logger.error(f"Error updating property on sale: {e}")
+            return 500
+        if result.matched_count == 0:
+            return 404
+        return 200
+
+    async def delete_embedded(self, property_on_sale_id: str) -> int:
+        """
+        Delete an embedded property on sale from the seller's document.
+
+        Args:
+            property_on_sale_id (str): The id of the property to delete.
+
+        Returns:
+            int: 200 if the property is deleted successfully,
+                 404 if the property is not found or not modified,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            result = await mongo_client.Seller.update_one(
+                {"_id": ObjectId(self.seller.seller_id)},
+                {"$pull": {"properties_on_sale": {"_id": ObjectId(property_on_sale_id)}}}
+            )
+        except Exception as e:
+            logger.error(f"Error deleting property on sale: {e}")
+            return 500
+        if result.matched_count == 0 or result.modified_count == 0:
+            return 404
+        return 200
+
+    async def sell_property(self, property: SoldProperty) -> int:
+        """
+        Move a property from properties_on_sale to the SoldProperty collection, and to the most recent
+        sold_properties embedded in the seller document.
+
+        Args:
+            property (SoldProperty): The property being sold.
+
+        Returns:
+            int: 200 if the property is sold successfully,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        id_p = ObjectId(property.sold_property_id)
+        document = build_sold_property_document(self.seller.seller_id, property)
+        try:
+            await mongo_client[SOLD_PROPERTY_COLLECTION].replace_one({"_id": id_p}, document, upsert=True)
+        except Exception as e:
+            logger.error(f"Error selling property: {e}")
+            return 500
+        document.pop("seller_id")
+        try:
+            await mongo_client.Seller.update_one(
+                {"_id": ObjectId(self.seller.seller_id)},
+                {
+                    "$push": build_embedded_sold_properties_push([document]),
+                    "$pull": {"properties_on_sale": {"_id": id_p}}
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error selling property: {e}")
+            # Rollback, the property is still on sale
+            try:
+                await mongo_client[SOLD_PROPERTY_COLLECTION].delete_one({"_id": id_p})
+            except Exception as e:
+                logger.error(f"Error rolling back the sold property {property.sold_property_id}: {e}")
+            return 500
+        return 200
+
+    async def check_property_on_sale(self, property_on_sale_id: str) -> int:
+        """
+        Check whether a property on sale exists for the seller.
+
+        Args:
+            property_on_sale_id (str): The id of the property to check.
+
+        Returns:
+            int: 200 if the property exists,
+                 500 if a database error occurs,
+                 404 if the property is not found.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            result = await mongo_client.Seller.find_one(
+                {"_id": ObjectId(self.seller.seller_id), "properties_on_sale._id": ObjectId(property_on_sale_id)},
+                {"_id": 1}
+            )
+        except Exception as e:
+            logger.error(f"Error checking property on sale: {e}")
+            return 500
+        if not result:
+            return 404
+        return 200
+
+    async def get_open_house_today(self) -> int:
+        """
+        Retrieve open house events for the current day for the seller.
+
+        Returns:
+            int: 200 if events are found,
+                 404 if no events are found,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        try:
+            result = await mongo_client.Seller.find_one(
+                {"_id": ObjectId(self.seller.seller_id)},
+                {"properties_on_sale": 1}
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving properties on sale for seller {self.seller.seller_id}: {e}")
+            return 500
+        if not result or not result.get("properties_on_sale"):
+            return 404
+        open_house_events = build_open_house_events(result["properties_on_sale"])
+        if not open_house_events:
+            return 404
+        self.current_open_house_events = open_house_events
+        return 200
+
+    async def get_sold_properties_statistics(self, input: Analytics2Input) -> int:
+        """
+        Retrieve sold properties statistics (houses sold and revenue) grouped by neighbourhood.
+
+        Args:
+            input (Analytics2Input): Input parameters including date range and city.
+
+        Returns:
+            int: 200 if statistics are retrieved successfully,
+                 400 if the date range is invalid,
+                 404 if no data is found,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        start = datetime.strptime(input.start_date, "%Y-%m-%d")
+        end = datetime.strptime(input.end_date, "%Y-%m-%d")
+        if start > end:
+            return 400
+        pipeline = build_sold_properties_statistics_pipeline(self.seller.seller_id, input, start, end)
+        try:
+            aggregation_list = await mongo_client[SOLD_PROPERTY_COLLECTION].aggregate(pipeline).to_list(length=None)
+        except Exception as e:
+            logger.error(f"Error retrieving analytics 2: {e}")
+            return 500
+        if not aggregation_list:
+            return 404
+        self.analytics_2_result = aggregation_list
+        return 200
+
+    async def get_avg_time_to_sell(self, input: Analytics3Input) -> int:
+        """
+        Calculate the average time to sell properties grouped by neighbourhood.
+
+        Args:
+            input (Analytics3Input): Input parameters including start date and city.
+
+        Returns:
+            int: 200 if the average time is calculated successfully,
+                 404 if no data is found,
+                 500 if a database error occurs.
+        """
+        mongo_client = get_default_async_mongo_db()
+        if mongo_client is None:
+            logger.error("Mongo client not initialized.")
+            return 500
+        start = datetime.strptime(input.start_date, "%Y-%m-%d")
+        end = datetime.strptime(input.end_date, "%Y-%m-%d")
+        pipeline = build_avg_time_to_sell_pipeline(self.seller.seller_id, input, start, end)
+        try:
+            aggregation_list = await mongo_client[SOLD_PROPERTY_COLLECTION].aggregate(pipeline).to_list(length=None)
+        except Exception as e:
+            logger.error(f"Error retrieving analytics 3: {e}")
+            return 500
+        if not aggregation_list:
+            return 404
+        self.analytics_3_result = aggregation_list
+        return 200
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from bson.objectid import ObjectId
 from setup.mongo_setup.mongo_setup import get_default_mongo_db
@@ -9,6 +9,254 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# The sold properties live in their own collection, one document per property with the seller_id,
+# read by seller_id, city and a sell_date range so that the history of a seller is split by time
+# along the (seller_id, city, sell_date) index. The seller document only embeds the most recent ones.
+SOLD_PROPERTY_COLLECTION = "SoldProperty"
+SOLD_PROPERTIES_EMBEDDED_LIMIT = 20
+
+# Helpers shared by SellerDB and AsyncSellerDB
+
+def build_properties_on_sale_filter_pipeline(seller_id: str, city: str, neighbourhood: str, address: str) -> List[Dict[str, Any]]:
+    """
+    Build the aggregation that returns the seller's properties on sale filtered by city, neighbourhood and address.
+
+    Args:
+        seller_id (str): The ID of the seller.
+        city (str): The city to filter by, ignored if empty.
+        neighbourhood (str): The neighbourhood to filter by, ignored if empty.
+        address (str): The address to filter by, ignored if empty.
+
+    Returns:
+        list: The aggregation pipeline.
+    """
+    return [
+        { "$match": { "_id": ObjectId(seller_id) } },
+        { "$project": {
+            "_id": 0,
+            "properties_on_sale": {
+                "$filter": {
+                    "input": "$properties_on_sale",
+                    "as": "property",
+                    "cond": {
+                        "$and": [
+                            { "$eq": ["$$property.city", city] } if city else {},
+                            { "$eq": ["$$property.neighbourhood", neighbourhood] } if neighbourhood else {},
+                            { "$eq": ["$$property.address", address] } if address else {}
+                        ]
+                    }
+                }
+            }
+        }}
+    ]
+
+def build_sold_properties_filter(seller_id: str, city: str, neighbourhood: str) -> Dict[str, Any]:
+    """
+    Build the query that returns the seller's sold properties filtered by city and neighbourhood.
+
+    Args:
+        seller_id (str): The ID of the seller.
+        city (str): The city to filter by, ignored if empty.
+        neighbourhood (str): The neighbourhood to filter by, ignored if empty.
+
+    Returns:
+        dict: The filter on SOLD_PROPERTY_COLLECTION.
+    """
+    query: Dict[str, Any] = {"seller_id": ObjectId(seller_id)}
+    if city:
+        query["city"] = city
+    if neighbourhood:
+        query["neighbourhood"] = neighbourhood
+    return query
+
+def build_sold_property_document(seller_id: str, property: SoldProperty) -> Dict[str, Any]:
+    """
+    Build the document of a sold property in SOLD_PROPERTY_COLLECTION.
+
+    Args:
+        seller_id (str): The ID of the seller.
+        property (SoldProperty): The property being sold.
+
+    Returns:
+        dict: The document, with the id of the property as _id.
+    """
+    return {
+        "_id": ObjectId(property.sold_property_id),
+        "seller_id": ObjectId(seller_id),
+        **property.model_dump(exclude={"sold_property_id"})
+    }
+
+def build_embedded_sold_properties_push(sold_properties: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the $push of sold properties into the seller document, which keeps only the most recent ones.
+
+    Args:
+        sold_properties (list): The embedded sold properties to add, possibly empty to only trim the array.
+
+    Returns:
+        dict: The $push document.
+    """
+    return {
+        "sold_properties": {
+            "$each": sold_properties,
+            "$sort": {"sell_date": -1},
+            "$slice": SOLD_PROPERTIES_EMBEDDED_LIMIT
+        }
+    }
+
+def sold_property_from_document(document: Dict[str, Any]) -> SoldProperty:
+    """
+    Args:
+        document (dict): The document of SOLD_PROPERTY_COLLECTION.
+
+    Returns:
+        SoldProperty: The sold property.
+    """
+    document.pop("seller_id", None)
+    document["sold_property_id"] = str(document.pop("_id"))
+    return SoldProperty(**document)
+
+def build_embedded_property_update(property_on_sale: SellerPropertyOnSale) -> Dict[str, Any]:
+    """
+    Build the $set document for a partial update of a property on sale embedded in the seller document.
+
+    Args:
+        property_on_sale (SellerPropertyOnSale): The property with the fields to update, the others set to None.
+
+    Returns:
+        dict: The fields to set, addressed through the positional operator.
+    """
+    a=(property_on_sale.city is not None or property_on_sale.neighbourhood is not None or property_on_sale.address is not None or property_on_sale.price is not None or property_on_sale.thumbnail is not None)
+    b=(property_on_sale.disponibility is not None)
+    if a: 
+        single_data_seller = {
+            f"properties_on_sale.$.{field}": value
+            for field, value in {
+                "city": property_on_sale.city,
+                "neighbourhood": property_on_sale.neighbourhood,
+                "address": property_on_sale.address,
+                "price": property_on_sale.price,
+                "thumbnail": property_on_sale.thumbnail,
+            }.items()
+            if value is not None
+        }
+    if b:
+        disponibility_data_seller = {
+            f"properties_on_sale.$.disponibility.{field}": value
+            for field, value in {
+                "day": property_on_sale.disponibility.day,
+                "time": property_on_sale.disponibility.time,
+                "max_attendees": property_on_sale.disponibility.max_attendees,
+            }.items()
+            if value is not None
+        }
+    update_set = {}
+    if a:
+        update_set |= single_data_seller
+    if b:
+        update_set |= disponibility_data_seller
+    return update_set
+
+def build_open_house_events(properties_on_sale: List[Dict[str, Any]]) -> List[OpenHouseOccurrence]:
+    """
+    Select the open house events scheduled for today among the seller's properties on sale.
+
+    Args:
+        properties_on_sale (list): The embedded properties on sale of the seller.
+
+    Returns:
+        list: The open house events of the current day.
+    """
+    # Get the current day name (e.g., Monday, Tuesday, etc.)
+    current_day = datetime.now().strftime("%A")
+    open_house_events = []
+
+    # Iterate over each property on sale and check if an open house event is scheduled for today
+    for prop in properties_on_sale:
+        disponibility = prop.get("disponibility", {})
+        if disponibility.get("day") == current_day:
+            open_house_events.append(OpenHouseOccurrence(
+                city=prop.get("city"),
+                address=prop.get("address"),
+                time=disponibility.get("time")
+            ))
+    return open_house_events
+
+def build_sold_properties_statistics_pipeline(seller_id: str, input: Analytics2Input, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """
+    Build the analytics 2 aggregation on SOLD_PROPERTY_COLLECTION: houses sold and revenue by neighbourhood.
+
+    Args:
+        seller_id (str): The ID of the seller.
+        input (Analytics2Input): Input parameters including the city.
+        start (datetime): Start of the date range.
+        end (datetime): End of the date range.
+
+    Returns:
+        list: The aggregation pipeline.
+    """
+    return [
+            {
+                "$match": {
+                    "seller_id": ObjectId(seller_id),
+                    "city": input.city,
+                    "sell_date": {"$gte": start, "$lte": end}
+                }
+            },
+            {
+                "$group": {
+                    "_id": "$neighbourhood",
+                    "houses_sold": {"$sum": 1},
+                    "revenue": {"$sum": "$price"}
+                }
+            },
+            {
+                "$project": {
+                    "neighbourhood": "$_id",
+                    "houses_sold": 1,
+                    "revenue": 1,
+                    "_id": 0
+                }
+            }
+        ]
+
+def build_avg_time_to_sell_pipeline(seller_id: str, input: Analytics3Input, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """
+    Build the analytics 3 aggregation on SOLD_PROPERTY_COLLECTION: average time to sell in days by neighbourhood.
+
+    Args:
+        seller_id (str): The ID of the seller.
+        input (Analytics3Input): Input parameters including the city.
+        start (datetime): Start of the date range.
+        end (datetime): End of the date range.
+
+    Returns:
+        list: The aggregation pipeline.
+    """
+    return [
+            {"$match": {
+                "seller_id": ObjectId(seller_id),
+                "city": input.city,
+                "sell_date": {"$gte": start, "$lte": end},
+                "registration_date": {"$gte": start, "$lte": end}
+            }},
+            {
+            "$group": {
+                "_id": "$neighbourhood",
+                "avg_time_to_sell": {"$avg": {"$divide": [{"$subtract": ["$sell_date", "$registration_date"]}, 86400000]}},
+                "num_house": {"$sum": 1}
+            }
+            },
+            {
+                "$project": {
+                    "neighbourhood": "$_id",
+                    "avg_time_to_sell": 1,
+                    "num_house": 1,
+                    "_id": 0
+                }
+            }
+        ]
+
 class SellerDB:
     def __init__(self, seller: Optional[Seller] = None):
         self.seller = seller
@@ -186,6 +434,7 @@ class SellerDB:
             return 500
         try:
             result = mongo_client.Seller.delete_one({"_id": id})
+            mongo_client[SOLD_PROPERTY_COLLECTION].delete_many({"seller_id": id})
         except Exception as e:
             logger.error(f"Error deleting seller with id {self.seller.seller_id}: {e}")
             return 500
@@ -238,25 +487,7 @@ class SellerDB:
         if mongo_client is None:
             logger.error("Mongo client not initialized.")
             return 500
-        pipeline = [
-            { "$match": { "_id": ObjectId(self.seller.seller_id) } },
-            { "$project": {
-                "_id": 0,
-                "properties_on_sale": {
-                    "$filter": {
-                        "input": "$properties_on_sale",
-                        "as": "property",
-                        "cond": {
-                            "$and": [
-                                { "$eq": ["$$property.city", city] } if city else {},
-                                { "$eq": ["$$property.neighbourhood", neighbourhood] } if neighbourhood else {},
-                                { "$eq": ["$$property.address", address] } if address else {}
-                            ]
-                        }
-                    }
-                }
-            }}
-        ]
+        pipeline = build_properties_on_sale_filter_pipeline(self.seller.seller_id, city, neighbourhood, address)
         try:
             result = mongo_client.Seller.aggregate(pipeline)
         except Exception as e:
@@ -284,38 +515,15 @@ class SellerDB:
         if mongo_client is None:
             logger.error("Mongo client not initialized.")
             return 500
-        pipeline = [
-            { "$match": { "_id": ObjectId(self.seller.seller_id) } },
-            { "$project": {
-                "_id": 0,
-                "sold_properties": {
-                    "$filter": {
-                        "input": "$sold_properties",
-                        "as": "property",
-                        "cond": {
-                            "$and": [
-                                { "$eq": ["$$property.city", city] } if city else {},
-                                { "$eq": ["$$property.neighbourhood", neighbourhood] } if neighbourhood else {}
-                            ]
-                        }
-                    }
-                }
-            }}
-        ]
+        query = build_sold_properties_filter(self.seller.seller_id, city, neighbourhood)
         try:
-            result = mongo_client.Seller.aggregate(pipeline)
+            sold_properties = list(mongo_client[SOLD_PROPERTY_COLLECTION].find(query).sort("sell_date", -1))
         except Exception as e:
             logger.error(f"Error retrieving sold properties for seller {self.seller.seller_id}: {e}")
             return 500
-        sold_properties = list(result)[0].get("sold_properties", [])
         if not sold_properties:
             return 404
-        
-        # Order the sold properties by sell_date
-        sold_properties.sort(key=lambda x: x["sell_date"], reverse=True)
-        for sold_property in sold_properties:
-            sold_property["sold_property_id"] = str(sold_property.pop("_id"))
-        self.seller.sold_properties = [SoldProperty(**sold_property) for sold_property in sold_properties]
+        self.seller.sold_properties = [sold_property_from_document(sold_property) for sold_property in sold_properties]
         return 200
       
     def insert_property_on_sale(self, property_on_sale : SellerPropertyOnSale) -> int:
@@ -363,36 +571,7 @@ class SellerDB:
         mongo_client = get_default_mongo_db()
         if mongo_client is None:
             return 500
-        # Data preparation 
-        a=(property_on_sale.city is not None or property_on_sale.neighbourhood is not None or property_on_sale.address is not None or property_on_sale.price is not None or property_on_sale.thumbnail is not None)
-        b=(property_on_sale.disponibility is not None)
-        if a: 
-            single_data_seller = {
-                f"properties_on_sale.$.{field}": value
-                for field, value in {
-                    "city": property_on_sale.city,
-                    "neighbourhood": property_on_sale.neighbourhood,
-                    "address": property_on_sale.address,
-                    "price": property_on_sale.price,
-                    "thumbnail": property_on_sale.thumbnail,
-                }.items()
-                if value is not None
-            }
-        if b:
-            disponibility_data_seller = {
-                f"properties_on_sale.$.disponibility.{field}": value
-                for field, value in {
-                    "day": property_on_sale.disponibility.day,
-                    "time": property_on_sale.disponibility.time,
-                    "max_attendees": property_on_sale.disponibility.max_attendees,
-                }.items()
-                if value is not None
-            }
-        update_set = {}
-        if a:
-            update_set |= single_data_seller
-        if b:
-            update_set |= disponibility_data_seller
+        update_set = build_embedded_property_update(property_on_sale)
         try:
             result = mongo_client.Seller.update_one(
                 {"_id": ObjectId(self.seller.seller_id), "properties_on_sale._id": ObjectId(property_on_sale.property_on_sale_id)},
@@ -436,7 +615,8 @@ class SellerDB:
     # route del seller (sell_property) CONSISTENT
     def sell_property(self, property: SoldProperty) -> int:
         """
-        Move a property from properties_on_sale to sold_properties.
+        Move a property from properties_on_sale to the SoldProperty collection, and to the most recent
+        sold_properties embedded in the seller document.
 
         Args:
             property (SoldProperty): The property being sold.
@@ -451,17 +631,29 @@ class SellerDB:
 
         id_p = ObjectId(property.sold_property_id)
         id_s = ObjectId(self.seller.seller_id)
+        document = build_sold_property_document(self.seller.seller_id, property)
 
+        try:
+            mongo_client[SOLD_PROPERTY_COLLECTION].replace_one({"_id": id_p}, document, upsert=True)
+        except Exception as e:
+            logger.error(f"Error selling property: {e}")
+            return 500
+        document.pop("seller_id")
         try:
             result = mongo_client.Seller.update_one(
                 {"_id": id_s},
                 {
-                    "$push": {"sold_properties": {"_id": id_p, **property.model_dump(exclude={"sold_property_id"})}},
+                    "$push": build_embedded_sold_properties_push([document]),
                     "$pull": {"properties_on_sale": {"_id": id_p}}
                 }
             )
         except Exception as e:
             logger.error(f"Error selling property: {e}")
+            # Rollback, the property is still on sale
+            try:
+                mongo_client[SOLD_PROPERTY_COLLECTION].delete_one({"_id": id_p})
+            except Exception as e:
+                logger.error(f"Error rolling back the sold property {property.sold_property_id}: {e}")
             return 500
         return 200
     
@@ -525,25 +717,11 @@ class SellerDB:
         if not result or "properties_on_sale" not in result or len(result["properties_on_sale"]) == 0:
             return 404
 
-        # Get the current day name (e.g., Monday, Tuesday, etc.)
-        current_day = datetime.now().strftime("%A")
-        print(current_day)
-        open_house_events = []
-
-        # Iterate over each property on sale and check if an open house event is scheduled for today
-        for prop in result["properties_on_sale"]:
-            disponibility = prop.get("disponibility", {})
-            if disponibility.get("day") == current_day:
-                open_house_events.append({
-                    "city": prop.get("city"),
-                    "address": prop.get("address"),
-                    "time": disponibility.get("time")
-                })
-
+        open_house_events = build_open_house_events(result["properties_on_sale"])
         if not open_house_events:
             return 404
 
-        self.current_open_house_events = [OpenHouseOccurrence(**event) for event in open_house_events]
+        self.current_open_house_events = open_house_events
         return 200 
     
     def get_sold_properties_statistics(self, input:Analytics2Input) -> int:
@@ -572,37 +750,9 @@ class SellerDB:
         if start > end:
             return 400
         
-        pipeline = [
-                {
-                    "$match": {
-                        "_id": ObjectId(self.seller.seller_id),
-                    }
-                },
-                {"$unwind": "$sold_properties"},
-                {
-                    "$match": {
-                        "sold_properties.city": input.city,
-                        "sold_properties.sell_date": {"$gte": start,"$lte": end}
-                    }
-                },
-                {
-                    "$group": {
-                        "_id": "$sold_properties.neighbourhood",
-                        "houses_sold": {"$sum": 1},
-                        "revenue": {"$sum": "$sold_properties.price"}
-                    }
-                },
-                {
-                    "$project": {
-                        "neighbourhood": "$_id",
-                        "houses_sold": 1,
-                        "revenue": 1,
-                        "_id": 0
-                    }
-                }
-            ]
+        pipeline = build_sold_properties_statistics_pipeline(self.seller.seller_id, input, start, end)
         try:
-            aggregation_result = mongo_client.Seller.aggregate(pipeline)
+            aggregation_result = mongo_client[SOLD_PROPERTY_COLLECTION].aggregate(pipeline)
         except Exception as e:
             logger.error(f"Error retrieving analytics 2: {e}")
             return 500
@@ -634,35 +784,9 @@ class SellerDB:
         
         start = datetime.strptime(input.start_date, "%Y-%m-%d")
         end = datetime.strptime(input.end_date, "%Y-%m-%d")
-        pipeline = [
-                {"$match": {"_id": ObjectId(self.seller.seller_id)}},
-                {"$unwind": "$sold_properties"},
-                {"$match": {"sold_properties.city": input.city, "sold_properties.sell_date": {"$gte": start, "$lte": end}, "sold_properties.registration_date": {"$gte": start, "$lte": end}}},
-                {"$project": {
-                    "time_to_sell": {
-                        "$divide": [{"$subtract": ["$sold_properties.sell_date", "$sold_properties.registration_date"]},86400000 ]
-                    },
-                    "sold_properties.neighbourhood": 1
-                }
-                },
-                {
-                "$group": {
-                    "_id": "$sold_properties.neighbourhood",
-                    "avg_time_to_sell": {"$avg": "$time_to_sell"},
-                    "num_house": {"$sum": 1}
-                }    
-                },
-                {
-                    "$project": {
-                        "neighbourhood": "$_id",
-                        "avg_time_to_sell": 1,
-                        "num_house": 1,
-                        "_id": 0
-                    }
-                }
-            ]
+        pipeline = build_avg_time_to_sell_pipeline(self.seller.seller_id, input, start, end)
         try:
-            aggregation_result = mongo_client.Seller.aggregate(pipeline)
+            aggregation_result = mongo_client[SOLD_PROPERTY_COLLECTION].aggregate(pipeline)
         except Exception as e:
             logger.error(f"Error retrieving analytics 3: {e}")
             return 500
@@ -0,0 +1,272 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel
+from setup.redis_setup.redis_setup import get_async_redis_client
+from entities.MongoDB.Buyer.buyer import Buyer
+from entities.MongoDB.Seller.seller import Seller
+
+logger = logging.getLogger(__name__)
+
+# Lifetime of a profile in the memory of a process. An invalidation only reaches the memory of the
+# process that makes it, the other processes may serve the old profile for this long.
+USER_PROFILE_MEMORY_TTL_SECONDS = 10.0
+# Lifetime of a profile in Redis, shared by all the processes. It also bounds the lifetime of the
+# generation of a user, which must outlive the profile reads in flight when it is bumped.
+USER_PROFILE_REDIS_TTL_SECONDS = 300
+# Maximum number of profiles kept in the memory of a process
+USER_PROFILE_MEMORY_SIZE = 5000
+USER_PROFILE_KEY_PREFIX = "user_profile:"
+# The password hash is never cached, the login reads it from MongoDB
+USER_PROFILE_EXCLUDED_FIELDS = {"password"}
+
+# Every user has a hash holding the profile as json and a generation counter bumped by every
+# invalidation, so that a profile read from MongoDB before an invalidation is never stored after it.
+
+# Store a profile if no invalidation happened since the lookup that missed it.
+# KEYS[1]: the hash of the user, KEYS[2]: the email index, if the profile has an email
+# ARGV[1]: the generation read by the lookup, empty if there was none or it is unknown,
+# ARGV[2]: the profile, ARGV[3]: the TTL, ARGV[4]: the id of the user
+PUT_USER_PROFILE_SCRIPT = """
+local generation = redis.call('HGET', KEYS[1], 'generation') or ''
+if generation ~= ARGV[1] then
+    return 409
+end
+redis.call('HSET', KEYS[1], 'profile', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+if KEYS[2] then
+    redis.call('SET', KEYS[2], ARGV[4], 'EX', ARGV[3])
+end
+return 200
+"""
+
+# Drop the profile of a user and bump its generation.
+# KEYS[1]: the hash of the user
+# ARGV[1]: the TTL
+INVALIDATE_USER_PROFILE_SCRIPT = """
+redis.call('HDEL', KEYS[1], 'profile')
+redis.call('HINCRBY', KEYS[1], 'generation', 1)
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 200
+"""
+
+put_user_profile_script = get_async_redis_client().register_script(PUT_USER_PROFILE_SCRIPT)
+invalidate_user_profile_script = get_async_redis_client().register_script(INVALIDATE_USER_PROFILE_SCRIPT)
+
+Profile = TypeVar("Profile", bound=BaseModel)
+# The id of the user looked up and the generation read with it, handed back to put after a miss
+ProfileVersion = Optional[Tuple[str, str]]
+
+
+def decode(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class UserProfileCache(Generic[Profile]):
+    """
+    Read-through cache of the profile projection of the users, the record without favourites,
+    properties or password, in the memory of the process and in Redis. The profiles are looked up
+    by id or by email, an email lookup is only a hit if the cached profile still has that email.
+    A lookup also returns the version of the profile, which the caller gives back to put after
+    reading MongoDB. The DB classes invalidate the profile of a user on every write.
+    """
+
+    def __init__(self, user_type: str, model: Type[Profile], id_field: str,
+                 memory_ttl: float = USER_PROFILE_MEMORY_TTL_SECONDS, redis_ttl: int = USER_PROFILE_REDIS_TTL_SECONDS,
+                 memory_size: int = USER_PROFILE_MEMORY_SIZE):
+        self.user_type = user_type
+        self.model = model
+        self.id_field = id_field
+        self.memory_ttl = memory_ttl
+        self.redis_ttl = redis_ttl
+        self.memory_size = memory_size
+        # id -> (expiry, profile as json), profiles are rebuilt on every hit so callers cannot alter the cached one
+        self.profiles: OrderedDict = OrderedDict()
+        # email -> id
+        self.emails: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0}
+
+    def profile_key(self, user_id: str) -> str:
+        return f"{USER_PROFILE_KEY_PREFIX}{self.user_type}:{user_id}"
+
+    def email_key(self, email: str) -> str:
+        return f"{USER_PROFILE_KEY_PREFIX}{self.user_type}_email:{email}"
+
+    def count(self, stat: str) -> None:
+        with self.lock:
+            self.stats[stat] += 1
+
+    def memory_get(self, user_id: str) -> Optional[str]:
+        """
+        Args:
+            user_id (str): The id of the user.
+
+        Returns:
+            str: The profile as json, None if it is not in memory or expired.
+        """
+        with self.lock:
+            entry = self.profiles.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.profiles[user_id]
+                return None
+            self.profiles.move_to_end(user_id)
+            return entry[1]
+
+    def memory_put(self, user_id: str, email: Optional[str], raw: str, invalidations: int) -> None:
+        """
+        Args:
+            user_id (str): The id of the user.
+            email (str, optional): The email of the user.
+            raw (str): The profile as json.
+            invalidations (int): The invalidations of the process when the profile was read, the
+                                 profile is dropped if one happened since.
+        """
+        with self.lock:
+            if self.stats["invalidations"] != invalidations:
+                return
+            self.profiles[user_id] = (time.monotonic() + self.memory_ttl, raw)
+            self.profiles.move_to_end(user_id)
+            if email:
+                self.emails[email] = user_id
+            while len(self.profiles) > self.memory_size:
+                self.profiles.popitem(last=False)
+            # The email index only refers to the profiles in memory
+            if len(self.emails) > 2 * self.memory_size:
+                self.emails = {cached_email: cached_id for cached_email, cached_id in self.emails.items() if cached_id in self.profiles}
+
+    async def load(self, user_id: str) -> Tuple[Optional[str], bool, str]:
+        """
+        Args:
+            user_id (str): The id of the user.
+
+        Returns:
+            tuple: The profile as json, None if it is not cached, whether it came from memory, and
+                   the generation of the user, empty if it is unknown.
+        """
+        raw = self.memory_get(user_id)
+        if raw is not None:
+            return raw, True, ""
+        with self.lock:
+            invalidations = self.stats["invalidations"]
+        try:
+            raw, generation = await get_async_redis_client().hmget(self.profile_key(user_id), ["profile", "generation"])
+        except Exception as e:
+            logger.warning("Error reading the %s profile cache: %s", self.user_type, e)
+            return None, False, ""
+        generation = decode(generation) or ""
+        if raw is None:
+            return None, False, generation
+        raw = decode(raw)
+        profile = self.model.model_validate_json(raw)
+        self.memory_put(user_id, getattr(profile, "email", None), raw, invalidations)
+        return raw, False, generation
+
+    async def get(self, user_id: str) -> Tuple[Optional[Profile], ProfileVersion]:
+        """
+        Args:
+            user_id (str): The id of the user.
+
+        Returns:
+            tuple: A copy of the cached profile, None on a miss, and the version to give to put.
+        """
+        raw, from_memory, generation = await self.load(user_id)
+        if raw is None:
+            self.count("misses")
+            return None, (user_id, generation)
+        self.count("memory_hits" if from_memory else "redis_hits")
+        return self.model.model_validate_json(raw), (user_id, generation)
+
+    async def get_by_email(self, email: str) -> Tuple[Optional[Profile], ProfileVersion]:
+        """
+        Args:
+            email (str): The email of the user.
+
+        Returns:
+            tuple: A copy of the cached profile with that email, None on a miss, and the version to
+                   give to put, None if the user of the email is unknown.
+        """
+        with self.lock:
+            user_id = self.emails.get(email)
+        if user_id is None:
+            try:
+                user_id = decode(await get_async_redis_client().get(self.email_key(email)))
+            except Exception as e:
+                logger.warning("Error reading the %s profile cache: %s", self.user_type, e)
+                user_id = None
+        if user_id is None:
+            self.count("misses")
+            return None, None
+        raw, from_memory, generation = await self.load(user_id)
+        profile = self.model.model_validate_json(raw) if raw is not None else None
+        # The email of the user may have changed since the email was indexed
+        if profile is None or getattr(profile, "email", None) != email:
+            self.count("misses")
+            return None, (user_id, generation)
+        self.count("memory_hits" if from_memory else "redis_hits")
+        return profile, (user_id, generation)
+
+    async def put(self, profile: Profile, version: ProfileVersion) -> None:
+        """
+        Cache the profile read from MongoDB after a miss, unless the user was invalidated since the
+        lookup. Without the generation of the lookup, the profile is only stored if no invalidation
+        of the user is on record.
+
+        Args:
+            profile (BaseModel): The profile projection of the user.
+            version (tuple, optional): The version returned by the lookup that missed.
+        """
+        user_id = getattr(profile, self.id_field)
+        if not user_id:
+            return
+        generation = version[1] if version is not None and version[0] == user_id else ""
+        email = getattr(profile, "email", None)
+        raw = profile.model_dump_json(exclude_none=True, exclude=USER_PROFILE_EXCLUDED_FIELDS)
+        with self.lock:
+            invalidations = self.stats["invalidations"]
+        keys = [self.profile_key(user_id)] + ([self.email_key(email)] if email else [])
+        try:
+            status = int(await put_user_profile_script(keys=keys, args=[generation, raw, self.redis_ttl, user_id]))
+        except Exception as e:
+            # Without Redis the memory is still guarded by the invalidations of the process
+            logger.warning("Error writing the %s profile cache: %s", self.user_type, e)
+            status = 200
+        if status == 200:
+            self.memory_put(user_id, email, raw, invalidations)
+
+    async def invalidate(self, user_id: str) -> None:
+        """
+        Drop the profile of a user and bump its generation, after a write to the user. A stale
+        email index is harmless, it is checked against the email of the profile.
+
+        Args:
+            user_id (str): The id of the user.
+        """
+        with self.lock:
+            self.profiles.pop(user_id, None)
+            self.stats["invalidations"] += 1
+        try:
+            await invalidate_user_profile_script(keys=[self.profile_key(user_id)], args=[self.redis_ttl])
+        except Exception as e:
+            # The profile expires with its TTL
+            logger.error("Error invalidating the %s profile of %s: %s", self.user_type, user_id, e)
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Returns:
+            dict: The hits of every tier, the misses, the invalidations and the hit rate of the cache.
+        """
+        with self.lock:
+            metrics = dict(self.stats)
+            metrics["memory_size"] = len(self.profiles)
+        lookups = metrics["memory_hits"] + metrics["redis_hits"] + metrics["misses"]
+        metrics["hit_rate"] = (metrics["memory_hits"] + metrics["redis_hits"]) / lookups if lookups else 0.0
+        return metrics
+
+
+buyer_profile_cache: UserProfileCache[Buyer] = UserProfileCache("buyer", Buyer, "buyer_id")
+seller_profile_cache: UserProfileCache[Seller] = UserProfileCache("seller", Seller, "seller_id")
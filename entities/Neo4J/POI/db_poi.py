@@ -1,8 +1,42 @@
 from entities.Neo4J.POI.poi import POI
 from setup.neo4j_setup.neo4j_setup import get_neo4j_driver
+from entities.Neo4J.PropertyOnSaleNeo4J.db_property_on_sale_neo4j import near_bounding_box, get_many_map_dependents
+from entities.Neo4J.PropertyOnSaleNeo4J.livability_score import add_near_pois_to_scores, recompute_livability_scores
+from entities.Redis.MapResponseCache.db_map_response_cache import MapResponseCacheDB
 import logging
 
 logger = logging.getLogger(__name__)
+
+# Link a POI to the properties within NEAR_DISTANCE_METERS, bounded by the PropertyOnSale coordinates point index.
+# Only the properties inside the radius are touched, so the cost depends on the local density.
+# The POIs are matched by element id, so that only the nodes just written are linked.
+LINK_POI_QUERY = """
+UNWIND $poi_ids AS poi_id
+MATCH (poi:POI) WHERE elementId(poi) = poi_id
+MATCH (p:PropertyOnSale)
+WHERE point.withinBBox(p.coordinates,
+                       point({latitude: $min_latitude, longitude: $min_longitude}),
+                       point({latitude: $max_latitude, longitude: $max_longitude}))
+AND point.distance(p.coordinates, poi.coordinates) <= $distance
+MERGE (p)-[r:NEAR]->(poi)
+SET r.distance = point.distance(p.coordinates, poi.coordinates)
+RETURN p.property_on_sale_id AS property_on_sale_id, toLower(trim(poi.type)) AS poi_type, r.distance AS distance
+"""
+
+UNLINK_POI_QUERY = """
+MATCH (poi:POI {name: $name})<-[r:NEAR]-(p:PropertyOnSale)
+DELETE r
+RETURN p.property_on_sale_id AS property_on_sale_id
+"""
+
+DELETE_POI_QUERY = """
+MATCH (poi:POI {name: $name})
+OPTIONAL MATCH (poi)<-[:NEAR]-(p:PropertyOnSale)
+WITH poi, collect(p.property_on_sale_id) AS property_ids
+DETACH DELETE poi
+RETURN property_ids
+"""
+
 class POIDB:
     def __init__(self):
         self.poi = None
@@ -54,11 +88,22 @@ class POIDB:
             
         with neo4j_driver.session() as session:
             try:
-                query = (
-                    "CREATE (p:POI {name: $name, type: $type,  coordinates: point({latitude: $latitude, longitude: $longitude})})"
-                    "RETURN id(p)"
-                )
-                result = session.run(query, name=self.poi.name, type=self.poi.type, latitude=self.poi.coordinates.latitude, longitude=self.poi.coordinates.longitude)
+                def tx_func(tx):
+                    poi_id = tx.run(
+                        "CREATE (p:POI {name: $name, type: $type,  coordinates: point({latitude: $latitude, longitude: $longitude})}) "
+                        "RETURN elementId(p) AS poi_id",
+                        name=self.poi.name, type=self.poi.type, latitude=self.poi.coordinates.latitude, longitude=self.poi.coordinates.longitude
+                    ).single()["poi_id"]
+                    # Link the new POI and update the scores of the properties around it from their stored aggregates
+                    links = [record.data() for record in tx.run(
+                        LINK_POI_QUERY, poi_ids=[poi_id],
+                        **near_bounding_box(self.poi.coordinates.latitude, self.poi.coordinates.longitude)
+                    )]
+                    add_near_pois_to_scores(tx, links)
+                    # The near POIs and the scores shown by the map responses changed
+                    return get_many_map_dependents(tx, list(dict.fromkeys(link["property_on_sale_id"] for link in links)))
+                map_dependents = session.write_transaction(tx_func)
+                MapResponseCacheDB().invalidate(map_dependents)
                 return 201
             except Exception as e:
                 logger.error(f"An error occurred in create_poi: {e}")
@@ -79,12 +124,25 @@ class POIDB:
             
         with neo4j_driver.session() as session:
             try:
-                query = (
-                    "MATCH (p:POI {name: $name})"
-                    "SET p.type = $type, p.coordinates = point({latitude: $latitude, longitude: $longitude})"
-                    "RETURN p"
-                )
-                result = session.run(query, name=poi.name, type=poi.type, latitude=poi.coordinates.latitude, longitude=poi.coordinates.longitude)
+                def tx_func(tx):
+                    unlinked_ids = [record["property_on_sale_id"] for record in tx.run(UNLINK_POI_QUERY, name=poi.name)]
+                    poi_ids = [record["poi_id"] for record in tx.run(
+                        "MATCH (p:POI {name: $name}) "
+                        "SET p.type = $type, p.coordinates = point({latitude: $latitude, longitude: $longitude}) "
+                        "RETURN elementId(p) AS poi_id",
+                        name=poi.name, type=poi.type, latitude=poi.coordinates.latitude, longitude=poi.coordinates.longitude
+                    )]
+                    linked_ids = [record["property_on_sale_id"] for record in tx.run(
+                        LINK_POI_QUERY, poi_ids=poi_ids,
+                        **near_bounding_box(poi.coordinates.latitude, poi.coordinates.longitude)
+                    )]
+                    # The old and the new neighbours of the POI are the only properties whose score can change
+                    affected_ids = list(dict.fromkeys(unlinked_ids + linked_ids))
+                    if affected_ids:
+                        recompute_livability_scores(tx, affected_ids)
+                    return get_many_map_dependents(tx, affected_ids)
+                map_dependents = session.write_transaction(tx_func)
+                MapResponseCacheDB().invalidate(map_dependents)
                 return 200
             except Exception as e:
                 logger.error(f"An error occurred in update_poi: {e}")
@@ -105,11 +163,16 @@ class POIDB:
             
         with neo4j_driver.session() as session:
             try:
-                query = (
-                    "MATCH (p:POI {name: $name})"
-                    "DELETE p"
-                )
-                session.run(query, name=self.poi.name)
+                def tx_func(tx):
+                    affected_ids = list(dict.fromkeys(
+                        property_id for record in tx.run(DELETE_POI_QUERY, name=self.poi.name) for property_id in record["property_ids"]
+                    ))
+                    # Only the properties that were near the POI lose it
+                    if affected_ids:
+                        recompute_livability_scores(tx, affected_ids)
+                    return get_many_map_dependents(tx, affected_ids)
+                map_dependents = session.write_transaction(tx_func)
+                MapResponseCacheDB().invalidate(map_dependents)
                 return 200
             except Exception as e:
                 logger.error(f"An error occurred in delete_poi: {e}")
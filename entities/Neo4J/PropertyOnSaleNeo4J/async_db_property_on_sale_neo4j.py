@@ -0,0 +1,303 @@
+import logging
+from setup.neo4j_setup.neo4j_setup import get_async_neo4j_driver
+from entities.Neo4J.PropertyOnSaleNeo4J.property_on_sale_neo4j import PropertyOnSaleNeo4J
+from entities.Neo4J.PropertyOnSaleNeo4J.db_property_on_sale_neo4j import (
+    MERGE_PROPERTY_QUERY, LINK_NEIGHBOURHOOD_QUERY, LINK_NEAR_POIS_QUERY, LINK_NEAR_PROPERTIES_QUERY,
+    UPDATE_PROPERTY_QUERY, UNLINK_SPATIAL_QUERY, UPDATE_COORDINATES_QUERY, UNLINK_NEIGHBOURHOOD_QUERY,
+    DELETE_PROPERTY_QUERY, GET_PROPERTY_QUERY, GET_CITY_AND_NEIGHBOURHOOD_QUERY, GET_NEAR_POIS_QUERY,
+    GET_NEAR_PROPERTIES_QUERY, GET_MAP_DEPENDENTS_QUERY,
+    near_bounding_box, node_to_property_on_sale, node_to_poi, node_to_city, node_to_neighbourhood
+)
+from entities.Neo4J.PropertyOnSaleNeo4J.livability_score import async_recompute_livability_scores
+from entities.Neo4J.Neighbourhood.neighbourhood import Neighbourhood
+from entities.Neo4J.City.city import City
+from entities.Neo4J.POI.poi import POI
+from entities.Redis.MapResponseCache.async_db_map_response_cache import AsyncMapResponseCacheDB
+from typing import List, Set
+
+
+logger = logging.getLogger(__name__)
+
+async def async_get_map_dependents(tx, property_on_sale_id: str) -> Set[str]:
+    """
+    Async counterpart of get_map_dependents.
+
+    Args:
+        tx: The Neo4j transaction.
+        property_on_sale_id (str): The ID of the property on sale.
+
+    Returns:
+        set: The IDs of the property and of the properties whose cached map responses include it.
+    """
+    result = await tx.run(GET_MAP_DEPENDENTS_QUERY, property_on_sale_id=property_on_sale_id)
+    record = await result.single()
+    return {property_on_sale_id, *(record["property_on_sale_ids"] if record else [])}
+
+class AsyncPropertyOnSaleNeo4JDB:
+    """
+    Async counterpart of PropertyOnSaleNeo4JDB, used by the request path.
+    Same methods, same status codes and same attributes, backed by the async Neo4j driver.
+    """
+    def __init__(self, property_on_sale_neo4j: PropertyOnSaleNeo4J):
+        self.property_on_sale_neo4j: PropertyOnSaleNeo4J = property_on_sale_neo4j
+        self.near_properties: List[PropertyOnSaleNeo4J] = None
+        self.neighbourhood: Neighbourhood = None
+        self.city: City = None
+        self.pois: List[POI] = None
+
+    async def get_property_on_sale_neo4j(self):
+        """
+        Retrieve a PropertyOnSale node from Neo4j by its property_on_sale_id.
+
+        Returns:
+            int: 200 if the property is retrieved successfully,
+                 404 if not found,
+                 500 if an error occurs.
+        """
+        neo4j_driver = get_async_neo4j_driver()
+        if neo4j_driver is None:
+            logger.error("Neo4j driver not initialized.")
+            return 500
+        try:
+            async with neo4j_driver.session() as session:
+                result = await session.run(GET_PROPERTY_QUERY, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
+                record = await result.single()
+        except Exception as e:
+            logger.error("Error while retrieving property on sale on Neo4j with id %s: %s",
+                        self.property_on_sale_neo4j.property_on_sale_id, e)
+            return 500
+        if record is None:
+            return 404
+        self.property_on_sale_neo4j = node_to_property_on_sale(record["p"])
+        return 200
+
+    async def create_property_on_sale_neo4j(self, neighbourhood_name: str):
+        """
+        Create a new PropertyOnSale node in Neo4j and link it to a neighbourhood, POIs, and near properties.
+
+        Args:
+            neighbourhood_name (str): The name of the neighbourhood to link with.
+
+        Returns:
+            int: 201 if the property is created successfully,
+                 500 if an error occurs.
+        """
+        neo4j_driver = get_async_neo4j_driver()
+        if neo4j_driver is None:
+            logger.error("Neo4j driver not initialized.")
+            return 500
+        property_on_sale_id = self.property_on_sale_neo4j.property_on_sale_id
+        properties = self.property_on_sale_neo4j.model_dump()
+        coordinates = properties.pop('coordinates', None)
+        if coordinates is None:
+            logger.error("Coordinates were not provided for property on sale with id %s", property_on_sale_id)
+            return 500
+
+        async def tx_func(tx):
+            await tx.run(
+                MERGE_PROPERTY_QUERY,
+                property_on_sale_id=property_on_sale_id,
+                properties_on_sale=properties,
+                latitude=coordinates['latitude'],
+                longitude=coordinates['longitude']
+            )
+            await tx.run(LINK_NEIGHBOURHOOD_QUERY, property_on_sale_id=property_on_sale_id, neighbourhood_name=neighbourhood_name)
+            bounding_box = near_bounding_box(coordinates['latitude'], coordinates['longitude'])
+            await tx.run(LINK_NEAR_POIS_QUERY, property_on_sale_id=property_on_sale_id, **bounding_box)
+            await tx.run(LINK_NEAR_PROPERTIES_QUERY, property_on_sale_id=property_on_sale_id, **bounding_box)
+            # The new property appears in the map responses of its near properties
+            return await async_get_map_dependents(tx, property_on_sale_id)
+
+        try:
+            async with neo4j_driver.session() as session:
+                map_dependents = await session.execute_write(tx_func)
+            await AsyncMapResponseCacheDB().invalidate(map_dependents)
+            return 201
+        except Exception as e:
+            logger.error("Error while creating property on sale on Neo4j with id %s: %s", property_on_sale_id, e)
+            return 500
+
+    async def update_property_on_sale_neo4j(self, update_data: PropertyOnSaleNeo4J, neighbourhood_name: str = None):
+        """
+        Update details of an existing PropertyOnSale node in Neo4j.
+
+        Args:
+            update_data (PropertyOnSaleNeo4J): The update data for the property.
+            neighbourhood_name (str, optional): The new neighbourhood name. Defaults to None.
+
+        Returns:
+            int: 200 if the property is updated successfully,
+                 500 if an error occurs.
+        """
+        neo4j_driver = get_async_neo4j_driver()
+        if neo4j_driver is None:
+            logger.error("Neo4j driver not initialized.")
+            return 500
+        property_on_sale_id = self.property_on_sale_neo4j.property_on_sale_id
+        update_properties = update_data.model_dump(exclude_none=True, exclude={"property_on_sale_id", "coordinates"})
+
+        async def tx_func(tx):
+            map_dependents = await async_get_map_dependents(tx, property_on_sale_id)
+            await tx.run(UPDATE_PROPERTY_QUERY, property_on_sale_id=property_on_sale_id, update_properties=update_properties)
+            if update_data.coordinates is not None:
+                await tx.run(UNLINK_SPATIAL_QUERY, property_on_sale_id=property_on_sale_id)
+                await tx.run(
+                    UPDATE_COORDINATES_QUERY,
+                    property_on_sale_id=property_on_sale_id,
+                    latitude=update_data.coordinates.latitude,
+                    longitude=update_data.coordinates.longitude
+                )
+                bounding_box = near_bounding_box(update_data.coordinates.latitude, update_data.coordinates.longitude)
+                await tx.run(LINK_NEAR_POIS_QUERY, property_on_sale_id=property_on_sale_id, **bounding_box)
+                await tx.run(LINK_NEAR_PROPERTIES_QUERY, property_on_sale_id=property_on_sale_id, **bounding_box)
+                # The stored score and aggregates describe the old location
+                await async_recompute_livability_scores(tx, [property_on_sale_id])
+                # Both the old and the new near properties have changed map responses
+                map_dependents |= await async_get_map_dependents(tx, property_on_sale_id)
+            if neighbourhood_name is not None:
+                await tx.run(UNLINK_NEIGHBOURHOOD_QUERY, property_on_sale_id=property_on_sale_id)
+                await tx.run(LINK_NEIGHBOURHOOD_QUERY, property_on_sale_id=property_on_sale_id, neighbourhood_name=neighbourhood_name)
+            return map_dependents
+
+        try:
+            async with neo4j_driver.session() as session:
+                map_dependents = await session.execute_write(tx_func)
+            await AsyncMapResponseCacheDB().invalidate(map_dependents)
+            return 200
+        except Exception as e:
+            logger.error("Error while updating property on sale on Neo4j with id %s: %s", property_on_sale_id, e)
+            return 500
+
+    async def delete_property_on_sale_neo4j(self):
+        """
+        Delete a PropertyOnSale node from Neo4j along with its relationships.
+
+        Returns:
+            int: 200 if deleted successfully,
+                 500 if an error occurs.
+        """
+        neo4j_driver = get_async_neo4j_driver()
+        if neo4j_driver is None:
+            logger.error("Neo4j driver not initialized.")
+            return 500
+        property_on_sale_id = self.property_on_sale_neo4j.property_on_sale_id
+
+        async def tx_func(tx):
+            map_dependents = await async_get_map_dependents(tx, property_on_sale_id)
+            await tx.run(DELETE_PROPERTY_QUERY, property_on_sale_id=property_on_sale_id)
+            return map_dependents
+
+        try:
+            async with neo4j_driver.session() as session:
+                map_dependents = await session.execute_write(tx_func)
+            await AsyncMapResponseCacheDB().invalidate(map_dependents)
+            return 200
+        except Exception as e:
+            logger.error("Error while deleting property on sale on Neo4j with id %s: %s", property_on_sale_id, e)
+            return 500
+
+    async def get_city_and_neighbourhood(self):
+        """
+        Retrieve the city and neighbourhood nodes connected to the current PropertyOnSale node.
+
+        Returns:
+            int: 200 if city and neighbourhood are retrieved successfully,
+                 404 if not found,
+                 500 if an error occurs
+        """
+        neo4j_driver = get_async_neo4j_driver()
+        if neo4j_driver is None:
+            logger.error("Neo4j driver not initialized.")
+            return 500
+        try:
+            async with neo4j_driver.session() as session:
+                result = await session.run(GET_CITY_AND_NEIGHBOURHOOD_QUERY, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
+                # The first row is enough, as in the sync implementation
+                record = await result.fetch(1)
+        except Exception as e:
+            logger.error("Error while retrieving city and neighbourhood for property %s: %s",
+                        self.property_on_sale_neo4j.property_on_sale_id, e)
+            return 500
+        if not record:
+            return 404
+        self.city = node_to_city(record[0]["city"])
+        self.neighbourhood = node_to_neighbourhood(record[0]["neighbourhood"])
+        return 200
+
+    async def get_near_POIs(self):
+        """
+        Retrieve nearby POI nodes connected via the NEAR relationship.
+
+        Returns:
+            int: 200 if POIs are retrieved successfully,
+                 404 if no POIs are found,
+                 500 if an error occurs.
+        """
+        neo4j_driver = get_async_neo4j_driver()
+        if neo4j_driver is None:
+            logger.error("Neo4j driver not initialized.")
+            return 500
+        try:
+            async with neo4j_driver.session() as session:
+                result = await session.run(GET_NEAR_POIS_QUERY, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
+                result_list = [record async for record in result]
+        except Exception as e:
+            logger.error("Error while retrieving POIs for property %s: %s",
+                        self.property_on_sale_neo4j.property_on_sale_id, e)
+            return 500
+        if not result_list:
+            return 404
+        self.pois = [node_to_poi(record["poi"]) for record in result_list]
+        return 200
+
+    async def get_near_properties(self):
+        """
+        Retrieve near properties in two levels:
+        Level 1: Properties directly connected via a NEAR_PROPERTY relationship.
+        Level 2: Properties connected from a Level 1 property.
+
+        Returns:
+            int: 200 if near properties are retrieved successfully,
+                 404 if no near properties are found,
+                 500 if an error occurs.
+        """
+        neo4j_driver = get_async_neo4j_driver()
+        if neo4j_driver is None:
+            logger.error("Neo4j driver not initialized.")
+            return 500
+        try:
+            async with neo4j_driver.session() as session:
+                result = await session.run(GET_NEAR_PROPERTIES_QUERY, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
+                record = await result.single()
+        except Exception as e:
+            logger.error("Error while retrieving near properties to property %s: %s",
+                        self.property_on_sale_neo4j.property_on_sale_id, e)
+            return 500
+        if record is None:
+            return 404
+        unique_nodes = record.get("uniqueNodes", [])
+        self.near_properties = [node_to_property_on_sale(node) for node in unique_nodes]
+        return 200
+
+    async def update_livability_score(self):
+        """
+        Calculate and update the livability score for the current PropertyOnSale node using nearby POIs.
+
+        Returns:
+            int: 200 if the score is updated successfully,
+                 500 if an error occurs.
+        """
+        neo4j_driver = get_async_neo4j_driver()
+        if neo4j_driver is None:
+            logger.error("Neo4j driver not initialized.")
+            return 500
+        try:
+            async with neo4j_driver.session() as session:
+                await session.execute_write(async_recompute_livability_scores, [self.property_on_sale_neo4j.property_on_sale_id])
+                # The score is part of the near properties responses
+                map_dependents = await session.execute_read(async_get_map_dependents, self.property_on_sale_neo4j.property_on_sale_id)
+        except Exception as e:
+            logger.error("Error updating livability score for property %s: %s", self.property_on_sale_neo4j.property_on_sale_id, e)
+            return 500
+        await AsyncMapResponseCacheDB().invalidate(map_dependents)
+        return 200
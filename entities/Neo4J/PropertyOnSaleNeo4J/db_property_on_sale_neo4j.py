@@ -5,10 +5,246 @@ from entities.Neo4J.PropertyOnSaleNeo4J.property_on_sale_neo4j import PropertyOn
 from entities.Neo4J.Neighbourhood.neighbourhood import Neighbourhood, Neo4jPoint
 from entities.Neo4J.City.city import City
 from entities.Neo4J.POI.poi import POI
-from typing import List
+from entities.Neo4J.PropertyOnSaleNeo4J.livability_score import NEAR_DISTANCE_METERS, recompute_livability_scores
+from entities.Redis.MapResponseCache.db_map_response_cache import MapResponseCacheDB
+from typing import List, Dict, Any, Set
 
 
 logger = logging.getLogger(__name__)
+
+# Length of a degree of latitude, and of longitude at the equator
+METERS_PER_DEGREE = 111320
+
+# Cypher statements shared by PropertyOnSaleNeo4JDB and AsyncPropertyOnSaleNeo4JDB
+
+# Use MERGE to avoid duplicate nodes, and set the node properties.
+# The coordinates are set using the Neo4j built-in 'point' function.
+MERGE_PROPERTY_QUERY = """
+MERGE (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
+ON CREATE SET p += $properties_on_sale,
+            p.coordinates = point({latitude: $latitude, longitude: $longitude})
+ON MATCH SET p += $properties_on_sale,
+            p.coordinates = point({latitude: $latitude, longitude: $longitude})
+"""
+
+# The neighbourhood is identified by its name.
+LINK_NEIGHBOURHOOD_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
+MERGE (n:Neighbourhood {name: $neighbourhood_name})
+MERGE (p)-[:LOCATED_IN_NEIGHBOURHOOD]->(n)
+"""
+
+# Create NEAR relationships between the property and the POI nodes within NEAR_DISTANCE_METERS.
+# The bounding box predicate is answered by the POI coordinates point index,
+# point.distance only filters the corners of the box.
+LINK_NEAR_POIS_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
+MATCH (poi:POI)
+WHERE point.withinBBox(poi.coordinates,
+                       point({latitude: $min_latitude, longitude: $min_longitude}),
+                       point({latitude: $max_latitude, longitude: $max_longitude}))
+AND point.distance(p.coordinates, poi.coordinates) <= $distance
+MERGE (p)-[r:NEAR]->(poi)
+SET r.distance = point.distance(p.coordinates, poi.coordinates)
+"""
+
+# Create bidirectional NEAR_PROPERTY relationships with the other properties within NEAR_DISTANCE_METERS,
+# bounded by the PropertyOnSale coordinates point index.
+LINK_NEAR_PROPERTIES_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
+MATCH (other:PropertyOnSale)
+WHERE point.withinBBox(other.coordinates,
+                       point({latitude: $min_latitude, longitude: $min_longitude}),
+                       point({latitude: $max_latitude, longitude: $max_longitude}))
+AND other.property_on_sale_id <> $property_on_sale_id
+AND point.distance(p.coordinates, other.coordinates) <= $distance
+MERGE (p)-[r:NEAR_PROPERTY]->(other)
+SET r.distance = point.distance(p.coordinates, other.coordinates)
+MERGE (other)-[r2:NEAR_PROPERTY]->(p)
+SET r2.distance = point.distance(p.coordinates, other.coordinates)
+"""
+
+UPDATE_PROPERTY_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
+SET p += $update_properties
+"""
+
+# Delete all relationships except those of type LOCATED_IN_NEIGHBOURHOOD,
+# so that we preserve the neighbourhood relationship if not updated.
+UNLINK_SPATIAL_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})-[r]-()
+WHERE NOT type(r) = 'LOCATED_IN_NEIGHBOURHOOD'
+DELETE r
+"""
+
+UPDATE_COORDINATES_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
+SET p.coordinates = point({latitude: $latitude, longitude: $longitude})
+"""
+
+UNLINK_NEIGHBOURHOOD_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})-[r:LOCATED_IN_NEIGHBOURHOOD]-()
+DELETE r
+"""
+
+DELETE_PROPERTY_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
+DETACH DELETE p
+"""
+
+GET_PROPERTY_QUERY = (
+    "MATCH (p:PropertyOnSale) "
+    "WHERE p.property_on_sale_id = $property_on_sale_id "
+    "RETURN p"
+)
+
+GET_CITY_AND_NEIGHBOURHOOD_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
+MATCH (p)-[:LOCATED_IN_NEIGHBOURHOOD]->(n:Neighbourhood)-[:BELONGS_TO_CITY]-(c:City)
+RETURN n AS neighbourhood, c AS city
+"""
+
+GET_NEAR_POIS_QUERY = """
+MATCH (p:PropertyOnSale)-[:NEAR]->(poi:POI)
+WHERE p.property_on_sale_id = $property_on_sale_id
+RETURN poi
+"""
+
+GET_NEAR_PROPERTIES_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
+OPTIONAL MATCH (p)-[:NEAR_PROPERTY]->(p2:PropertyOnSale)
+OPTIONAL MATCH (p2)-[:NEAR_PROPERTY]->(p3:PropertyOnSale)
+WITH collect(p) AS pList, collect(DISTINCT p2) AS level1, collect(DISTINCT p3) AS level2
+WITH pList + level1 + level2 AS allNodes
+UNWIND allNodes AS n
+RETURN collect(DISTINCT n) AS uniqueNodes
+"""
+
+# The properties whose near properties response includes the property: the near properties
+# of the near properties, the NEAR_PROPERTY relationships being created in both directions
+GET_MAP_DEPENDENTS_QUERY = """
+MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})-[:NEAR_PROPERTY*1..2]-(other:PropertyOnSale)
+WHERE other.property_on_sale_id <> $property_on_sale_id
+RETURN collect(DISTINCT other.property_on_sale_id) AS property_on_sale_ids
+"""
+
+# The same for a batch of properties, e.g. the properties near a POI
+GET_MANY_MAP_DEPENDENTS_QUERY = """
+UNWIND $property_on_sale_ids AS property_on_sale_id
+MATCH (p:PropertyOnSale {property_on_sale_id: property_on_sale_id})-[:NEAR_PROPERTY*1..2]-(other:PropertyOnSale)
+RETURN collect(DISTINCT other.property_on_sale_id) AS property_on_sale_ids
+"""
+
+def get_many_map_dependents(tx, property_on_sale_ids: List[str]) -> Set[str]:
+    """
+    Args:
+        tx: The Neo4j transaction.
+        property_on_sale_ids (list): The IDs of the properties on sale.
+
+    Returns:
+        set: The IDs of the properties and of the properties whose cached map responses include them.
+    """
+    if not property_on_sale_ids:
+        return set()
+    record = tx.run(GET_MANY_MAP_DEPENDENTS_QUERY, property_on_sale_ids=property_on_sale_ids).single()
+    return {*property_on_sale_ids, *(record["property_on_sale_ids"] if record else [])}
+
+def get_map_dependents(tx, property_on_sale_id: str) -> Set[str]:
+    """
+    Args:
+        tx: The Neo4j transaction.
+        property_on_sale_id (str): The ID of the property on sale.
+
+    Returns:
+        set: The IDs of the property and of the properties whose cached map responses include it.
+    """
+    record = tx.run(GET_MAP_DEPENDENTS_QUERY, property_on_sale_id=property_on_sale_id).single()
+    return {property_on_sale_id, *(record["property_on_sale_ids"] if record else [])}
+
+def near_bounding_box(latitude: float, longitude: float, distance: float = NEAR_DISTANCE_METERS) -> Dict[str, float]:
+    """
+    Compute the parameters of the NEAR linking queries: the bounding box that contains
+    the circle of the given radius around the coordinates, and the radius itself.
+
+    Args:
+        latitude (float): The latitude of the center.
+        longitude (float): The longitude of the center.
+        distance (float): The radius in meters (default is NEAR_DISTANCE_METERS).
+
+    Returns:
+        dict: min_latitude, min_longitude, max_latitude, max_longitude and distance.
+    """
+    delta_latitude = distance / METERS_PER_DEGREE
+    # A degree of longitude shrinks with the latitude, the cosine is clamped to stay finite near the poles
+    delta_longitude = distance / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return {
+        "min_latitude": latitude - delta_latitude,
+        "min_longitude": longitude - delta_longitude,
+        "max_latitude": latitude + delta_latitude,
+        "max_longitude": longitude + delta_longitude,
+        "distance": distance
+    }
+
+def node_to_point(node: Any) -> Neo4jPoint:
+    """
+    Convert the coordinates of a Neo4j node into a Neo4jPoint.
+
+    Args:
+        node: The Neo4j node, with a point property named coordinates.
+
+    Returns:
+        Neo4jPoint: The coordinates of the node.
+    """
+    return Neo4jPoint(latitude=node["coordinates"].latitude, longitude=node["coordinates"].longitude)
+
+def node_to_property_on_sale(node: Any) -> PropertyOnSaleNeo4J:
+    """
+    Build a PropertyOnSaleNeo4J from a PropertyOnSale node.
+
+    Args:
+        node: The Neo4j PropertyOnSale node.
+
+    Returns:
+        PropertyOnSaleNeo4J: The property, with the serialized coordinates.
+    """
+    return PropertyOnSaleNeo4J(**{k: v for k, v in dict(node).items() if k != "coordinates"}, coordinates=node_to_point(node).model_dump())
+
+def node_to_poi(node: Any) -> POI:
+    """
+    Build a POI from a POI node.
+
+    Args:
+        node: The Neo4j POI node.
+
+    Returns:
+        POI: The point of interest, with the serialized coordinates.
+    """
+    return POI(**{k: v for k, v in dict(node).items() if k != "coordinates"}, coordinates=node_to_point(node).model_dump())
+
+def node_to_city(node: Any) -> City:
+    """
+    Build a City from a City node.
+
+    Args:
+        node: The Neo4j City node.
+
+    Returns:
+        City: The city, with the serialized coordinates.
+    """
+    return City(**{k: v for k, v in dict(node).items() if k != "coordinates"}, coordinates=node_to_point(node).model_dump())
+
+def node_to_neighbourhood(node: Any) -> Neighbourhood:
+    """
+    Build a Neighbourhood from a Neighbourhood node.
+
+    Args:
+        node: The Neo4j Neighbourhood node.
+
+    Returns:
+        Neighbourhood: The neighbourhood, with the serialized coordinates.
+    """
+    return Neighbourhood(**{k: v for k, v in dict(node).items() if k != "coordinates"}, coordinates=node_to_point(node).model_dump())
+
 class PropertyOnSaleNeo4JDB:
     def __init__(self, property_on_sale_neo4j: PropertyOnSaleNeo4J):
         self.property_on_sale_neo4j: PropertyOnSaleNeo4J = property_on_sale_neo4j
@@ -33,9 +269,7 @@ class PropertyOnSaleNeo4JDB:
         with neo4j_driver.session() as session:
             try:
                 result = session.run(
-                    "MATCH (p:PropertyOnSale) "
-                    "WHERE p.property_on_sale_id = $property_on_sale_id "
-                    "RETURN p",
+                    GET_PROPERTY_QUERY,
                     property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id
                 )
             except Exception as e:
@@ -46,8 +280,7 @@ class PropertyOnSaleNeo4JDB:
             if not result_list:
                 return 404
             
-            coordinates = Neo4jPoint(latitude=dict(result_list[0]["p"])["coordinates"].latitude, longitude=dict(result_list[0]["p"])["coordinates"].longitude)
-            self.property_on_sale_neo4j = PropertyOnSaleNeo4J(**{k: v for k, v in dict(result_list[0]["p"]).items() if k != 'coordinates'}, coordinates=coordinates.model_dump())
+            self.property_on_sale_neo4j = node_to_property_on_sale(result_list[0]["p"])
             return 200
     
     def create_property_on_sale_neo4j(self, neighbourhood_name: str):
@@ -76,65 +309,34 @@ class PropertyOnSaleNeo4JDB:
                     if coordinates is None:
                         raise ValueError("Coordinates were not provided")
 
-                    # Use MERGE to avoid duplicate nodes, and set the node properties.
-                    # The coordinates are set using the Neo4j built-in 'point' function.
-                    query1 = """
-                    MERGE (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
-                    ON CREATE SET p += $properties_on_sale,
-                                p.coordinates = point({latitude: $latitude, longitude: $longitude})
-                    ON MATCH SET p += $properties_on_sale,
-                                p.coordinates = point({latitude: $latitude, longitude: $longitude})
-                    """
                     tx.run(
-                        query1,
+                        MERGE_PROPERTY_QUERY,
                         property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id,
                         properties_on_sale=properties,
                         latitude=coordinates['latitude'],
                         longitude=coordinates['longitude']
                     )
-
-                    # The neighbourhood is identified by its name.
-                    query2 = """
-                    MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
-                    MERGE (n:Neighbourhood {name: $neighbourhood_name})
-                    MERGE (p)-[:LOCATED_IN_NEIGHBOURHOOD]->(n)
-                    """
                     tx.run(
-                        query2,
+                        LINK_NEIGHBOURHOOD_QUERY,
                         property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id,
                         neighbourhood_name=neighbourhood_name
                     )
-
-                    # Step 3: Create NEAR relationships between the property and all existing POI nodes
-                    # where the distance between their coordinates is less than or equal to 500 meters.
-                    query3 = """
-                    MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id}), (poi:POI)
-                    WHERE point.distance(p.coordinates, poi.coordinates) <= 500
-                    MERGE (p)-[r:NEAR]->(poi)
-                    SET r.distance = point.distance(p.coordinates, poi.coordinates)
-                    """
+                    bounding_box = near_bounding_box(coordinates['latitude'], coordinates['longitude'])
                     tx.run(
-                        query3,
-                        property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id
+                        LINK_NEAR_POIS_QUERY,
+                        property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id,
+                        **bounding_box
                     )
-
-                    # Step 4: Create bidirectional NEAR_PROPERTY relationships between the new property and all existing properties
-                    # where the distance is less than or equal to 500 meters.
-                    query4 = """
-                    MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id}), (other:PropertyOnSale)
-                    WHERE other.property_on_sale_id <> $property_on_sale_id
-                    AND point.distance(p.coordinates, other.coordinates) <= 500
-                    MERGE (p)-[r:NEAR_PROPERTY]->(other)
-                    SET r.distance = point.distance(p.coordinates, other.coordinates)
-                    MERGE (other)-[r2:NEAR_PROPERTY]->(p)
-                    SET r2.distance = point.distance(p.coordinates, other.coordinates)
-                    """
                     tx.run(
-                        query4,
-                        property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id
+                        LINK_NEAR_PROPERTIES_QUERY,
+                        property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id,
+                        **bounding_box
                     )
+                    # The new property appears in the map responses of its near properties
+                    return get_map_dependents(tx, self.property_on_sale_neo4j.property_on_sale_id)
                 # Execute all transactional steps
-                session.write_transaction(tx_func)
+                map_dependents = session.write_transaction(tx_func)
+            MapResponseCacheDB().invalidate(map_dependents)
             return 201
         except Exception as e:
             logger.error("Error while creating property on sale on Neo4j with id %s: %s", 
@@ -166,14 +368,11 @@ class PropertyOnSaleNeo4JDB:
                     # Create a dictionary of properties from update_data, excluding 'property_on_sale_id'
                     # and also 'coordinates' if present. This avoids sending a map as a property value.
                     update_properties = update_data.model_dump(exclude_none=True, exclude={"property_on_sale_id", "coordinates"})
+                    map_dependents = get_map_dependents(tx, self.property_on_sale_neo4j.property_on_sale_id)
                     
                     # Always update the property node with the provided fields (excluding coordinates)
-                    query_update_property = """
-                    MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
-                    SET p += $update_properties
-                    """
                     tx.run(
-                        query_update_property,
+                        UPDATE_PROPERTY_QUERY,
                         property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id,
                         update_properties=update_properties
                     )
@@ -181,81 +380,45 @@ class PropertyOnSaleNeo4JDB:
                     # If coordinates are provided, update the coordinates and related spatial relationships.
                     if update_data.coordinates is not None:
                         coordinates = update_data.coordinates
-
-                        # Delete all relationships except those of type LOCATED_IN_NEIGHBOURHOOD,
-                        # so that we preserve the neighbourhood relationship if not updated.
-                        delete_query = """
-                        MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})-[r]-()
-                        WHERE NOT type(r) = 'LOCATED_IN_NEIGHBOURHOOD'
-                        DELETE r
-                        """
-                        tx.run(delete_query, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
-
-                        # Update the node's coordinates using the Neo4j point() function.
-                        query_update_coords = """
-                        MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
-                        SET p.coordinates = point({latitude: $latitude, longitude: $longitude})
-                        """
+                        tx.run(UNLINK_SPATIAL_QUERY, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
                         tx.run(
-                            query_update_coords,
+                            UPDATE_COORDINATES_QUERY,
                             property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id,
                             latitude=coordinates.latitude,
                             longitude=coordinates.longitude
                         )
-
-                        # Create NEAR relationships between the property and all POI nodes within 500 meters.
-                        query_near_poi = """
-                        MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id}), (poi:POI)
-                        WHERE point.distance(p.coordinates, poi.coordinates) <= 500
-                        MERGE (p)-[r:NEAR]->(poi)
-                        SET r.distance = point.distance(p.coordinates, poi.coordinates)
-                        """
+                        bounding_box = near_bounding_box(coordinates.latitude, coordinates.longitude)
                         tx.run(
-                            query_near_poi,
-                            property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id
+                            LINK_NEAR_POIS_QUERY,
+                            property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id,
+                            **bounding_box
                         )
-
-                        # Create bidirectional NEAR_PROPERTY relationships with other properties within 500 meters.
-                        query_near_property = """
-                        MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id}), (other:PropertyOnSale)
-                        WHERE other.property_on_sale_id <> $property_on_sale_id
-                        AND point.distance(p.coordinates, other.coordinates) <= 500
-                        MERGE (p)-[r:NEAR_PROPERTY]->(other)
-                        SET r.distance = point.distance(p.coordinates, other.coordinates)
-                        MERGE (other)-[r2:NEAR_PROPERTY]->(p)
-                        SET r2.distance = point.distance(p.coordinates, other.coordinates)
-                        """
                         tx.run(
-                            query_near_property,
-                            property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id
+                            LINK_NEAR_PROPERTIES_QUERY,
+                            property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id,
+                            **bounding_box
                         )
+                        # The stored score and aggregates describe the old location
+                        recompute_livability_scores(tx, [self.property_on_sale_neo4j.property_on_sale_id])
+                        # Both the old and the new near properties have changed map responses
+                        map_dependents |= get_map_dependents(tx, self.property_on_sale_neo4j.property_on_sale_id)
 
                     # If a neighbourhood is provided, update the neighbourhood relationship.
                     if neighbourhood_name is not None:
-                        # Delete any existing LOCATED_IN_NEIGHBOURHOOD relationship.
-                        delete_neighbourhood_query = """
-                        MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})-[r:LOCATED_IN_NEIGHBOURHOOD]-()
-                        DELETE r
-                        """
                         tx.run(
-                            delete_neighbourhood_query,
+                            UNLINK_NEIGHBOURHOOD_QUERY,
                             property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id
                         )
-
-                        # Create the new neighbourhood relationship.
-                        query_neighbourhood = """
-                        MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
-                        MERGE (n:Neighbourhood {name: $neighbourhood_name})
-                        MERGE (p)-[:LOCATED_IN_NEIGHBOURHOOD]->(n)
-                        """
                         tx.run(
-                            query_neighbourhood,
+                            LINK_NEIGHBOURHOOD_QUERY,
                             property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id,
                             neighbourhood_name=neighbourhood_name
                         )
+                    return map_dependents
 
                 # Execute all operations in a single transaction.
-                session.write_transaction(tx_func)
+                map_dependents = session.write_transaction(tx_func)
+            MapResponseCacheDB().invalidate(map_dependents)
             return 200
 
         except Exception as e:
@@ -280,15 +443,14 @@ class PropertyOnSaleNeo4JDB:
         try:
             with neo4j_driver.session() as session:
                 def tx_func(tx):
-                    query = """
-                    MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
-                    DETACH DELETE p
-                    """
+                    map_dependents = get_map_dependents(tx, self.property_on_sale_neo4j.property_on_sale_id)
                     tx.run(
-                        query,
+                        DELETE_PROPERTY_QUERY,
                         property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id
                     )
-                session.write_transaction(tx_func)
+                    return map_dependents
+                map_dependents = session.write_transaction(tx_func)
+            MapResponseCacheDB().invalidate(map_dependents)
             return 200
         except Exception as e:
             logger.error("Error while deleting property on sale on Neo4j with id %s: %s", 
@@ -310,15 +472,9 @@ class PropertyOnSaleNeo4JDB:
         if neo4j_driver is None:
             logger.error("Neo4j driver not initialized.")
             return 500
-        print(self.property_on_sale_neo4j.property_on_sale_id)
         with neo4j_driver.session() as session:
             try:
-                query = """
-                MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
-                MATCH (p)-[:LOCATED_IN_NEIGHBOURHOOD]->(n:Neighbourhood)-[:BELONGS_TO_CITY]-(c:City)
-                RETURN n AS neighbourhood, c AS city
-                """
-                result = session.run(query, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
+                result = session.run(GET_CITY_AND_NEIGHBOURHOOD_QUERY, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
             except Exception as e:
                 logger.error("Error while retrieving city and neighbourhood for property %s: %s", 
                             self.property_on_sale_neo4j.property_on_sale_id, e)
@@ -327,10 +483,8 @@ class PropertyOnSaleNeo4JDB:
             if not result_list:
                 return 404
             row = result_list[0]
-            city_coordinates = Neo4jPoint(latitude=dict(row["city"])["coordinates"].latitude, longitude=dict(row["city"])["coordinates"].longitude)
-            neighbourhood_coordinates = Neo4jPoint(latitude=dict(row["neighbourhood"])["coordinates"].latitude, longitude=dict(row["neighbourhood"])["coordinates"].longitude)
-            self.city = City(**{k: v for k, v in dict(row["city"]).items() if k != 'coordinates'}, coordinates=city_coordinates.model_dump())
-            self.neighbourhood = Neighbourhood(**{k: v for k, v in dict(row["neighbourhood"]).items() if k != 'coordinates'}, coordinates=neighbourhood_coordinates.model_dump())
+            self.city = node_to_city(row["city"])
+            self.neighbourhood = node_to_neighbourhood(row["neighbourhood"])
             return 200
         
     def get_near_POIs(self):
@@ -348,12 +502,7 @@ class PropertyOnSaleNeo4JDB:
             return 500
         with neo4j_driver.session() as session:
             try:
-                query = """
-                MATCH (p:PropertyOnSale)-[:NEAR]->(poi:POI)
-                WHERE p.property_on_sale_id = $property_on_sale_id
-                RETURN poi
-                """
-                result = session.run(query, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
+                result = session.run(GET_NEAR_POIS_QUERY, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
             except Exception as e:
                 logger.error("Error while retrieving POIs for property %s: %s", 
                             self.property_on_sale_neo4j.property_on_sale_id, e)
@@ -363,17 +512,7 @@ class PropertyOnSaleNeo4JDB:
             if not result_list:
                 return 404
             
-            self.pois = []
-            for record in result_list:
-                poi_node = record["poi"]
-                node_dict = dict(poi_node)
-                
-                poi_coordinates = node_dict.pop("coordinates", None)
-                
-                coordinates = Neo4jPoint(latitude=poi_coordinates.latitude, longitude=poi_coordinates.longitude)
-                
-                self.pois.append(POI(**node_dict, coordinates=coordinates.model_dump()))
-            
+            self.pois = [node_to_poi(record["poi"]) for record in result_list]
             return 200
     
     def get_near_properties(self):
@@ -393,16 +532,7 @@ class PropertyOnSaleNeo4JDB:
             return 500
         with neo4j_driver.session() as session:
             try:
-                query = """
-                MATCH (p:PropertyOnSale {property_on_sale_id: $property_on_sale_id})
-                OPTIONAL MATCH (p)-[:NEAR_PROPERTY]->(p2:PropertyOnSale)
-                OPTIONAL MATCH (p2)-[:NEAR_PROPERTY]->(p3:PropertyOnSale)
-                WITH collect(p) AS pList, collect(DISTINCT p2) AS level1, collect(DISTINCT p3) AS level2
-                WITH pList + level1 + level2 AS allNodes
-                UNWIND allNodes AS n
-                RETURN collect(DISTINCT n) AS uniqueNodes
-                """
-                result = session.run(query, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
+                result = session.run(GET_NEAR_PROPERTIES_QUERY, property_on_sale_id=self.property_on_sale_neo4j.property_on_sale_id)
             except Exception as e:
                 logger.error("Error while retrieving near properties to property %s: %s", 
                             self.property_on_sale_neo4j.property_on_sale_id, e)
@@ -414,20 +544,7 @@ class PropertyOnSaleNeo4JDB:
 
             # Retrieve the unique nodes from the query result (returned as "uniqueNodes")
             unique_nodes = record.get("uniqueNodes", [])
-
-            self.near_properties = []
-            for node in unique_nodes:
-                # Create a Neo4jPoint object from the node's coordinates
-                coordinates = Neo4jPoint(latitude=node["coordinates"].latitude, longitude=node["coordinates"].longitude)
-                # Build the PropertyOnSaleNeo4J object, excluding the 'coordinates' property from the node dictionary,
-                # and adding the serialized coordinates.
-                self.near_properties.append(
-                    PropertyOnSaleNeo4J(
-                        **{k: v for k, v in dict(node).items() if k != "coordinates"},
-                        coordinates=coordinates.model_dump()
-                    )
-                )
-
+            self.near_properties = [node_to_property_on_sale(node) for node in unique_nodes]
             return 200
 
     
@@ -435,96 +552,26 @@ class PropertyOnSaleNeo4JDB:
         """
         Calculate and update the livability score for the current PropertyOnSale node using nearby POIs.
 
-        This method retrieves the nearby POIs (via the NEAR relationship), aggregates the counts 
-        and the minimum distances for each POI type, computes the livability score using predefined 
-        weights, and finally updates the PropertyOnSale node with the calculated score.
+        This method aggregates the counts and the minimum distances of the nearby POIs (via the NEAR relationship)
+        for each POI type, and stores the score computed by the livability scoring engine.
        
         Returns:
             int: 200 if the score is updated successfully,
                  500 if an error occurs.
          """
-
-        poi_weights = {
-            "hospital": 0.5,
-            "school": 0.2,
-            "park": 0.3,
-            "police": 0.2,
-            "supermarket": 0.3,
-            "kindergarten": 0.1,
-            "factory": -0.2,
-            "landfill": -0.3,
-            "prison": -0.4,
-            "grave_yard": -0.1
-        }
-        
-        def calculate_livability_score(poi_weights, distances, counts):
-            for poi in poi_weights.keys():
-                if poi not in distances:
-                    distances[poi] = 500
-                if poi not in counts:
-                    counts[poi] = 0
-            
-            # Calculate the total contribution from each POI type
-            # The score contribution decreases with distance
-            x = sum(counts[poi] * weight * math.exp(-distances[poi] / 1000) for poi, weight in poi_weights.items())
-            # Normalize the score using an exponential function
-            score = 100 - 100 * math.exp(-x)
-            return score
-
         neo4j_driver = get_neo4j_driver()
         if neo4j_driver is None:
             logger.error("Neo4j driver not initialized.")
             return 500
 
-        with neo4j_driver.session() as session:
-            # Retrieve the POI information (grouped by type) for the current property
-            try:
-                result = session.run(
-                    """
-                    MATCH (p:PropertyOnSale {property_on_sale_id: $property_id})- [r:NEAR] -> (poi:POI)
-                    RETURN toLower(trim(poi.type)) AS poi_type, count(poi) AS cnt, min(r.distance) AS min_distance
-                    """,
-                    property_id=self.property_on_sale_neo4j.property_on_sale_id
-                )
-            except Exception as e:
-                logger.error("Error retrieving POI information for property %s: %s", 
-                            self.property_on_sale_neo4j.property_on_sale_id, e)
-                return 500
-            counts = {}
-            distances = {}
-            for rec in result:
-                poi_type = rec["poi_type"]
-                counts[poi_type] = rec["cnt"]
-                distances[poi_type] = rec["min_distance"]
-            
-            # Ensure defaults for any POI types not found in the query
-            for poi in poi_weights.keys():
-                if poi not in counts:
-                    counts[poi] = 0
-                if poi not in distances:
-                    distances[poi] = 500
-            
-            try:
-                # Calculate the livability score using the helper function
-                score = calculate_livability_score(poi_weights, distances, counts)
-            except Exception as e:
-                logger.error("Error calculating livability score for property %s: %s", 
-                            self.property_on_sale_neo4j.property_on_sale_id, e)
-                score = 0
-            
-            # Update the PropertyOnSale node with the calculated livability score
-            try:
-                session.run(
-                    """
-                    MATCH (p:PropertyOnSale {property_on_sale_id: $property_id})
-                    SET p.score = $score
-                    """,
-                    property_id=self.property_on_sale_neo4j.property_on_sale_id,
-                    score=score
-                )
-            except Exception as e:
-                logger.error("Error updating livability score for property %s: %s", 
-                            self.property_on_sale_neo4j.property_on_sale_id, e)
-                return 500
-            
-            return 200
\ No newline at end of file
+        try:
+            with neo4j_driver.session() as session:
+                session.write_transaction(recompute_livability_scores, [self.property_on_sale_neo4j.property_on_sale_id])
+                # The score is part of the near properties responses
+                map_dependents = session.read_transaction(get_map_dependents, self.property_on_sale_neo4j.property_on_sale_id)
+        except Exception as e:
+            logger.error("Error updating livability score for property %s: %s", 
+                        self.property_on_sale_neo4j.property_on_sale_id, e)
+            return 500
+        MapResponseCacheDB().invalidate(map_dependents)
+        return 200
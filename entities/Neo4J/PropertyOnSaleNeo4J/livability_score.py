@@ -0,0 +1,202 @@
+import numpy as np
+from typing import Dict, List, Any, Tuple
+
+# Livability scoring engine shared by PropertyOnSaleNeo4JDB, AsyncPropertyOnSaleNeo4JDB and the bulk scoring.
+
+# Maximum distance of the NEAR and NEAR_PROPERTY relationships
+NEAR_DISTANCE_METERS = 500
+# Distance over which the contribution of a POI decays by a factor e
+DISTANCE_DECAY_METERS = 1000
+
+# Weight of every POI type, the keys are lower case like the types returned by POI_AGGREGATES_QUERY
+POI_WEIGHTS = {
+    "hospital": 0.5,
+    "school": 0.2,
+    "park": 0.3,
+    "police": 0.2,
+    "supermarket": 0.3,
+    "kindergarten": 0.1,
+    "factory": -0.2,
+    "landfill": -0.3,
+    "prison": -0.4,
+    "grave_yard": -0.1
+}
+# Column order of the aggregate matrices
+POI_TYPES = list(POI_WEIGHTS.keys())
+POI_WEIGHTS_VECTOR = np.array([POI_WEIGHTS[poi_type] for poi_type in POI_TYPES])
+
+# Count and minimum distance of the near POIs by type, for a batch of properties.
+# A property without NEAR relationships returns a single aggregate with a null type.
+POI_AGGREGATES_QUERY = """
+UNWIND $property_ids AS property_id
+MATCH (p:PropertyOnSale {property_on_sale_id: property_id})
+OPTIONAL MATCH (p)-[r:NEAR]->(poi:POI)
+WITH property_id, toLower(trim(poi.type)) AS poi_type, count(poi) AS cnt, min(r.distance) AS min_distance
+RETURN property_id, collect({poi_type: poi_type, cnt: cnt, min_distance: min_distance}) AS aggregates
+"""
+
+# The aggregates are stored next to the score, aligned with POI_TYPES, so that a new POI updates them incrementally
+SET_SCORES_QUERY = """
+UNWIND $rows AS row
+MATCH (p:PropertyOnSale {property_on_sale_id: row.property_on_sale_id})
+SET p.score = row.score,
+    p.poi_counts = row.poi_counts,
+    p.poi_min_distances = row.poi_min_distances
+"""
+
+STORED_AGGREGATES_QUERY = """
+UNWIND $property_ids AS property_id
+MATCH (p:PropertyOnSale {property_on_sale_id: property_id})
+RETURN property_id, p.poi_counts AS poi_counts, p.poi_min_distances AS poi_min_distances
+"""
+
+
+def calculate_livability_scores(counts: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    """
+    Calculate the livability score of a batch of properties, one row per property and one column per POI_TYPES entry.
+
+    Args:
+        counts (np.ndarray): Number of POIs of each type.
+        distances (np.ndarray): Minimum distance of each POI type, NEAR_DISTANCE_METERS where there are none.
+
+    Returns:
+        np.ndarray: The livability scores.
+    """
+    # The contribution of every POI type decreases with distance
+    x = (counts * POI_WEIGHTS_VECTOR * np.exp(-distances / DISTANCE_DECAY_METERS)).sum(axis=1)
+    # Normalize the score using an exponential function
+    return 100 - 100 * np.exp(-x)
+
+def aggregates_to_arrays(records: List[Any]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Convert the records of POI_AGGREGATES_QUERY into the count and distance matrices.
+    POI types without a weight are ignored.
+
+    Args:
+        records (list): The records, with property_id and aggregates.
+
+    Returns:
+        tuple: The property ids, the counts and the minimum distances.
+    """
+    columns = {poi_type: i for i, poi_type in enumerate(POI_TYPES)}
+    property_ids = [record["property_id"] for record in records]
+    counts = np.zeros((len(records), len(POI_TYPES)))
+    distances = np.full((len(records), len(POI_TYPES)), float(NEAR_DISTANCE_METERS))
+    for row, record in enumerate(records):
+        for aggregate in record["aggregates"]:
+            column = columns.get(aggregate["poi_type"])
+            if column is not None:
+                counts[row, column] = aggregate["cnt"]
+                distances[row, column] = aggregate["min_distance"]
+    return property_ids, counts, distances
+
+def score_rows_from_arrays(property_ids: List[str], counts: np.ndarray, distances: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Compute the SET_SCORES_QUERY rows from the count and distance matrices.
+
+    Args:
+        property_ids (list): The ids of the properties, one per row.
+        counts (np.ndarray): Number of POIs of each type.
+        distances (np.ndarray): Minimum distance of each POI type.
+
+    Returns:
+        list: One dictionary with property_on_sale_id, score and the aggregates per property.
+    """
+    scores = calculate_livability_scores(counts, distances)
+    return [
+        {
+            "property_on_sale_id": property_id,
+            "score": float(score),
+            "poi_counts": [int(count) for count in counts_row],
+            "poi_min_distances": [float(distance) for distance in distances_row]
+        }
+        for property_id, score, counts_row, distances_row in zip(property_ids, scores, counts, distances)
+    ]
+
+def score_rows(records: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Compute the SET_SCORES_QUERY rows from the records of POI_AGGREGATES_QUERY.
+
+    Args:
+        records (list): The records, with property_id and aggregates.
+
+    Returns:
+        list: One dictionary with property_on_sale_id, score and the aggregates per property.
+    """
+    return score_rows_from_arrays(*aggregates_to_arrays(records))
+
+def recompute_livability_scores(tx, property_ids: List[str]) -> int:
+    """
+    Transaction function that recomputes and stores the livability score of the given properties.
+
+    Args:
+        tx: The Neo4j transaction.
+        property_ids (list): The ids of the properties.
+
+    Returns:
+        int: The number of properties scored.
+    """
+    records = list(tx.run(POI_AGGREGATES_QUERY, property_ids=property_ids))
+    rows = score_rows(records)
+    tx.run(SET_SCORES_QUERY, rows=rows).consume()
+    return len(rows)
+
+def add_near_pois_to_scores(tx, links: List[Dict[str, Any]]) -> int:
+    """
+    Transaction function that updates the scores after NEAR relationships to new POIs have been created,
+    starting from the aggregates stored on the properties instead of aggregating all their NEAR relationships.
+    Properties without valid stored aggregates are recomputed from scratch.
+
+    Args:
+        tx: The Neo4j transaction, in which the NEAR relationships have already been created.
+        links (list): The new relationships, with property_on_sale_id, poi_type and distance.
+
+    Returns:
+        int: The number of properties scored.
+    """
+    columns = {poi_type: i for i, poi_type in enumerate(POI_TYPES)}
+    affected_ids = list(dict.fromkeys(link["property_on_sale_id"] for link in links))
+    if not affected_ids:
+        return 0
+    stored = {record["property_id"]: record for record in tx.run(STORED_AGGREGATES_QUERY, property_ids=affected_ids)}
+    # The stored aggregates already count the new POIs if they are computed from scratch
+    missing_ids = [
+        property_id for property_id in affected_ids
+        if property_id not in stored
+        or stored[property_id]["poi_counts"] is None
+        or len(stored[property_id]["poi_counts"]) != len(POI_TYPES)
+    ]
+    incremental_ids = [property_id for property_id in affected_ids if property_id not in missing_ids]
+    scored = recompute_livability_scores(tx, missing_ids) if missing_ids else 0
+    if not incremental_ids:
+        return scored
+
+    rows = {property_id: i for i, property_id in enumerate(incremental_ids)}
+    counts = np.array([stored[property_id]["poi_counts"] for property_id in incremental_ids], dtype=float)
+    distances = np.array([stored[property_id]["poi_min_distances"] for property_id in incremental_ids], dtype=float)
+    for link in links:
+        row = rows.get(link["property_on_sale_id"])
+        column = columns.get(link["poi_type"])
+        if row is not None and column is not None:
+            counts[row, column] += 1
+            distances[row, column] = min(distances[row, column], link["distance"])
+    tx.run(SET_SCORES_QUERY, rows=score_rows_from_arrays(incremental_ids, counts, distances)).consume()
+    return scored + len(incremental_ids)
+
+async def async_recompute_livability_scores(tx, property_ids: List[str]) -> int:
+    """
+    Async counterpart of recompute_livability_scores, for the async driver.
+
+    Args:
+        tx: The async Neo4j transaction.
+        property_ids (list): The ids of the properties.
+
+    Returns:
+        int: The number of properties scored.
+    """
+    result = await tx.run(POI_AGGREGATES_QUERY, property_ids=property_ids)
+    records = [record async for record in result]
+    rows = score_rows(records)
+    result = await tx.run(SET_SCORES_QUERY, rows=rows)
+    await result.consume()
+    return len(rows)
@@ -0,0 +1,105 @@
+from typing import Iterable, Optional
+import redis
+import logging
+from entities.Redis.MapResponseCache.db_map_response_cache import (
+    PUT_MAP_RESPONSE_SCRIPT, INVALIDATE_MAP_RESPONSES_SCRIPT, MAP_RESPONSE_TTL_SECONDS,
+    map_response_key, invalidate_map_responses_args
+)
+from setup.redis_setup.redis_setup import get_async_redis_client
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+put_map_response_script = get_async_redis_client().register_script(PUT_MAP_RESPONSE_SCRIPT)
+invalidate_map_responses_script = get_async_redis_client().register_script(INVALIDATE_MAP_RESPONSES_SCRIPT)
+
+class AsyncMapResponseCacheDB:
+    """
+    Cache of the serialized responses of the guest map endpoints of a property on sale.
+    get also reads the generation of the responses, to be given back to put.
+    """
+    response: Optional[str] = None
+    generation: str = ""
+
+    def __init__(self, property_on_sale_id: Optional[str] = None):
+        self.property_on_sale_id = property_on_sale_id
+        self.response = None
+        self.generation = ""
+
+    async def get(self, field: str) -> int:
+        """
+        Read the cached response of an endpoint into self.response.
+
+        Args:
+            field (str): The field of the endpoint.
+
+        Returns:
+            int: 200 if the response is cached,
+                 404 if it is not,
+                 500 if there's a Redis error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        try:
+            response, generation = await redis_client.hmget(map_response_key(self.property_on_sale_id), [field, "generation"])
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error reading the map response {field} of property_on_sale_id={self.property_on_sale_id}: {e}")
+            return 500
+        self.generation = "" if generation is None else generation
+        if response is None:
+            return 404
+        self.response = response
+        return 200
+
+    async def put(self, field: str, response: str) -> int:
+        """
+        Store the response of an endpoint, computed after get.
+
+        Args:
+            field (str): The field of the endpoint.
+            response (str): The serialized response.
+
+        Returns:
+            int: 200 if the response is stored,
+                 409 if the responses of the property were invalidated since get,
+                 500 if there's a Redis error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        try:
+            return int(await put_map_response_script(
+                keys=[map_response_key(self.property_on_sale_id)],
+                args=[self.generation, field, response, MAP_RESPONSE_TTL_SECONDS]
+            ))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error storing the map response {field} of property_on_sale_id={self.property_on_sale_id}: {e}")
+            return 500
+
+    async def invalidate(self, property_on_sale_ids: Iterable[str]) -> int:
+        """
+        Drop the cached map responses of the properties.
+
+        Args:
+            property_on_sale_ids (Iterable[str]): The IDs of the properties whose responses changed.
+
+        Returns:
+            int: 200 if the responses are invalidated,
+                 500 if there's a Redis error.
+        """
+        keys, args = invalidate_map_responses_args(property_on_sale_ids)
+        if not keys:
+            return 200
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        try:
+            await invalidate_map_responses_script(keys=keys, args=args)
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error invalidating the map responses of {len(keys)} properties: {e}")
+            return 500
+        return 200
@@ -0,0 +1,98 @@
+from typing import Iterable, List
+import redis
+import logging
+from setup.redis_setup.redis_setup import get_redis_client
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Cache of the serialized responses of the guest map endpoints. Every property on sale has a hash
+# holding one field per endpoint, with the JSON of the response, and a generation counter bumped by
+# every invalidation, so that a response computed before an invalidation is never stored after it.
+MAP_RESPONSE_KEY_PREFIX = "map_response:"
+CITY_AND_NEIGHBOURHOOD_FIELD = "city_and_neighbourhood"
+NEAR_POIS_FIELD = "pois"
+NEAR_PROPERTIES_FIELD = "near_properties"
+MAP_RESPONSE_FIELDS = [CITY_AND_NEIGHBOURHOOD_FIELD, NEAR_POIS_FIELD, NEAR_PROPERTIES_FIELD]
+# The responses are invalidated by the writes, the TTL only bounds the memory of unused entries
+MAP_RESPONSE_TTL_SECONDS = 24 * 3600
+
+# Store a response if no invalidation happened since it was computed.
+# KEYS[1]: the hash of the property
+# ARGV[1]: the generation read before computing the response, empty if there was none,
+# ARGV[2]: the field, ARGV[3]: the response, ARGV[4]: the TTL
+PUT_MAP_RESPONSE_SCRIPT = """
+local generation = redis.call('HGET', KEYS[1], 'generation') or ''
+if generation ~= ARGV[1] then
+    return 409
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 200
+"""
+
+# Drop the responses of the properties and bump their generation.
+# KEYS: the hashes of the properties
+# ARGV[1]: the TTL, ARGV[2..]: the fields of the responses
+INVALIDATE_MAP_RESPONSES_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    redis.call('HDEL', key, unpack(ARGV, 2))
+    redis.call('HINCRBY', key, 'generation', 1)
+    redis.call('EXPIRE', key, ARGV[1])
+end
+return #KEYS
+"""
+
+invalidate_map_responses_script = get_redis_client().register_script(INVALIDATE_MAP_RESPONSES_SCRIPT)
+
+def map_response_key(property_on_sale_id: str) -> str:
+    """
+    Args:
+        property_on_sale_id (str): The ID of the property on sale.
+
+    Returns:
+        str: The Redis key of the map responses of the property.
+    """
+    return f"{MAP_RESPONSE_KEY_PREFIX}{property_on_sale_id}"
+
+def invalidate_map_responses_args(property_on_sale_ids: Iterable[str]) -> tuple[List[str], List]:
+    """
+    Args:
+        property_on_sale_ids (Iterable[str]): The IDs of the properties whose responses changed.
+
+    Returns:
+        tuple: The keys and the args of INVALIDATE_MAP_RESPONSES_SCRIPT.
+    """
+    keys = [map_response_key(property_on_sale_id) for property_on_sale_id in sorted(set(property_on_sale_ids))]
+    return keys, [MAP_RESPONSE_TTL_SECONDS] + MAP_RESPONSE_FIELDS
+
+class MapResponseCacheDB:
+    """
+    Invalidation of the map responses for the synchronous writers. The responses are read and
+    stored by the guest routes through AsyncMapResponseCacheDB.
+    """
+
+    def invalidate(self, property_on_sale_ids: Iterable[str]) -> int:
+        """
+        Drop the cached map responses of the properties.
+
+        Args:
+            property_on_sale_ids (Iterable[str]): The IDs of the properties whose responses changed.
+
+        Returns:
+            int: 200 if the responses are invalidated,
+                 500 if there's a Redis error.
+        """
+        keys, args = invalidate_map_responses_args(property_on_sale_ids)
+        if not keys:
+            return 200
+        redis_client = get_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        try:
+            invalidate_map_responses_script(keys=keys, args=args)
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error invalidating the map responses of {len(keys)} properties: {e}")
+            return 500
+        return 200
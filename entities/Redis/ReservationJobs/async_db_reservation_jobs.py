@@ -0,0 +1,47 @@
+from typing import Optional
+import redis
+import logging
+from entities.Redis.ReservationJobs.reservation_job import ReservationJob
+from entities.Redis.ReservationJobs.db_reservation_jobs import ENQUEUE_JOB_SCRIPT, READY_JOBS_KEY, PROCESSING_JOBS_KEY, DEAD_JOBS_KEY, JOB_RETRY_DELAY_SECONDS, reservation_job_key, enqueue_job_args
+from setup.redis_setup.redis_setup import get_async_redis_client
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+enqueue_job = get_async_redis_client().register_script(ENQUEUE_JOB_SCRIPT)
+
+class AsyncReservationJobsDB:
+    """
+    Async counterpart of ReservationJobsDB for the request path, which only enqueues jobs.
+    The jobs are claimed and completed by ReservationJobsWorker.
+    """
+    reservation_job: ReservationJob = None
+
+    def __init__(self, reservation_job: Optional[ReservationJob] = None):
+        self.reservation_job = reservation_job
+
+    async def enqueue(self, delay: float = JOB_RETRY_DELAY_SECONDS) -> int:
+        """
+        Enqueue this job, coalescing it into the pending job of the same property_on_sale_id if there is one.
+
+        Args:
+            delay (float): Seconds before the job can run (default is JOB_RETRY_DELAY_SECONDS).
+
+        Returns:
+            int: 201 if the job is created,
+                 200 if the job is coalesced into the pending one,
+                 500 if there's a Redis error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        property_on_sale_id = self.reservation_job.property_on_sale_id
+        try:
+            return int(await enqueue_job(
+                keys=[reservation_job_key(property_on_sale_id), READY_JOBS_KEY, PROCESSING_JOBS_KEY, DEAD_JOBS_KEY],
+                args=enqueue_job_args(self.reservation_job, delay)
+            ))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error enqueuing the reservation job of property_on_sale_id={property_on_sale_id}: {e}")
+            return 500
@@ -0,0 +1,362 @@
+import json
+import time
+from typing import Optional, List, Any
+import redis
+import logging
+from entities.Redis.ReservationJobs.reservation_job import ReservationJob
+from setup.redis_setup.redis_setup import get_redis_client
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Durable queue of the deferred reservation propagations, shared by every API worker and every job worker.
+# Every property on sale has at most one job, a hash holding the ReservationJob fields, so repeated
+# changes of the same property coalesce into one job. The ids of the properties with a job are in:
+# - READY_JOBS_KEY, scored by the time the job can run,
+# - PROCESSING_JOBS_KEY, scored by the end of the visibility timeout of the worker running the job,
+# - DEAD_JOBS_KEY, scored by the time the job exhausted its attempts.
+READY_JOBS_KEY = "reservation_jobs:ready"
+PROCESSING_JOBS_KEY = "reservation_jobs:processing"
+DEAD_JOBS_KEY = "reservation_jobs:dead"
+
+# Delay of the first run of a job, and of the first retry, doubled by every further retry
+JOB_RETRY_DELAY_SECONDS = 300
+JOB_MAX_RETRY_DELAY_SECONDS = 6 * 3600
+JOB_MAX_ATTEMPTS = 10
+# Time a worker has to complete a job before another worker can run it
+JOB_VISIBILITY_TIMEOUT_SECONDS = 300
+
+# Create the job of a property or coalesce the new change into it: the buyers are merged,
+# the newer fields win and a deletion supersedes any update.
+# KEYS[1]: the job hash, KEYS[2]: READY_JOBS_KEY, KEYS[3]: PROCESSING_JOBS_KEY, KEYS[4]: DEAD_JOBS_KEY
+# ARGV[1]: property_on_sale_id, ARGV[2]: buyer_ids as JSON, ARGV[3]: updated_data as JSON,
+# ARGV[4]: delete (0/1), ARGV[5]: all_buyers (0/1), ARGV[6]: the time the job can run
+ENQUEUE_JOB_SCRIPT = """
+local buyer_ids = cjson.decode(ARGV[2])
+local updated_data = cjson.decode(ARGV[3])
+local delete = ARGV[4]
+local all_buyers = ARGV[5]
+local status = 201
+local stored_buyer_ids = redis.call('HGET', KEYS[1], 'buyer_ids')
+if stored_buyer_ids then
+    status = 200
+    local seen = {}
+    for _, buyer_id in ipairs(buyer_ids) do
+        seen[buyer_id] = true
+    end
+    for _, buyer_id in ipairs(cjson.decode(stored_buyer_ids)) do
+        if not seen[buyer_id] then
+            table.insert(buyer_ids, buyer_id)
+            seen[buyer_id] = true
+        end
+    end
+    local stored_data = cjson.decode(redis.call('HGET', KEYS[1], 'updated_data'))
+    for field, value in pairs(updated_data) do
+        stored_data[field] = value
+    end
+    updated_data = stored_data
+    if redis.call('HGET', KEYS[1], 'delete') == '1' then
+        delete = '1'
+    end
+    if redis.call('HGET', KEYS[1], 'all_buyers') == '1' then
+        all_buyers = '1'
+    end
+end
+redis.call('HSET', KEYS[1], 'property_on_sale_id', ARGV[1], 'buyer_ids', cjson.encode(buyer_ids),
+    'updated_data', cjson.encode(updated_data), 'delete', delete, 'all_buyers', all_buyers)
+redis.call('HSETNX', KEYS[1], 'attempts', 0)
+redis.call('HINCRBY', KEYS[1], 'version', 1)
+-- A new change gives a dead job a new chance
+if redis.call('ZREM', KEYS[4], ARGV[1]) == 1 then
+    redis.call('HSET', KEYS[1], 'attempts', 0)
+end
+-- A running job is put back in the ready set when it completes, otherwise the earliest run time wins
+if not redis.call('ZSCORE', KEYS[3], ARGV[1]) then
+    local run_at = redis.call('ZSCORE', KEYS[2], ARGV[1])
+    if not run_at or tonumber(run_at) > tonumber(ARGV[6]) then
+        redis.call('ZADD', KEYS[2], ARGV[6], ARGV[1])
+    end
+end
+return status
+"""
+
+# Move the first job that can run from the ready set to the processing set.
+# The job hash is read by READ_CLAIMED_JOB_SCRIPT, as its key is only known once the job is picked.
+# KEYS[1]: READY_JOBS_KEY, KEYS[2]: PROCESSING_JOBS_KEY
+# ARGV[1]: now, ARGV[2]: the end of the visibility timeout
+# Returns the property_on_sale_id of the job, false if no job can run.
+CLAIM_JOB_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 1)
+if #ids == 0 then
+    return false
+end
+redis.call('ZREM', KEYS[1], ids[1])
+redis.call('ZADD', KEYS[2], ARGV[2], ids[1])
+return ids[1]
+"""
+
+# Read the hash of a claimed job, and release the claim if the job no longer exists.
+# KEYS[1]: the job hash, KEYS[2]: PROCESSING_JOBS_KEY
+# ARGV[1]: property_on_sale_id
+# Returns the job hash as a flat list, an empty list if there is no job.
+READ_CLAIMED_JOB_SCRIPT = """
+local job = redis.call('HGETALL', KEYS[1])
+if #job == 0 then
+    redis.call('ZREM', KEYS[2], ARGV[1])
+end
+return job
+"""
+
+# Remove a completed job, unless a change has been coalesced into it while it was running.
+# KEYS[1]: the job hash, KEYS[2]: READY_JOBS_KEY, KEYS[3]: PROCESSING_JOBS_KEY
+# ARGV[1]: property_on_sale_id, ARGV[2]: the version of the job run, ARGV[3]: now
+COMPLETE_JOB_SCRIPT = """
+if redis.call('ZREM', KEYS[3], ARGV[1]) == 0 then
+    return 404
+end
+if redis.call('HGET', KEYS[1], 'version') == ARGV[2] then
+    redis.call('DEL', KEYS[1])
+    return 200
+end
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[1])
+return 409
+"""
+
+# Reschedule a failed job with exponential backoff, or move it to the dead set after the last attempt.
+# The buyers left are replaced only if no change has been coalesced into the job while it was running.
+# KEYS[1]: the job hash, KEYS[2]: READY_JOBS_KEY, KEYS[3]: PROCESSING_JOBS_KEY, KEYS[4]: DEAD_JOBS_KEY
+# ARGV[1]: property_on_sale_id, ARGV[2]: the version of the job run, ARGV[3]: the buyer_ids left as JSON,
+# ARGV[4]: all_buyers (0/1), ARGV[5]: now, ARGV[6]: first retry delay, ARGV[7]: max retry delay, ARGV[8]: max attempts
+RETRY_JOB_SCRIPT = """
+if redis.call('ZREM', KEYS[3], ARGV[1]) == 0 then
+    return 404
+end
+if redis.call('HGET', KEYS[1], 'version') == ARGV[2] then
+    redis.call('HSET', KEYS[1], 'buyer_ids', ARGV[3], 'all_buyers', ARGV[4])
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+if attempts >= tonumber(ARGV[8]) then
+    redis.call('ZADD', KEYS[4], ARGV[5], ARGV[1])
+    return 400
+end
+local delay = math.min(tonumber(ARGV[6]) * 2 ^ (attempts - 1), tonumber(ARGV[7]))
+redis.call('ZADD', KEYS[2], tonumber(ARGV[5]) + delay, ARGV[1])
+return 200
+"""
+
+# Put back in the ready set the jobs whose worker did not complete them within the visibility timeout.
+# KEYS[1]: PROCESSING_JOBS_KEY, KEYS[2]: READY_JOBS_KEY
+# ARGV[1]: now
+REQUEUE_EXPIRED_JOBS_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('ZADD', KEYS[2], ARGV[1], id)
+end
+return #ids
+"""
+
+enqueue_job = get_redis_client().register_script(ENQUEUE_JOB_SCRIPT)
+claim_job = get_redis_client().register_script(CLAIM_JOB_SCRIPT)
+read_claimed_job = get_redis_client().register_script(READ_CLAIMED_JOB_SCRIPT)
+complete_job = get_redis_client().register_script(COMPLETE_JOB_SCRIPT)
+retry_job = get_redis_client().register_script(RETRY_JOB_SCRIPT)
+requeue_expired_jobs = get_redis_client().register_script(REQUEUE_EXPIRED_JOBS_SCRIPT)
+
+JOB_KEY_PREFIX = "reservation_job:"
+
+def reservation_job_key(property_on_sale_id: str) -> str:
+    """
+    Args:
+        property_on_sale_id (str): The ID of the property on sale.
+
+    Returns:
+        str: The key of the job hash of the property.
+    """
+    return f"{JOB_KEY_PREFIX}{property_on_sale_id}"
+
+def enqueue_job_args(reservation_job: ReservationJob, delay: float) -> List[Any]:
+    """
+    Args:
+        reservation_job (ReservationJob): The job to enqueue.
+        delay (float): Seconds before the job can run.
+
+    Returns:
+        list: The ARGV of ENQUEUE_JOB_SCRIPT.
+    """
+    return [
+        reservation_job.property_on_sale_id,
+        json.dumps(reservation_job.buyer_ids),
+        json.dumps(reservation_job.updated_data),
+        int(reservation_job.delete),
+        int(reservation_job.all_buyers),
+        time.time() + delay
+    ]
+
+def job_from_hash(raw_job: List[Any]) -> Optional[ReservationJob]:
+    """
+    Decode the job hash returned by READ_CLAIMED_JOB_SCRIPT.
+
+    Args:
+        raw_job (list): The fields and values of the job hash, alternated.
+
+    Returns:
+        ReservationJob: The job, None if the hash is empty.
+    """
+    if not raw_job:
+        return None
+    fields = {
+        (field.decode() if isinstance(field, bytes) else field): (value.decode() if isinstance(value, bytes) else value)
+        for field, value in zip(raw_job[::2], raw_job[1::2])
+    }
+    # Lua encodes an empty table as an empty JSON object
+    buyer_ids = json.loads(fields.get("buyer_ids", "[]")) or []
+    updated_data = json.loads(fields.get("updated_data", "{}")) or {}
+    return ReservationJob(
+        property_on_sale_id=fields.get("property_on_sale_id"),
+        buyer_ids=list(buyer_ids),
+        updated_data=dict(updated_data),
+        delete=fields.get("delete") == "1",
+        all_buyers=fields.get("all_buyers") == "1",
+        attempts=int(fields.get("attempts", 0)),
+        version=int(fields.get("version", 0))
+    )
+
+class ReservationJobsDB:
+    reservation_job: ReservationJob = None
+
+    def __init__(self, reservation_job: Optional[ReservationJob] = None):
+        self.reservation_job = reservation_job
+
+    def enqueue(self, delay: float = JOB_RETRY_DELAY_SECONDS) -> int:
+        """
+        Enqueue this job, coalescing it into the pending job of the same property_on_sale_id if there is one.
+
+        Args:
+            delay (float): Seconds before the job can run (default is JOB_RETRY_DELAY_SECONDS).
+
+        Returns:
+            int: 201 if the job is created,
+                 200 if the job is coalesced into the pending one,
+                 500 if there's a Redis error.
+        """
+        redis_client = get_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        property_on_sale_id = self.reservation_job.property_on_sale_id
+        try:
+            return int(enqueue_job(
+                keys=[reservation_job_key(property_on_sale_id), READY_JOBS_KEY, PROCESSING_JOBS_KEY, DEAD_JOBS_KEY],
+                args=enqueue_job_args(self.reservation_job, delay)
+            ))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error enqueuing the reservation job of property_on_sale_id={property_on_sale_id}: {e}")
+            return 500
+
+    def claim(self, visibility_timeout: float = JOB_VISIBILITY_TIMEOUT_SECONDS) -> int:
+        """
+        Claim the first job that can run, stored in reservation_job.
+
+        Args:
+            visibility_timeout (float): Seconds before the job can be claimed again if it is not completed.
+
+        Returns:
+            int: 200 if a job is claimed,
+                 404 if no job can run,
+                 500 if there's a Redis or decoding error.
+        """
+        redis_client = get_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        now = time.time()
+        try:
+            property_on_sale_id = claim_job(keys=[READY_JOBS_KEY, PROCESSING_JOBS_KEY], args=[now, now + visibility_timeout])
+            if property_on_sale_id is None:
+                return 404
+            if isinstance(property_on_sale_id, bytes):
+                property_on_sale_id = property_on_sale_id.decode()
+            raw_job = read_claimed_job(
+                keys=[reservation_job_key(property_on_sale_id), PROCESSING_JOBS_KEY],
+                args=[property_on_sale_id]
+            )
+            self.reservation_job = job_from_hash(raw_job)
+        except (redis.exceptions.RedisError, json.JSONDecodeError, TypeError, ValueError) as e:
+            logger.error(f"Error claiming a reservation job: {e}")
+            return 500
+        if self.reservation_job is None:
+            return 404
+        return 200
+
+    def complete(self) -> int:
+        """
+        Remove this job after a successful run.
+
+        Returns:
+            int: 200 if the job is removed,
+                 409 if a change has been coalesced into the job while it was running, the job runs again,
+                 404 if the job is no longer claimed by this worker,
+                 500 if there's a Redis error.
+        """
+        redis_client = get_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        property_on_sale_id = self.reservation_job.property_on_sale_id
+        try:
+            return int(complete_job(
+                keys=[reservation_job_key(property_on_sale_id), READY_JOBS_KEY, PROCESSING_JOBS_KEY],
+                args=[property_on_sale_id, self.reservation_job.version, time.time()]
+            ))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error completing the reservation job of property_on_sale_id={property_on_sale_id}: {e}")
+            return 500
+
+    def retry(self, buyer_ids: List[str], all_buyers: bool = False) -> int:
+        """
+        Reschedule this job after a failed run, with exponential backoff.
+
+        Args:
+            buyer_ids (list): The buyers whose reservations still have to be propagated.
+            all_buyers (bool): The buyers still have to be read from the seller reservations.
+
+        Returns:
+            int: 200 if the job is rescheduled,
+                 400 if the job has exhausted its attempts and is moved to the dead jobs,
+                 404 if the job is no longer claimed by this worker,
+                 500 if there's a Redis error.
+        """
+        redis_client = get_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        property_on_sale_id = self.reservation_job.property_on_sale_id
+        try:
+            return int(retry_job(
+                keys=[reservation_job_key(property_on_sale_id), READY_JOBS_KEY, PROCESSING_JOBS_KEY, DEAD_JOBS_KEY],
+                args=[
+                    property_on_sale_id, self.reservation_job.version, json.dumps(buyer_ids), int(all_buyers),
+                    time.time(), JOB_RETRY_DELAY_SECONDS, JOB_MAX_RETRY_DELAY_SECONDS, JOB_MAX_ATTEMPTS
+                ]
+            ))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error rescheduling the reservation job of property_on_sale_id={property_on_sale_id}: {e}")
+            return 500
+
+    def requeue_expired(self) -> int:
+        """
+        Put back in the ready jobs the jobs whose visibility timeout has expired.
+
+        Returns:
+            int: The number of jobs requeued, -1 if there's a Redis error.
+        """
+        redis_client = get_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return -1
+        try:
+            return int(requeue_expired_jobs(keys=[PROCESSING_JOBS_KEY, READY_JOBS_KEY], args=[time.time()]))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error requeuing the expired reservation jobs: {e}")
+            return -1
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, field_validator
+from typing import Optional, List, Dict, Any
+from bson import ObjectId
+
+class ReservationJob(BaseModel):
+    property_on_sale_id: Optional[str] = None
+    # Buyers whose reservations still have to be updated or deleted
+    buyer_ids: List[str] = []
+    # Fields to update in the buyer reservations, ignored by a delete job
+    updated_data: Dict[str, Any] = {}
+    # The reservations of the property are deleted instead of updated
+    delete: bool = False
+    # The buyers are read from the seller reservations when the job runs
+    all_buyers: bool = False
+    attempts: int = 0
+    # Incremented by every enqueue coalesced into the job
+    version: int = 0
+
+    @field_validator('property_on_sale_id')
+    def check_object_id(cls, v: str) -> str:
+        if not ObjectId.is_valid(v):
+            raise ValueError('Invalid ObjectId string')
+        return v
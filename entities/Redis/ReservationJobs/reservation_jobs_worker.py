@@ -0,0 +1,131 @@
+import logging
+import threading
+from typing import List, Tuple
+from entities.Redis.ReservationJobs.reservation_job import ReservationJob
+from entities.Redis.ReservationJobs.db_reservation_jobs import ReservationJobsDB
+from entities.Redis.ReservationsBuyer.db_reservations_buyer import propagate_property_change, failed_buyer_ids
+from entities.Redis.ReservationsSeller.reservations_seller import ReservationsSeller
+from entities.Redis.ReservationsSeller.db_reservations_seller import ReservationsSellerDB
+from setup.load_monitor.load_monitor import load_monitor
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two polls of the queue when there is no job to run or the load is high
+POLL_INTERVAL_SECONDS = 5
+
+
+def run_reservation_job(reservation_job: ReservationJob) -> Tuple[List[str], bool]:
+    """
+    Propagate the update or the deletion of a property on sale to the reservations of the buyers of the job.
+
+    Args:
+        reservation_job (ReservationJob): The job to run.
+
+    Returns:
+        tuple: The buyer_ids whose reservations are still to propagate, and whether the buyers
+               are still to be read from the seller reservations.
+    """
+    buyer_ids = list(reservation_job.buyer_ids)
+    if reservation_job.all_buyers:
+        reservation_seller_db = ReservationsSellerDB(ReservationsSeller(property_on_sale_id=reservation_job.property_on_sale_id))
+        status = reservation_seller_db.get_reservation_seller()
+        if status == 500:
+            return buyer_ids, True
+        if status == 200:
+            buyer_ids += [reservation.buyer_id for reservation in reservation_seller_db.reservations_seller.reservations]
+    updated_data = None if reservation_job.delete else reservation_job.updated_data
+    statuses = propagate_property_change(buyer_ids, reservation_job.property_on_sale_id, updated_data)
+    return failed_buyer_ids(statuses), False
+
+
+class ReservationJobsWorker:
+    """
+    Runs the jobs of the durable reservation queue when the load is low. Any number of workers,
+    embedded in the API processes or started with worker.py, can share the same queue.
+    """
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL_SECONDS):
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def load_is_low(self) -> bool:
+        """
+        Returns:
+            bool: True if the load allows the jobs to run.
+        """
+        # The signal is sampled in background, checking it never waits
+        return load_monitor.is_low()
+
+    def run_once(self) -> int:
+        """
+        Requeue the expired jobs, then claim and run one job if the load is low.
+
+        Returns:
+            int: 200 if a job has been run,
+                 404 if there is no job to run,
+                 503 if the load is high,
+                 500 if there's a Redis error.
+        """
+        reservation_jobs_db = ReservationJobsDB()
+        requeued = reservation_jobs_db.requeue_expired()
+        if requeued > 0:
+            logger.warning("Requeued %s reservation jobs after their visibility timeout.", requeued)
+        if not self.load_is_low():
+            return 503
+        status = reservation_jobs_db.claim()
+        if status != 200:
+            return status
+
+        reservation_job = reservation_jobs_db.reservation_job
+        try:
+            buyer_ids, all_buyers = run_reservation_job(reservation_job)
+        except Exception as e:
+            logger.error("Error running the reservation job of property_on_sale_id=%s: %s", reservation_job.property_on_sale_id, e)
+            buyer_ids, all_buyers = reservation_job.buyer_ids, reservation_job.all_buyers
+
+        if buyer_ids or all_buyers:
+            status = reservation_jobs_db.retry(buyer_ids, all_buyers)
+            if status == 400:
+                logger.error("The reservation job of property_on_sale_id=%s exhausted its attempts.", reservation_job.property_on_sale_id)
+        else:
+            status = reservation_jobs_db.complete()
+        return 500 if status == 500 else 200
+
+    def run(self) -> None:
+        """
+        Run the jobs until stop is called.
+        """
+        load_monitor.start()
+        logger.info("Reservation jobs worker started.")
+        while not self.stop_event.is_set():
+            try:
+                status = self.run_once()
+            except Exception as e:
+                logger.error("Error in the reservation jobs worker: %s", e)
+                status = 500
+            # Drain the queue without waiting while there are jobs to run
+            if status != 200:
+                self.stop_event.wait(self.poll_interval)
+        logger.info("Reservation jobs worker stopped.")
+
+    def start(self) -> None:
+        """
+        Run the jobs in a daemon thread.
+        """
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="reservation-jobs-worker", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the worker after the job being run, if any.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.poll_interval + 5)
+
+
+reservation_jobs_worker = ReservationJobsWorker()
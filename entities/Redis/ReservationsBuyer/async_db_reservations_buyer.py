@@ -0,0 +1,266 @@
+from typing import Optional, List, Dict, Any
+from entities.Redis.ReservationsBuyer.reservations_buyer import ReservationsBuyer, ReservationB
+from entities.Redis.ReservationsBuyer.db_reservations_buyer import COMPARE_AND_SET_SCRIPT, PROPAGATION_BATCH_SIZE, PROPAGATION_ATTEMPTS, reservations_buyer_key, prepare_propagation, compare_and_set_args
+from setup.redis_setup.redis_setup import get_async_redis_client, get_async_redis_read_client, mark_redis_write, READ_FROM_MASTER
+import json
+import redis
+import logging
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+compare_and_set = get_async_redis_client().register_script(COMPARE_AND_SET_SCRIPT)
+
+async def propagate_property_change(buyer_ids: List[str], property_on_sale_id: str, updated_data: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """
+    Async counterpart of propagate_property_change in db_reservations_buyer, same statuses.
+
+    Args:
+        buyer_ids (list): The IDs of the buyers with a reservation for the property.
+        property_on_sale_id (str): The ID of the property on sale.
+        updated_data (dict, optional): The fields to update in the reservations, None to delete the reservations.
+
+    Returns:
+        dict: The status of every buyer_id.
+    """
+    statuses = {}
+    redis_client = get_async_redis_client()
+    if redis_client is None:
+        logger.error("Failed to connect to Redis.")
+        return {buyer_id: 500 for buyer_id in buyer_ids}
+    pending = list(dict.fromkeys(buyer_ids))
+    for _ in range(PROPAGATION_ATTEMPTS):
+        conflicts = []
+        for start in range(0, len(pending), PROPAGATION_BATCH_SIZE):
+            batch = pending[start:start + PROPAGATION_BATCH_SIZE]
+            try:
+                raw_values = await redis_client.mget([reservations_buyer_key(buyer_id) for buyer_id in batch])
+                rows = prepare_propagation(batch, raw_values, property_on_sale_id, updated_data, statuses)
+                if not rows:
+                    continue
+                results = await compare_and_set(keys=[key for _, key, _, _ in rows], args=compare_and_set_args(rows))
+            except redis.exceptions.RedisError as e:
+                logger.error(f"Error propagating the change of property_on_sale_id={property_on_sale_id}: {e}")
+                for buyer_id in batch:
+                    statuses.setdefault(buyer_id, 500)
+                continue
+            written_keys = []
+            for (buyer_id, key, _, _), result in zip(rows, results):
+                if int(result) == 409:
+                    conflicts.append(buyer_id)
+                else:
+                    statuses[buyer_id] = int(result)
+                    written_keys.append(key)
+            mark_redis_write(*written_keys)
+        pending = conflicts
+        if not pending:
+            break
+    for buyer_id in pending:
+        statuses[buyer_id] = 409
+    return statuses
+
+class AsyncReservationsBuyerDB:
+    """
+    Async counterpart of ReservationsBuyerDB, used by the request path.
+    Same methods, same status codes and same attributes, backed by the redis.asyncio client.
+    """
+    reservations_buyer: ReservationsBuyer = None
+
+    def __init__(self, reservations_buyer: Optional[ReservationsBuyer] = None):
+        self.reservations_buyer = reservations_buyer
+
+    async def create_reservation_buyer(self) -> int:
+        """
+        Create a new reservation for this buyer in Redis.
+
+        Returns:
+            int:
+                201 if the reservation is created successfully,
+                500 if there's a Redis or JSON decoding error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        key = f"buyer_id:{self.reservations_buyer.buyer_id}:reservations_buyer"
+        try:
+            existing_data = await redis_client.get(key)
+            new_reservations = [res.model_dump() if hasattr(res, "model_dump") else res for res in (self.reservations_buyer.reservations or [])]
+            reservations = json.loads(existing_data) + new_reservations if existing_data else new_reservations
+            await redis_client.set(key, json.dumps(reservations))
+            mark_redis_write(key)
+            return 201
+        except (redis.exceptions.RedisError, json.JSONDecodeError) as e:
+            logger.error(f"Error creating buyer reservation for buyer_id={self.reservations_buyer.buyer_id}: {e}")
+            return 500
+
+    async def get_reservations_by_user(self, read_preference: str = READ_FROM_MASTER) -> int:
+        """
+        Retrieve all reservations for this buyer from Redis.
+
+        Args:
+            read_preference (str): READ_FROM_REPLICA for reads that tolerate stale data,
+                READ_FROM_MASTER (default) for reads followed by a write.
+
+        Returns:
+            int:
+                200 if the reservations are retrieved,
+                404 if no data is found,
+                500 if there's a Redis or JSON decoding error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        key = f"buyer_id:{self.reservations_buyer.buyer_id}:reservations_buyer"
+        try:
+            read_client = get_async_redis_read_client(key, read_preference)
+            raw_data = await read_client.get(key)
+            if not raw_data:
+                return 404
+            data = json.loads(raw_data)
+            reservation_list = [ReservationB(**item) for item in data]
+            self.reservations_buyer = ReservationsBuyer(buyer_id=self.reservations_buyer.buyer_id, reservations=reservation_list)
+            return 200
+        except (redis.exceptions.RedisError, json.JSONDecodeError, TypeError) as e:
+            logger.error(f"Error decoding reservations data for buyer_id={self.reservations_buyer.buyer_id}: {e}")
+            return 500
+
+    async def update_reservation_buyer(self) -> int:
+        """
+        Update a reservation for this buyer in Redis.
+
+        Returns:
+            int:
+                200 if the reservation is updated,
+                404 if no matching reservation is found,
+                400 if reservations_buyer is not provided,
+                500 if there's a Redis or JSON decoding error.
+        """
+        if not self.reservations_buyer:
+            return 400
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        key = f"buyer_id:{self.reservations_buyer.buyer_id}:reservations_buyer"
+        try:
+            raw_data = await redis_client.get(key)
+            if not raw_data:
+                return 404
+            data = json.loads(raw_data)
+            updated = False
+            reservation_to_update = self.reservations_buyer.reservations[0]
+            for idx, res in enumerate(data):
+                if res.get("property_on_sale_id") == reservation_to_update.property_on_sale_id:
+                    data[idx] = reservation_to_update.model_dump()
+                    updated = True
+                    break
+            if not updated:
+                return 404
+            await redis_client.set(key, json.dumps(data))
+            mark_redis_write(key)
+            return 200
+        except (json.JSONDecodeError, TypeError, redis.exceptions.RedisError) as e:
+            logger.error(f"Error updating reservation for buyer_id={self.reservations_buyer.buyer_id}: {e}")
+            return 500
+
+    async def delete_reservations_buyer(self) -> int:
+        """
+        Delete all reservations for this buyer in Redis.
+
+        Returns:
+            int:
+                200 if the reservations are deleted,
+                404 if no reservations exist,
+                500 if there's a Redis error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        key = f"buyer_id:{self.reservations_buyer.buyer_id}:reservations_buyer"
+        try:
+            deleted = await redis_client.delete(key)
+            if deleted:
+                mark_redis_write(key)
+                return 200
+            return 404
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error during deletion of reservations for buyer_id={self.reservations_buyer.buyer_id}: {e}")
+            return 500
+
+    async def delete_reservation_by_property_on_sale_id(self, property_on_sale_id: str) -> int:
+        """
+        Delete a reservation for a specific property_on_sale_id.
+
+        Args:
+            property_on_sale_id (str): The property_on_sale_id to delete.
+
+        Returns:
+            int:
+                200 if the reservation is deleted,
+                404 if no reservation is found for that property_on_sale_id,
+                500 if there's a Redis or JSON decoding error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        key = f"buyer_id:{self.reservations_buyer.buyer_id}:reservations_buyer"
+        try:
+            raw_data = await redis_client.get(key)
+            if not raw_data:
+                return 404
+            data = json.loads(raw_data)
+            new_data = [res for res in data if res.get("property_on_sale_id") != property_on_sale_id]
+            if len(new_data) == len(data):
+                return 404
+            result = await redis_client.set(key, json.dumps(new_data))
+            if result:
+                mark_redis_write(key)
+                return 200
+            logger.error(f"Error deleting reservation for buyer_id={self.reservations_buyer.buyer_id}.")
+            return 500
+        except (json.JSONDecodeError, TypeError, redis.exceptions.RedisError) as e:
+            logger.error(f"Error deleting reservation for buyer_id={self.reservations_buyer.buyer_id}: {e}")
+            return 500
+
+    async def update_expired_reservations(self, read_preference: str = READ_FROM_MASTER) -> int:
+        """
+        Remove all expired reservations for this buyer in Redis.
+        With READ_FROM_REPLICA the reservations are read from a replica and, only when some have expired,
+        read again from the master before the update, so that no recent reservation is lost.
+
+        Args:
+            read_preference (str): READ_FROM_MASTER (default) or READ_FROM_REPLICA.
+
+        Returns:
+            int:
+                200 if expired reservations are removed or there are none,
+                404 if no reservations are found,
+                500 if there's a Redis or JSON decoding error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        key = f"buyer_id:{self.reservations_buyer.buyer_id}:reservations_buyer"
+        try:
+            read_client = get_async_redis_read_client(key, read_preference)
+            raw_data = await read_client.get(key)
+            if not raw_data:
+                return 404
+            data = json.loads(raw_data)
+            new_data = [res for res in data if not ReservationB(**res).check_reservation_expired()]
+            # The update is performed only if there are expired reservations
+            if len(new_data) != len(data):
+                if read_client is not redis_client:
+                    return await self.update_expired_reservations(READ_FROM_MASTER)
+                await redis_client.set(key, json.dumps(new_data))
+                mark_redis_write(key)
+            self.reservations_buyer.reservations = new_data
+            return 200
+        except (json.JSONDecodeError, TypeError, redis.exceptions.RedisError) as e:
+            logger.error(f"Error updating expired reservations for buyer_id={self.reservations_buyer.buyer_id}: {e}")
+            return 500
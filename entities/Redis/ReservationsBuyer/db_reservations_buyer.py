@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
 from entities.Redis.ReservationsBuyer.reservations_buyer import ReservationsBuyer, ReservationB
-from setup.redis_setup.redis_setup import get_redis_client
+from setup.redis_setup.redis_setup import get_redis_client, get_redis_read_client, mark_redis_write, READ_FROM_MASTER
 import json
 import redis
 import logging
@@ -8,6 +8,170 @@ import logging
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Buyer keys read with one MGET and written back with one script call by propagate_property_change
+PROPAGATION_BATCH_SIZE = 500
+# Rounds of propagate_property_change on the keys modified between the read and the write back
+PROPAGATION_ATTEMPTS = 3
+
+# Write back the buyer reservations changed in memory, only where they are unchanged since they were read,
+# so that a reservation booked in the meantime is never lost.
+# KEYS: the buyer reservation keys
+# ARGV: for every key, the value read and the value to write
+# Returns one status per key: 200 if written, 409 if the key has been modified since it was read.
+COMPARE_AND_SET_SCRIPT = """
+local statuses = {}
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[2 * i - 1] then
+        redis.call('SET', key, ARGV[2 * i])
+        statuses[i] = 200
+    else
+        statuses[i] = 409
+    end
+end
+return statuses
+"""
+
+compare_and_set = get_redis_client().register_script(COMPARE_AND_SET_SCRIPT)
+
+def reservations_buyer_key(buyer_id: str) -> str:
+    """
+    Args:
+        buyer_id (str): The ID of the buyer.
+
+    Returns:
+        str: The key of the reservations of the buyer.
+    """
+    return f"buyer_id:{buyer_id}:reservations_buyer"
+
+def apply_property_change(raw_data, property_on_sale_id: str, updated_data: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Apply the change of a property on sale to the stored reservations of a buyer.
+
+    Args:
+        raw_data: The stored reservations, as JSON.
+        property_on_sale_id (str): The ID of the property on sale.
+        updated_data (dict, optional): The fields to update in the reservation, None to delete the reservation.
+
+    Returns:
+        str: The reservations to store as JSON, None if the buyer has no reservation for the property.
+    """
+    data = json.loads(raw_data)
+    matching = [res for res in data if res.get("property_on_sale_id") == property_on_sale_id]
+    if not matching:
+        return None
+    if updated_data is None:
+        data = [res for res in data if res.get("property_on_sale_id") != property_on_sale_id]
+    else:
+        for res in matching:
+            res.update(updated_data)
+    return json.dumps(data)
+
+def prepare_propagation(buyer_ids: List[str], raw_values: List[Any], property_on_sale_id: str, updated_data: Optional[Dict[str, Any]], statuses: Dict[str, int]) -> List[Tuple[str, str, Any, str]]:
+    """
+    Apply the change in memory to a batch of buyers read with MGET. The buyers without a reservation
+    for the property get 404 in statuses, the ones with undecodable reservations get 500.
+
+    Args:
+        buyer_ids (list): The IDs of the buyers of the batch.
+        raw_values (list): The stored reservations of the buyers, in the same order.
+        property_on_sale_id (str): The ID of the property on sale.
+        updated_data (dict, optional): The fields to update in the reservation, None to delete the reservation.
+        statuses (dict): The statuses by buyer_id, updated in place.
+
+    Returns:
+        list: The buyer_id, key, value read and value to write of every buyer to write back.
+    """
+    rows = []
+    for buyer_id, raw_data in zip(buyer_ids, raw_values):
+        if raw_data is None:
+            statuses[buyer_id] = 404
+            continue
+        try:
+            new_data = apply_property_change(raw_data, property_on_sale_id, updated_data)
+        except (json.JSONDecodeError, TypeError, AttributeError) as e:
+            logger.error(f"Error decoding reservations data for buyer_id={buyer_id}: {e}")
+            statuses[buyer_id] = 500
+            continue
+        if new_data is None:
+            statuses[buyer_id] = 404
+            continue
+        rows.append((buyer_id, reservations_buyer_key(buyer_id), raw_data, new_data))
+    return rows
+
+def compare_and_set_args(rows: List[Tuple[str, str, Any, str]]) -> List[Any]:
+    """
+    Args:
+        rows (list): The rows returned by prepare_propagation.
+
+    Returns:
+        list: The ARGV of COMPARE_AND_SET_SCRIPT.
+    """
+    return [value for _, _, raw_data, new_data in rows for value in (raw_data, new_data)]
+
+def propagate_property_change(buyer_ids: List[str], property_on_sale_id: str, updated_data: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """
+    Propagate the update or the deletion of a property on sale to the reservations of its buyers.
+    Every batch of buyers is read with one MGET, changed in memory and written back with one
+    COMPARE_AND_SET_SCRIPT call; the buyers modified in the meantime are retried.
+
+    Args:
+        buyer_ids (list): The IDs of the buyers with a reservation for the property.
+        property_on_sale_id (str): The ID of the property on sale.
+        updated_data (dict, optional): The fields to update in the reservations, None to delete the reservations.
+
+    Returns:
+        dict: The status of every buyer_id:
+            200 if the reservation is updated or deleted,
+            404 if the buyer has no reservation for the property,
+            409 if the reservations of the buyer kept changing during every attempt,
+            500 if there's a Redis or JSON decoding error.
+    """
+    statuses = {}
+    redis_client = get_redis_client()
+    if redis_client is None:
+        logger.error("Failed to connect to Redis.")
+        return {buyer_id: 500 for buyer_id in buyer_ids}
+    pending = list(dict.fromkeys(buyer_ids))
+    for _ in range(PROPAGATION_ATTEMPTS):
+        conflicts = []
+        for start in range(0, len(pending), PROPAGATION_BATCH_SIZE):
+            batch = pending[start:start + PROPAGATION_BATCH_SIZE]
+            try:
+                raw_values = redis_client.mget([reservations_buyer_key(buyer_id) for buyer_id in batch])
+                rows = prepare_propagation(batch, raw_values, property_on_sale_id, updated_data, statuses)
+                if not rows:
+                    continue
+                results = compare_and_set(keys=[key for _, key, _, _ in rows], args=compare_and_set_args(rows))
+            except redis.exceptions.RedisError as e:
+                logger.error(f"Error propagating the change of property_on_sale_id={property_on_sale_id}: {e}")
+                for buyer_id in batch:
+                    statuses.setdefault(buyer_id, 500)
+                continue
+            written_keys = []
+            for (buyer_id, key, _, _), result in zip(rows, results):
+                if int(result) == 409:
+                    conflicts.append(buyer_id)
+                else:
+                    statuses[buyer_id] = int(result)
+                    written_keys.append(key)
+            mark_redis_write(*written_keys)
+        pending = conflicts
+        if not pending:
+            break
+    for buyer_id in pending:
+        statuses[buyer_id] = 409
+    return statuses
+
+def failed_buyer_ids(statuses: Dict[str, int]) -> List[str]:
+    """
+    Args:
+        statuses (dict): The statuses by buyer_id returned by propagate_property_change.
+
+    Returns:
+        list: The buyer_ids whose reservations must be propagated again, a buyer without a reservation for the property is done.
+    """
+    return [buyer_id for buyer_id, status in statuses.items() if status not in (200, 404)]
+
 class ReservationsBuyerDB:
     reservations_buyer: ReservationsBuyer = None
     
@@ -37,15 +201,20 @@ class ReservationsBuyerDB:
             else:
                 reservations = new_reservations
             redis_client.set(key, json.dumps(reservations))
+            mark_redis_write(key)
             return 201
         except (redis.exceptions.RedisError, json.JSONDecodeError) as e:
             logger.error(f"Error creating buyer reservation for buyer_id={self.reservations_buyer.buyer_id}: {e}")
             return 500
             
-    def get_reservations_by_user(self) -> int:
+    def get_reservations_by_user(self, read_preference: str = READ_FROM_MASTER) -> int:
         """
         Retrieve all reservations for this buyer from Redis.
 
+        Args:
+            read_preference (str): READ_FROM_REPLICA for reads that tolerate stale data,
+                READ_FROM_MASTER (default) for reads followed by a write.
+
         Returns:
             int:
                 200 if the reservations are retrieved,
@@ -57,7 +226,7 @@ class ReservationsBuyerDB:
             logger.error("Failed to connect to Redis.")
             return 500
         key = f"buyer_id:{self.reservations_buyer.buyer_id}:reservations_buyer"
-        raw_data = redis_client.get(key)
+        raw_data = get_redis_read_client(key, read_preference).get(key)
         if not raw_data:
             return 404
         try:
@@ -102,6 +271,7 @@ class ReservationsBuyerDB:
             if not updated:
                 return 404
             redis_client.set(key, json.dumps(data))
+            mark_redis_write(key)
             return 200
         except (json.JSONDecodeError, TypeError, redis.exceptions.RedisError) as e:
             logger.error(f"Error updating reservation for buyer_id={self.reservations_buyer.buyer_id}: {e}")
@@ -125,6 +295,7 @@ class ReservationsBuyerDB:
             key = f"buyer_id:{self.reservations_buyer.buyer_id}:reservations_buyer"
             result = redis_client.delete(key)
             if result:
+                mark_redis_write(key)
                 return 200
             else:
                 return 404
@@ -160,6 +331,7 @@ class ReservationsBuyerDB:
                 return 404
             result = redis_client.set(key, json.dumps(new_data))
             if result:
+                mark_redis_write(key)
                 return 200
             logger.error(f"Error deleting reservation for buyer_id={self.reservations_buyer.buyer_id}.")
             return 500
@@ -167,9 +339,14 @@ class ReservationsBuyerDB:
             logger.error(f"Error deleting reservation for buyer_id={self.reservations_buyer.buyer_id}: {e}")
             return 500
 
-    def update_expired_reservations(self) -> int:
+    def update_expired_reservations(self, read_preference: str = READ_FROM_MASTER) -> int:
         """
         Remove all expired reservations for this buyer in Redis.
+        With READ_FROM_REPLICA the reservations are read from a replica and, only when some have expired,
+        read again from the master before the update, so that no recent reservation is lost.
+
+        Args:
+            read_preference (str): READ_FROM_MASTER (default) or READ_FROM_REPLICA.
 
         Returns:
             int:
@@ -182,7 +359,8 @@ class ReservationsBuyerDB:
             logger.error("Failed to connect to Redis.")
             return 500
         key = f"buyer_id:{self.reservations_buyer.buyer_id}:reservations_buyer"
-        raw_data = redis_client.get(key)
+        read_client = get_redis_read_client(key, read_preference)
+        raw_data = read_client.get(key)
         if not raw_data:
             return 404
         try:
@@ -190,7 +368,10 @@ class ReservationsBuyerDB:
             new_data = [res for res in data if not ReservationB(**res).check_reservation_expired()]
             # The update is performed only if there are expired reservations
             if len(new_data) != len(data):
+                if read_client is not redis_client:
+                    return self.update_expired_reservations(READ_FROM_MASTER)
                 redis_client.set(key, json.dumps(new_data))
+                mark_redis_write(key)
             self.reservations_buyer.reservations = new_data
             return 200
         except (json.JSONDecodeError, TypeError) as e:
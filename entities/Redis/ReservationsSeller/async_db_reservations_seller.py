@@ -0,0 +1,149 @@
+import json
+from typing import Optional
+import redis
+import logging
+from entities.Redis.ReservationsSeller.reservations_seller import ReservationsSeller, ReservationS, convert_to_seconds
+from entities.Redis.ReservationsSeller.db_reservations_seller import BOOK_RESERVATION_SCRIPT, reservations_seller_key
+from setup.redis_setup.redis_setup import get_async_redis_client, get_async_redis_read_client, mark_redis_write, READ_FROM_MASTER
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+book_reservation = get_async_redis_client().register_script(BOOK_RESERVATION_SCRIPT)
+
+class AsyncReservationsSellerDB:
+    """
+    Async counterpart of ReservationsSellerDB, used by the request path.
+    Same methods, same status codes and same attributes, backed by the redis.asyncio client.
+    """
+    reservations_seller: ReservationsSeller = None
+
+    def __init__(self, reservations_seller: Optional[ReservationsSeller] = None):
+        self.reservations_seller = reservations_seller
+
+    async def get_reservation_seller(self, read_preference: str = READ_FROM_MASTER) -> int:
+        """
+        Retrieve the reservation data for this property_on_sale_id from Redis.
+
+        Args:
+            read_preference (str): READ_FROM_REPLICA for reads that tolerate stale data,
+                READ_FROM_MASTER (default) for reads followed by a write.
+
+        Returns:
+            int: 200 if the data is retrieved successfully,
+                 404 if no data is found,
+                 500 if there is an internal error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        key = reservations_seller_key(self.reservations_seller.property_on_sale_id)
+        try:
+            read_client = get_async_redis_read_client(key, read_preference)
+            raw_reservations = await read_client.hvals(key)
+            if not raw_reservations:
+                return 404
+            self.reservations_seller = ReservationsSeller(
+                property_on_sale_id=self.reservations_seller.property_on_sale_id,
+                reservations=[ReservationS(**json.loads(item)) for item in raw_reservations]
+            )
+            return 200
+        except (redis.exceptions.RedisError, json.JSONDecodeError, TypeError) as e:
+            logger.error(f"Error retrieving seller reservation for property_on_sale_id={self.reservations_seller.property_on_sale_id}: {e}")
+            return 500
+
+    async def delete_reservation_seller_by_buyer_id(self, buyer_id: str) -> int:
+        """
+        Delete a reservation for a specific buyer from this property_on_sale_id.
+
+        Args:
+            buyer_id (str): The buyer's ID whose reservation needs to be deleted.
+
+        Returns:
+            int: 200 if the reservation is deleted,
+                 404 if the reservation or buyer is not found,
+                 500 if there is an internal error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        key = reservations_seller_key(self.reservations_seller.property_on_sale_id)
+        try:
+            # HDEL keeps the expiration of the open house event
+            deleted = await redis_client.hdel(key, buyer_id)
+            if not deleted:
+                return 404
+            mark_redis_write(key)
+            return 200
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error deleting seller reservation with buyer_id={buyer_id}: {e}")
+            return 500
+
+    async def update_day_and_time(self, day: str, time: str) -> int:
+        """
+        Update the TTL (day and time) of the seller's reservation data for this property_on_sale_id.
+
+        Args:
+            day (str): The new day of the reservation.
+            time (str): The new time of the reservation.
+
+        Returns:
+            int: 200 if the TTL is updated successfully,
+                 404 if no data is found,
+                 500 if there is an internal error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        key = reservations_seller_key(self.reservations_seller.property_on_sale_id)
+        try:
+            ttl = convert_to_seconds(day, time)
+            # EXPIRE returns False when the key does not exist
+            updated = await redis_client.expire(key, ttl)
+            if not updated:
+                return 404
+            mark_redis_write(key)
+            return 200
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error updating day and time for property_on_sale_id={self.reservations_seller.property_on_sale_id}: {e}")
+            return 500
+
+    async def handle_book_now_transaction(self, reservation: ReservationS, day: str, time: str, buyer_id: str, max_attendees: int) -> int:
+        """
+        Book a new reservation for this property_on_sale_id with BOOK_RESERVATION_SCRIPT, which checks
+        duplicates and max_attendees and inserts in a single atomic step, so concurrent bookings never conflict.
+
+        Args:
+            reservation (ReservationS): The reservation details to store.
+            day (str): The day of the reservation.
+            time (str): The time of the reservation.
+            buyer_id (str): The ID of the buyer making the reservation.
+            max_attendees (int): The max number of allowed reservations.
+
+        Returns:
+            int: 200 if the reservation is booked,
+                 400 if max_attendees is reached or day/time is invalid,
+                 409 if the buyer already has a reservation,
+                 500 if there's a Redis error.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            logger.error("Failed to connect to Redis.")
+            return 500
+        key = reservations_seller_key(self.reservations_seller.property_on_sale_id)
+        ttl = convert_to_seconds(day, time)
+        if ttl is None:
+            return 400
+
+        try:
+            status = int(await book_reservation(keys=[key], args=[buyer_id, json.dumps(reservation.model_dump()), max_attendees, ttl]))
+            # A refused booking writes nothing
+            if status == 200:
+                mark_redis_write(key)
+            return status
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error in handle_book_now_transaction: {e}")
+            return 500
@@ -3,11 +3,41 @@ from typing import Optional
 import redis
 import logging
 from entities.Redis.ReservationsSeller.reservations_seller import ReservationsSeller, ReservationS, convert_to_seconds
-from setup.redis_setup.redis_setup import get_redis_client
+from setup.redis_setup.redis_setup import get_redis_client, get_redis_read_client, mark_redis_write, READ_FROM_MASTER
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# The reservations of a property are a hash: one field per buyer_id, holding the ReservationS as JSON.
+# HLEN is the attendee counter, and the key expires at the end of the open house.
+
+# Book a reservation atomically in one round trip, no optimistic retry needed.
+# KEYS[1]: the reservations hash
+# ARGV[1]: buyer_id, ARGV[2]: the reservation as JSON, ARGV[3]: max_attendees, ARGV[4]: TTL in seconds
+BOOK_RESERVATION_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+    return 409
+end
+if redis.call('HLEN', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 400
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 200
+"""
+
+book_reservation = get_redis_client().register_script(BOOK_RESERVATION_SCRIPT)
+
+def reservations_seller_key(property_on_sale_id: str) -> str:
+    """
+    Args:
+        property_on_sale_id (str): The ID of the property on sale.
+
+    Returns:
+        str: The key of the reservations hash of the property.
+    """
+    return f"property_on_sale_id:{property_on_sale_id}:reservations_seller"
+
 class ReservationsSellerDB:
     reservations_seller: ReservationsSeller = None
 
@@ -27,49 +57,23 @@ class ReservationsSellerDB:
         Returns:
             int: 200 if the reservation was created successfully, 
                  409 if the buyer already has a reservation, 
-                 400 if max_attendees has been reached,
+                 400 if max_attendees has been reached or day/time is invalid,
                  500 if there's an internal error.
         """
-        redis_client = get_redis_client()
-        if redis_client is None:
-            logger.error("Failed to connect to Redis.")
-            return 500
-        key = f"property_on_sale_id:{self.reservations_seller.property_on_sale_id}:reservations_seller"
-        try:
-            ttl = convert_to_seconds(day, time)
-            # Get existing reservations data from redis
-            existing_data = redis_client.get(key)
-            if self.reservations_seller.reservations and len(self.reservations_seller.reservations) > 0:
-                new_reservation_dict = self.reservations_seller.reservations[0].model_dump()
-            else:
-                new_reservation_dict = {"buyer_id": buyer_id}
-            
-            if existing_data:
-                data = json.loads(existing_data)
-                reservations_list = data
-                # Check if this buyer already has a reservation
-                for reservation in reservations_list:
-                    if reservation.get("buyer_id") == new_reservation_dict.get("buyer_id"):
-                        return 409
-                # Check if max reservations has been reached
-                if len(reservations_list) >= max_attendees:
-                    return 400
-                reservations_list.append(new_reservation_dict)
-                data = reservations_list
-            else:
-                # No existing data: use current data from self.reservations_seller
-                data = self.reservations_seller.model_dump()
-                data = [new_reservation_dict]
-            redis_client.setex(key, ttl, json.dumps(data))
-            return 200
-        except (redis.exceptions.RedisError, json.JSONDecodeError) as e:
-            logger.error(f"Error creating seller reservation for property_on_sale_id={self.reservations_seller.property_on_sale_id}: {e}")
-            return 500
+        if self.reservations_seller.reservations and len(self.reservations_seller.reservations) > 0:
+            reservation = self.reservations_seller.reservations[0]
+        else:
+            reservation = ReservationS(buyer_id=buyer_id)
+        return self.handle_book_now_transaction(reservation, day, time, buyer_id, max_attendees)
 
-    def get_reservation_seller(self) -> int:
+    def get_reservation_seller(self, read_preference: str = READ_FROM_MASTER) -> int:
         """
         Retrieve the reservation data for this property_on_sale_id from Redis.
 
+        Args:
+            read_preference (str): READ_FROM_REPLICA for reads that tolerate stale data,
+                READ_FROM_MASTER (default) for reads followed by a write.
+
         Returns:
             int: 200 if the data is retrieved successfully,
                  404 if no data is found,
@@ -79,17 +83,16 @@ class ReservationsSellerDB:
         if redis_client is None:
             logger.error("Failed to connect to Redis.")
             return 500
-        key = f"property_on_sale_id:{self.reservations_seller.property_on_sale_id}:reservations_seller"
-        raw_data = redis_client.get(key)
-        if not raw_data:
-            return 404
+        key = reservations_seller_key(self.reservations_seller.property_on_sale_id)
         try:
-            data = json.loads(raw_data)
+            raw_reservations = get_redis_read_client(key, read_preference).hvals(key)
+            if not raw_reservations:
+                return 404
             self.reservations_seller = ReservationsSeller(
                 property_on_sale_id=self.reservations_seller.property_on_sale_id,
                 reservations=[
-                    ReservationS(**item)
-                    for item in data
+                    ReservationS(**json.loads(item))
+                    for item in raw_reservations
                 ]
             )
             return 200
@@ -114,20 +117,16 @@ class ReservationsSellerDB:
         if redis_client is None:
             logger.error("Failed to connect to Redis.")
             return 500
-        key = f"property_on_sale_id:{self.reservations_seller.property_on_sale_id}:reservations_seller"
-        raw_data = redis_client.get(key)
-        if not raw_data:
-            return 404
+        key = reservations_seller_key(self.reservations_seller.property_on_sale_id)
         try:
-            data = json.loads(raw_data)
-            updated = False
-            for i, item in enumerate(data):
-                if item.get("buyer_id") == buyer_id:
-                    data[i].update(updated_data)
-                    updated = True
-                    break
-            if not updated:
+            raw_reservation = redis_client.hget(key, buyer_id)
+            if not raw_reservation:
                 return 404
+            reservation = json.loads(raw_reservation)
+            reservation.update(updated_data)
+            # HSET keeps the expiration of the open house event
+            redis_client.hset(key, buyer_id, json.dumps(reservation))
+            mark_redis_write(key)
             return 200
         except (json.JSONDecodeError, TypeError, redis.exceptions.RedisError) as e:
             logger.error(f"Error updating seller reservation with buyer_id={buyer_id}: {e}")
@@ -149,17 +148,15 @@ class ReservationsSellerDB:
         if redis_client is None:
             logger.error("Failed to connect to Redis.")
             return 500
-        key = f"property_on_sale_id:{self.reservations_seller.property_on_sale_id}:reservations_seller"
-        raw_data = redis_client.get(key)
-        if not raw_data:
-            return 404
+        key = reservations_seller_key(self.reservations_seller.property_on_sale_id)
         try:
-            data = json.loads(raw_data)
-            new_list = [item for item in data if item.get("buyer_id") != buyer_id]
-            data = new_list
-            redis_client.set(key, json.dumps(data))
+            # HDEL keeps the expiration of the open house event
+            deleted = redis_client.hdel(key, buyer_id)
+            if not deleted:
+                return 404
+            mark_redis_write(key)
             return 200
-        except (json.JSONDecodeError, TypeError, redis.exceptions.RedisError) as e:
+        except redis.exceptions.RedisError as e:
             logger.error(f"Error deleting seller reservation with buyer_id={buyer_id}: {e}")
             return 500
 
@@ -175,9 +172,10 @@ class ReservationsSellerDB:
         if redis_client is None:
             logger.error("Failed to connect to Redis.")
             return 500
-        key = f"property_on_sale_id:{self.reservations_seller.property_on_sale_id}:reservations_seller"
+        key = reservations_seller_key(self.reservations_seller.property_on_sale_id)
         try:
-            redis_client.delete(key)
+            if redis_client.delete(key):
+                mark_redis_write(key)
             return 200
         except redis.exceptions.RedisError as e:
             logger.error(f"Error deleting entire seller reservation for property_on_sale_id={self.reservations_seller.property_on_sale_id}: {e}")
@@ -200,22 +198,23 @@ class ReservationsSellerDB:
         if redis_client is None:
             logger.error("Failed to connect to Redis.")
             return 500
-        key = f"property_on_sale_id:{self.reservations_seller.property_on_sale_id}:reservations_seller"
+        key = reservations_seller_key(self.reservations_seller.property_on_sale_id)
         try:
             ttl = convert_to_seconds(day, time)
-            raw_data = redis_client.get(key)
-            if not raw_data:
+            # EXPIRE returns False when the key does not exist
+            updated = redis_client.expire(key, ttl)
+            if not updated:
                 return 404
-            redis_client.expire(key, ttl)
+            mark_redis_write(key)
             return 200
-        except (redis.exceptions.RedisError, json.JSONDecodeError) as e:
+        except redis.exceptions.RedisError as e:
             logger.error(f"Error updating day and time for property_on_sale_id={self.reservations_seller.property_on_sale_id}: {e}")
             return 500
-        
+
     def handle_book_now_transaction(self, reservation: ReservationS, day: str, time: str, buyer_id: str, max_attendees: int) -> int:
         """
-        Handle a new reservation in a transactional way to avoid concurrency issues,
-        linking it to this property_on_sale_id.
+        Book a new reservation for this property_on_sale_id with BOOK_RESERVATION_SCRIPT, which checks
+        duplicates and max_attendees and inserts in a single atomic step, so concurrent bookings never conflict.
 
         Args:
             reservation (ReservationS): The reservation details to store.
@@ -225,45 +224,26 @@ class ReservationsSellerDB:
             max_attendees (int): The max number of allowed reservations.
 
         Returns:
-            int: 200 if the transaction succeeds, 
+            int: 200 if the reservation is booked, 
                  400 if max_attendees is reached or day/time is invalid, 
                  409 if the buyer already has a reservation,
-                 500 if there's a concurrency or Redis error.
+                 500 if there's a Redis error.
         """
         redis_client = get_redis_client()
         if redis_client is None:
             logger.error("Failed to connect to Redis.")
             return 500
-        key = f"property_on_sale_id:{self.reservations_seller.property_on_sale_id}:reservations_seller"
+        key = reservations_seller_key(self.reservations_seller.property_on_sale_id)
         ttl = convert_to_seconds(day, time)
         if ttl is None:
             return 400
 
         try:
-            with redis_client.pipeline() as pipe:
-                # Watch the key to detect concurrent modifications
-                pipe.watch(key)
-
-                # Retrieve the data BEFORE starting the transaction
-                raw_data = pipe.get(key)
-                reservations_list = json.loads(raw_data) if raw_data else []
-
-                # Check max attendees
-                if len(reservations_list) >= max_attendees:
-                    pipe.unwatch()
-                    return 400
-
-                # Append new reservation
-                reservations_list.append(reservation.model_dump())
-
-                # Start transaction
-                pipe.multi()
-                pipe.setex(key, ttl, json.dumps(reservations_list))
-                pipe.execute()
-                return 200
-        except redis.exceptions.WatchError:
-            logger.error(f"Transaction conflict on key={key}.")
-            return 500
-        except (redis.exceptions.RedisError, json.JSONDecodeError) as e:
+            status = int(book_reservation(keys=[key], args=[buyer_id, json.dumps(reservation.model_dump()), max_attendees, ttl]))
+            # A refused booking writes nothing
+            if status == 200:
+                mark_redis_write(key)
+            return status
+        except redis.exceptions.RedisError as e:
             logger.error(f"Error in handle_book_now_transaction: {e}")
-            return 500
\ No newline at end of file
+            return 500
@@ -1,12 +1,12 @@
 import logging
 from dotenv import load_dotenv
-from app import app
 import uvicorn
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# The app is imported by uvicorn, not here: the processes of the password hashing pool import this module
 if __name__ == "__main__":
     load_dotenv()
     logger.info("Starting the FastAPI application.")
@@ -1 +0,0 @@
-from .helpers.JwtHandler import JWTHandler
\ No newline at end of file
@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import JSONResponse, RedirectResponse
 
 from modules.Auth.helpers.JwtHandler import JWTHandler
-from modules.Auth.helpers.auth_helpers import hash_password, verify_hashed_password
-from entities.MongoDB.Buyer.db_buyer import BuyerDB
-from entities.MongoDB.Seller.db_seller import SellerDB
+from modules.Auth.helpers.password_hasher import password_hasher, PasswordHasherBusy, password_hasher_busy
+from entities.MongoDB.Buyer.async_db_buyer import AsyncBuyerDB
+from entities.MongoDB.Seller.async_db_seller import AsyncSellerDB
 from entities.MongoDB.Buyer.buyer import Buyer
 from entities.MongoDB.Seller.seller import Seller
 from modules.Auth.models import response_models as ResponseModels
@@ -13,7 +13,7 @@ from modules.Auth.models import auth_models as AuthModels
 auth_router = APIRouter(prefix="/auth", tags=["Auth"])
 
 @auth_router.post("/login", response_model=ResponseModels.LoginResponseModel, responses= ResponseModels.LoginResponseModelResponses)
-def login(login_info: AuthModels.Login, user_type: str):
+async def login(login_info: AuthModels.Login, user_type: str):
     """
     Log in a user and return the access and refresh tokens, access token can be used on the padlock to unlock reserved features.
 
@@ -26,6 +26,8 @@ def login(login_info: AuthModels.Login, user_type: str):
         HTTPException: 400 if the user type is invalid or the email is missing.
                        404 if the user is not found.
                        401 if the password is incorrect.
+                       500 if there is a database error.
+                       503 if the password hashing pool is saturated.
 
     Returns:
         JSONResponse: The access and refresh tokens.
@@ -34,21 +36,27 @@ def login(login_info: AuthModels.Login, user_type: str):
         raise HTTPException(status_code=400, detail="Invalid user type")
     
     if user_type == "buyer":
-        user_db = BuyerDB()
-        result = user_db.get_buyer_by_email(login_info.email)
+        user_db = AsyncBuyerDB()
+        result = await user_db.get_buyer_by_email(login_info.email, with_password=True)
     elif user_type == "seller":
-        user_db = SellerDB()
-        result = user_db.get_seller_by_email(login_info.email)
+        user_db = AsyncSellerDB()
+        result = await user_db.get_seller_by_email(login_info.email, with_password=True)
     
     if result == 404:
         raise HTTPException(status_code=404, detail="User not found")
     elif result == 400:
         raise HTTPException(status_code=400, detail="email not given")
+    elif result == 500:
+        raise HTTPException(status_code=500, detail="Error during login")
     
     user = getattr(user_db, user_type)
     user_id = getattr(user, f"{user_type}_id")
     
-    pw_is_correct = verify_hashed_password(user.password, login_info.password)
+    # bcrypt runs in the password hashing pool, not in the threadpool of the API
+    try:
+        pw_is_correct = await password_hasher.verify_hashed_password(user.password, login_info.password)
+    except PasswordHasherBusy:
+        raise password_hasher_busy()
     if not pw_is_correct:
         raise HTTPException(status_code=401, detail="Wrong credentials")
     
@@ -85,7 +93,7 @@ def refreshAccToken(refresh_token: str = Depends(JWTHandler())):
     )
 
 @auth_router.post("/signup/buyer", response_model=ResponseModels.SuccessModel, responses=ResponseModels.RegisterResponseModelResponses)
-def register_buyer(user_info: AuthModels.CreateBuyer):
+async def register_buyer(user_info: AuthModels.CreateBuyer):
     """
     Register a buyer.
 
@@ -96,21 +104,27 @@ def register_buyer(user_info: AuthModels.CreateBuyer):
         HTTPException: 409 if the email already exists.
                        500 if there is an error during buyer creation.
                        400 if the provided data is invalid.
+                       503 if the password hashing pool is saturated.
 
     Returns:
         JSONResponse: A success message if registration is successful.
     """
     # Check if the email already exists in the buyer database
-    buyer_db = BuyerDB()
-    existing_check = buyer_db.get_buyer_by_email(user_info.email)
+    buyer_db = AsyncBuyerDB()
+    existing_check = await buyer_db.get_buyer_by_email(user_info.email)
+    if existing_check == 500:
+        raise HTTPException(status_code=500, detail="Error during buyer creation")
     if existing_check != 404:
         raise HTTPException(status_code=409, detail="Email already exists")
 
     # Hash of the password and creation of the user
-    hashed_pw = hash_password(user_info.password)
+    try:
+        hashed_pw = await password_hasher.hash_password(user_info.password)
+    except PasswordHasherBusy:
+        raise password_hasher_busy()
     user_info.password = hashed_pw
     buyer_db.buyer = Buyer(**user_info.model_dump())
-    result = buyer_db.create_buyer()
+    result = await buyer_db.create_buyer()
     if result == 500:
         raise HTTPException(status_code=500, detail="Error during buyer creation")
     elif result == 400:
@@ -125,7 +139,7 @@ def register_buyer(user_info: AuthModels.CreateBuyer):
 
 
 @auth_router.post("/signup/seller", response_model=ResponseModels.SuccessModel, responses=ResponseModels.RegisterResponseModelResponses)
-def register_seller(user_info: AuthModels.CreateSeller):
+async def register_seller(user_info: AuthModels.CreateSeller):
     """
     Register a seller.
 
@@ -136,21 +150,27 @@ def register_seller(user_info: AuthModels.CreateSeller):
         HTTPException: 409 if the email already exists.
                        500 if there is an error during seller creation.
                        400 if the provided data is invalid.
+                       503 if the password hashing pool is saturated.
 
     Returns:
         JSONResponse: A success message if registration is successful.
     """
     # Check if the email already exists in the seller database
-    seller_db = SellerDB()
-    existing_check = seller_db.get_seller_by_email(user_info.email)
+    seller_db = AsyncSellerDB()
+    existing_check = await seller_db.get_seller_by_email(user_info.email)
+    if existing_check == 500:
+        raise HTTPException(status_code=500, detail="Error during seller creation")
     if existing_check != 404:
         raise HTTPException(status_code=409, detail="Email already exists")
 
     # Hash of the password and creation of the user
-    hashed_pw = hash_password(user_info.password)
+    try:
+        hashed_pw = await password_hasher.hash_password(user_info.password)
+    except PasswordHasherBusy:
+        raise password_hasher_busy()
     user_info.password = hashed_pw
     seller_db.seller = Seller(**user_info.model_dump())
-    result = seller_db.create_seller()
+    result = await seller_db.create_seller()
     if result == 500:
         raise HTTPException(status_code=500, detail="Error during seller creation")
     elif result == 400:
@@ -1,11 +1,72 @@
 from os import getenv
 from datetime import timedelta, datetime
 from jose import JWTError, jwt
-from typing import Union, Any
+from typing import Union, Any, Optional, Dict
+from collections import OrderedDict
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Request, HTTPException
 from os import environ
 from config.config import settings
+import hashlib
+import threading
+import time
+
+# Maximum number of verified tokens kept in memory
+CLAIMS_CACHE_SIZE = 10000
+
+class ClaimsCache:
+    """
+    Bounded LRU cache of the claims of the verified tokens, keyed by the SHA-256 of the token.
+    An entry expires with its token.
+    """
+
+    def __init__(self, max_size: int = CLAIMS_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            token (str): The JWT token.
+
+        Returns:
+            dict: The claims of the token, None if the token is not cached or expired.
+        """
+        key = ClaimsCache.key(token)
+        with self.lock:
+            claims = self.entries.get(key)
+            if claims is None:
+                return None
+            if claims["exp"] <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        """
+        Args:
+            token (str): The verified JWT token.
+            claims (dict): The claims of the token.
+        """
+        key = ClaimsCache.key(token)
+        with self.lock:
+            self.entries[key] = claims
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+class VerifiedToken(str):
+    """
+    The token returned by the JWTHandler dependency, carrying its verified claims
+    so that the route does not decode it again.
+    """
+    claims: Dict[str, Any] = None
 
 class JWTHandler(HTTPBearer):
     """
@@ -17,6 +78,7 @@ class JWTHandler(HTTPBearer):
     secret_buyer = environ.get('JWT_SECRET_KEY_BUYER', settings.jwt_secret_key_buyer)
     algo = environ.get('JWT_ALGORITHM', settings.jwt_algorithm)
     expireMins = int(environ.get('JWT_ACCESS_TOKEN_EXPIRE_MINUTES', settings.jwt_access_token_expire_minutes))
+    claims_cache = ClaimsCache()
 
     @staticmethod
     def get_secret_by_user_type(user_type: str) -> str:
@@ -76,16 +138,23 @@ class JWTHandler(HTTPBearer):
         return JWTHandler.createAccessToken(subject, user_type, expires_delta, "refresh")
 
     @staticmethod
-    def verifyAccessToken(token: str) -> Union[tuple[str, str], None]:
+    def decode_claims(token: str) -> Optional[Dict[str, Any]]:
         """
-        Verifies the given token and returns its subject and user type if the token is valid, otherwise None.   
+        Verifies the signature of the given token and returns its claims, from the claims cache
+        or from the token carried by a VerifiedToken when possible.
 
         Args:
             token (str): The JWT token to verify
 
         Returns:
-            Union[tuple[str, str], None]: The subject and user type of the token if valid, otherwise None
+            Optional[dict]: The sub, user_type, type and exp claims if the signature is valid and the token is not expired, otherwise None
         """
+        if isinstance(token, VerifiedToken) and token.claims is not None:
+            claims = token.claims
+        else:
+            claims = JWTHandler.claims_cache.get(token)
+        if claims is not None:
+            return claims if claims["exp"] > time.time() else None
         try:
             # Use get_unverified_claims to extract the payload without verifying the signature.
             unverified_payload = jwt.get_unverified_claims(token)
@@ -94,12 +163,29 @@ class JWTHandler(HTTPBearer):
 
             # Now decode and verify the token using the correct secret and algorithm.
             payload = jwt.decode(token, secret, algorithms=[JWTHandler.algo])
+        except (JWTError, ValueError):
+            return None
+        claims = {claim: payload.get(claim) for claim in ("sub", "user_type", "type", "exp")}
+        if None in claims.values() or claims["exp"] <= time.time():
+            return None
+        JWTHandler.claims_cache.put(token, claims)
+        return claims
 
-            if datetime.fromtimestamp(payload["exp"]) < datetime.utcnow() or payload["type"] != "access":
-                return None, None
-            return payload["sub"], payload["user_type"]
-        except (JWTError, ValueError) as e:
+    @staticmethod
+    def verifyAccessToken(token: str) -> Union[tuple[str, str], None]:
+        """
+        Verifies the given token and returns its subject and user type if the token is valid, otherwise None.   
+
+        Args:
+            token (str): The JWT token to verify
+
+        Returns:
+            Union[tuple[str, str], None]: The subject and user type of the token if valid, otherwise None
+        """
+        claims = JWTHandler.decode_claims(token)
+        if claims is None or claims["type"] != "access":
             return None, None
+        return claims["sub"], claims["user_type"]
 
     @staticmethod
     def verifyRefreshToken(token: str) -> Union[str, None]:
@@ -112,31 +198,24 @@ class JWTHandler(HTTPBearer):
         Returns:
             Union[str, None]: The subject and user type of the token if valid, otherwise None
         """
-        try:
-            unverified_payload = jwt.get_unverified_claims(token)
-            user_type = unverified_payload.get("user_type")
-            secret = JWTHandler.get_secret_by_user_type(user_type)
-
-            payload = jwt.decode(token, secret, algorithms=[JWTHandler.algo])
-            
-            if datetime.fromtimestamp(payload["exp"]) < datetime.utcnow() or payload["type"] != "refresh":
-                return None, None
-            return payload["sub"], payload["user_type"]
-        except (JWTError, ValueError):
+        claims = JWTHandler.decode_claims(token)
+        if claims is None or claims["type"] != "refresh":
             return None, None
+        return claims["sub"], claims["user_type"]
 
     def __init__(self, auto_error: bool = True):
         super(JWTHandler, self).__init__(auto_error=auto_error)
 
-    async def __call__(self, request: Request) -> Union[str, None]:
+    async def __call__(self, request: Request) -> Union[VerifiedToken, None]:
         """
         Verifies the token in the Authorization header of the request and returns the token if it is valid.
+        The token carries its claims, so verifyAccessToken and verifyRefreshToken do not decode it again.
 
         Args:
             request (Request): The request object
 
         Returns:
-            Union[str, None]: The token if it is valid, otherwise None
+            Union[VerifiedToken, None]: The token if it is valid, otherwise None
         """
         try:
             credentials: Union[HTTPAuthorizationCredentials, None] = await super(JWTHandler, self).__call__(request)
@@ -147,13 +226,12 @@ class JWTHandler(HTTPBearer):
             if credentials.scheme != "Bearer":
                 raise HTTPException(status_code=401, detail="Invalid authentication scheme. Expected 'Bearer'.")
 
-            access_token_data = JWTHandler.verifyAccessToken(credentials.credentials)
-            if access_token_data:
-                return credentials.credentials
-
-            refresh_token_data = JWTHandler.verifyRefreshToken(credentials.credentials)
-            if refresh_token_data:
-                return credentials.credentials 
+            # A single verification for both the access and the refresh tokens
+            claims = JWTHandler.decode_claims(credentials.credentials)
+            if claims is not None and claims["type"] in ("access", "refresh"):
+                token = VerifiedToken(credentials.credentials)
+                token.claims = claims
+                return token
 
             raise HTTPException(status_code=401, detail="Invalid token or expired token.")
 
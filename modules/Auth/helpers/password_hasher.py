@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from os import environ
+from typing import Dict, Optional
+from fastapi import HTTPException
+from config.config import settings
+from modules.Auth.helpers.auth_helpers import hash_password, verify_hashed_password
+
+logger = logging.getLogger(__name__)
+
+# Processes running bcrypt, apart from the threadpool serving the requests
+PASSWORD_HASH_WORKERS = int(environ.get('PASSWORD_HASH_WORKERS', settings.password_hash_workers))
+# Password operations submitted and not finished yet beyond which the requests are refused with 503
+PASSWORD_HASH_MAX_PENDING = int(environ.get('PASSWORD_HASH_MAX_PENDING', settings.password_hash_max_pending))
+# Seconds suggested to the clients refused with 503
+PASSWORD_HASH_RETRY_AFTER_SECONDS = 1
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the password operations waiting for the executor reach the limit.
+    """
+
+
+def password_hasher_busy() -> HTTPException:
+    """
+    Returns:
+        HTTPException: The 503 of the requests refused because the password hashing pool is saturated.
+    """
+    return HTTPException(
+        status_code=503,
+        detail="Too many requests, retry later.",
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER_SECONDS)}
+    )
+
+
+class PasswordHasher:
+    """
+    Bounded process pool for the bcrypt hashes and verifications. The pending operations are counted,
+    past max_pending a new operation is refused instead of queued, so that a login burst cannot
+    take the capacity of the API nor build an unbounded backlog.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = max(1, min(workers, os.cpu_count() or 1))
+        self.max_pending = max(self.workers, max_pending)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        # Set by start, the pool is only created by the process serving the API
+        self.started = False
+        # Reentrant, cancelling the futures on shutdown runs task_done in the same thread
+        self.lock = threading.RLock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        """
+        Create the pool, called by the startup of the API. The processes are spawned, forking the
+        threads of the API process is not safe. A spawned process imports the main module of the
+        API process and auth_helpers, neither of them opens a connection or starts a thread.
+        """
+        with self.lock:
+            self.started = True
+            self.get_executor()
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        """
+        Returns:
+            ProcessPoolExecutor: The pool, created again if it was broken. Must be called with the lock held.
+
+        Raises:
+            RuntimeError: If the pool is not started.
+        """
+        if not self.started:
+            raise RuntimeError("The password hashing pool is not started")
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    def task_done(self, future: Future) -> None:
+        """
+        Count an operation leaving the pool, called by the future of the operation.
+
+        Args:
+            future (Future): The future of the operation.
+        """
+        with self.lock:
+            self.pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def submit(self, function, *args) -> Future:
+        """
+        Args:
+            function (callable): The password operation, run in a process of the pool.
+            *args: The arguments of the operation.
+
+        Returns:
+            Future: The future of the operation.
+
+        Raises:
+            PasswordHasherBusy: If max_pending operations are already waiting.
+        """
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy(f"{self.pending} password operations pending")
+            try:
+                future = self.get_executor().submit(function, *args)
+            except BrokenProcessPool:
+                # A process of the pool died, the pool is replaced
+                logger.error("The password hashing pool is broken, restarting it.")
+                self.executor.shutdown(wait=False)
+                self.executor = None
+                future = self.get_executor().submit(function, *args)
+            self.pending += 1
+            self.submitted += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        future.add_done_callback(self.task_done)
+        return future
+
+    async def hash_password(self, password: str) -> str:
+        """
+        Args:
+            password (str): The password to hash.
+
+        Returns:
+            str: The hashed password.
+
+        Raises:
+            PasswordHasherBusy: If the pool is saturated.
+        """
+        return await asyncio.wrap_future(self.submit(hash_password, password))
+
+    async def verify_hashed_password(self, hashed: str, password: str) -> bool:
+        """
+        Args:
+            hashed (str): The stored, hashed password.
+            password (str): The plain text password to verify.
+
+        Returns:
+            bool: True if password is correct, False otherwise.
+
+        Raises:
+            PasswordHasherBusy: If the pool is saturated.
+        """
+        return await asyncio.wrap_future(self.submit(verify_hashed_password, hashed, password))
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Returns:
+            dict: The size of the pool, the limit and the current depth of the queue, and the counters of the operations.
+        """
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                # Operations waiting for a free process, the others are running
+                "queued": max(self.pending - self.workers, 0),
+                "peak_pending": self.peak_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        """
+        Stop the processes of the pool, the pending operations are cancelled.
+        """
+        with self.lock:
+            self.started = False
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+
+password_hasher = PasswordHasher()
@@ -4,24 +4,25 @@ from typing import List
 import json
 from entities.MongoDB.Buyer.buyer import Buyer, FavouriteProperty
 from bson import ObjectId
-from entities.MongoDB.Buyer.db_buyer import BuyerDB
+from entities.MongoDB.Buyer.async_db_buyer import AsyncBuyerDB
 from modules.Buyer.models import response_models as ResponseModels
 from modules.Buyer.models.buyer_models import UpdateBuyer
-from entities.Redis.ReservationsBuyer.db_reservations_buyer import ReservationsBuyerDB
+from entities.Redis.ReservationsBuyer.async_db_reservations_buyer import AsyncReservationsBuyerDB
 from entities.Redis.ReservationsBuyer.reservations_buyer import ReservationsBuyer, ReservationB
-from entities.Redis.ReservationsSeller.db_reservations_seller import ReservationsSellerDB
+from entities.Redis.ReservationsSeller.async_db_reservations_seller import AsyncReservationsSellerDB
 from entities.Redis.ReservationsSeller.reservations_seller import ReservationsSeller, ReservationS, next_weekday
 from modules.Buyer.models.buyer_models import CreateReservationBuyer, UpdateReservationBuyer
 
 from modules.Auth.helpers.JwtHandler import JWTHandler
-from modules.Auth.helpers.auth_helpers import hash_password
+from modules.Auth.helpers.password_hasher import password_hasher, PasswordHasherBusy, password_hasher_busy
+from setup.redis_setup.redis_setup import LISTING_READ_PREFERENCE
 
 buyer_router = APIRouter(prefix="/buyer", tags=["Buyer"])
 
 # Buyer
 
 @buyer_router.get("/profile_info", response_model=ResponseModels.BuyerInfoResponseModel, responses=ResponseModels.GetBuyerResponseModelResponses)
-def get_buyer(access_token: str = Depends(JWTHandler())):
+async def get_buyer(access_token: str = Depends(JWTHandler())):
     """
     Retrieve the buyer's profile info.
 
@@ -42,8 +43,8 @@ def get_buyer(access_token: str = Depends(JWTHandler())):
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     temp_buyer = Buyer(buyer_id=buyer_id)
-    buyer_db = BuyerDB(temp_buyer)
-    result = buyer_db.get_profile_info()
+    buyer_db = AsyncBuyerDB(temp_buyer)
+    result = await buyer_db.get_profile_info()
     if result == 404:
         raise HTTPException(status_code=404, detail="Buyer not found.")
     elif result == 400:
@@ -53,7 +54,7 @@ def get_buyer(access_token: str = Depends(JWTHandler())):
     return buyer_db.buyer
 
 @buyer_router.put("/", response_model=ResponseModels.SuccessModel, responses=ResponseModels.UpdateBuyerResponseModelResponses)
-def update_buyer(buyer: UpdateBuyer, access_token: str = Depends(JWTHandler())):
+async def update_buyer(buyer: UpdateBuyer, access_token: str = Depends(JWTHandler())):
     """
     Update an existing buyer.
 
@@ -68,6 +69,7 @@ def update_buyer(buyer: UpdateBuyer, access_token: str = Depends(JWTHandler())):
                        400 if the buyer ID is missing.
                        404 if the buyer is not found.
                        500 if there is an error updating the buyer.
+                       503 if the password hashing pool is saturated.
 
     Returns:
         JSONResponse: A success message if the update is successful.
@@ -77,11 +79,11 @@ def update_buyer(buyer: UpdateBuyer, access_token: str = Depends(JWTHandler())):
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     buyer_old = Buyer(buyer_id=buyer_id)
-    buyer_db = BuyerDB(buyer_old)
+    buyer_db = AsyncBuyerDB(buyer_old)
     
     # Check if email already exists on another buyer
     if buyer.email:
-        response=buyer_db.get_buyer_by_email(buyer.email)
+        response=await buyer_db.get_buyer_by_email(buyer.email)
         if response == 500:
             raise HTTPException(status_code=response, detail="Failed to update buyer.")
         if response == 200 and buyer_db.buyer.buyer_id != buyer_id:
@@ -89,9 +91,12 @@ def update_buyer(buyer: UpdateBuyer, access_token: str = Depends(JWTHandler())):
     
     # Check if there's a password to crypt
     if buyer.password:
-        buyer.password = hash_password(buyer.password)
+        try:
+            buyer.password = await password_hasher.hash_password(buyer.password)
+        except PasswordHasherBusy:
+            raise password_hasher_busy()
     
-    result = buyer_db.update_buyer(buyer)
+    result = await buyer_db.update_buyer(buyer)
     if result == 400:
         raise HTTPException(status_code=result, detail="Buyer ID is required.")
     elif result == 404:
@@ -102,7 +107,7 @@ def update_buyer(buyer: UpdateBuyer, access_token: str = Depends(JWTHandler())):
         return JSONResponse(status_code=result, content={"detail": "Buyer updated successfully."})
     
 @buyer_router.delete("/", response_model=ResponseModels.SuccessModel, responses=ResponseModels.DeleteBuyerResponseModelResponses)
-def delete_buyer(access_token: str = Depends(JWTHandler())):
+async def delete_buyer(access_token: str = Depends(JWTHandler())):
     """
     Delete an existing buyer.
 
@@ -122,17 +127,17 @@ def delete_buyer(access_token: str = Depends(JWTHandler())):
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     buyer = Buyer(buyer_id=buyer_id)
-    buyer_db = BuyerDB(buyer)
-    result = buyer_db.delete_buyer_by_id(buyer_id)
+    buyer_db = AsyncBuyerDB(buyer)
+    result = await buyer_db.delete_buyer_by_id(buyer_id)
     if result == 404:
         raise HTTPException(status_code=result, detail="Buyer not found.")
     elif result == 500:
         raise HTTPException(status_code=result, detail="Failed to delete buyer.")
     
     reservation_buyer = ReservationsBuyer(buyer_id=buyer_id)
-    reservation_buyer_db = ReservationsBuyerDB(reservation_buyer)
+    reservation_buyer_db = AsyncReservationsBuyerDB(reservation_buyer)
 
-    reservation_buyer_db.delete_reservations_buyer()
+    await reservation_buyer_db.delete_reservations_buyer()
     if result == 500:
         raise HTTPException(status_code=result, detail="Failed to delete buyer reservations.")
     if result == 404:
@@ -145,7 +150,7 @@ def delete_buyer(access_token: str = Depends(JWTHandler())):
 # Favourites
 
 @buyer_router.get("/favourites", response_model=List[FavouriteProperty], responses=ResponseModels.GetFavouritesResponseModelResponses)
-def get_favourites(access_token: str = Depends(JWTHandler())):
+async def get_favourites(access_token: str = Depends(JWTHandler())):
     """
     Retrieve the list of a buyer's favourite properties.
 
@@ -165,8 +170,8 @@ def get_favourites(access_token: str = Depends(JWTHandler())):
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     temp_buyer = Buyer(buyer_id=buyer_id)
-    buyer_db = BuyerDB(temp_buyer)
-    result=buyer_db.get_favourites()
+    buyer_db = AsyncBuyerDB(temp_buyer)
+    result=await buyer_db.get_favourites()
     if result == 404:
         raise HTTPException(status_code=404, detail="Favourites not found or buyer not found.")
     if result == 500:
@@ -174,7 +179,7 @@ def get_favourites(access_token: str = Depends(JWTHandler())):
     return buyer_db.buyer.favourites
 
 @buyer_router.post("/favourite", response_model=ResponseModels.SuccessModel, responses=ResponseModels.AddFavouriteResponseModelResponses)
-def add_favourite(favourite: FavouriteProperty, access_token: str = Depends(JWTHandler())):
+async def add_favourite(favourite: FavouriteProperty, access_token: str = Depends(JWTHandler())):
     """
     Add a favourite property for a buyer.
 
@@ -196,8 +201,8 @@ def add_favourite(favourite: FavouriteProperty, access_token: str = Depends(JWTH
     if buyer_id is None or user_type != "buyer":
         raise HTTPException(status_code=401, detail="Invalid access token")
     
-    buyer_db = BuyerDB()
-    result = buyer_db.add_favourite(buyer_id, favourite)
+    buyer_db = AsyncBuyerDB()
+    result = await buyer_db.add_favourite(buyer_id, favourite)
     if result == 400:
         raise HTTPException(status_code=result, detail="Invalid input.")
     elif result == 500:
@@ -206,7 +211,7 @@ def add_favourite(favourite: FavouriteProperty, access_token: str = Depends(JWTH
         return JSONResponse(status_code=result, content={"detail": "Favourite added successfully."})
 
 @buyer_router.delete("/favourite/{property_on_sale_id}", response_model=ResponseModels.SuccessModel, responses=ResponseModels.DeleteFavouriteResponseModelResponses)
-def delete_favourite(property_on_sale_id: str, access_token: str = Depends(JWTHandler())):
+async def delete_favourite(property_on_sale_id: str, access_token: str = Depends(JWTHandler())):
     """
     Delete a favourite property from a buyer's list.
 
@@ -230,8 +235,8 @@ def delete_favourite(property_on_sale_id: str, access_token: str = Depends(JWTHa
     if buyer_id is None or user_type != "buyer":
         raise HTTPException(status_code=401, detail="Invalid access token")
     
-    buyer_db = BuyerDB()
-    result = buyer_db.delete_favourite(buyer_id, property_on_sale_id)
+    buyer_db = AsyncBuyerDB()
+    result = await buyer_db.delete_favourite(buyer_id, property_on_sale_id)
     if result == 400:
         raise HTTPException(status_code=result, detail="Invalid input.")
     elif result == 500:
@@ -247,7 +252,7 @@ def delete_favourite(property_on_sale_id: str, access_token: str = Depends(JWTHa
     response_model=List[ReservationB],
     responses=ResponseModels.GetReservationsBuyerResponses
 )
-def get_reservations(access_token: str = Depends(JWTHandler())):
+async def get_reservations(access_token: str = Depends(JWTHandler())):
     """
     Retrieve and update expired reservations for a buyer.
 
@@ -268,8 +273,8 @@ def get_reservations(access_token: str = Depends(JWTHandler())):
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     reservations_buyer = ReservationsBuyer(buyer_id=buyer_id)
-    reservations_buyer_db = ReservationsBuyerDB(reservations_buyer)
-    status = reservations_buyer_db.update_expired_reservations()
+    reservations_buyer_db = AsyncReservationsBuyerDB(reservations_buyer)
+    status = await reservations_buyer_db.update_expired_reservations(LISTING_READ_PREFERENCE)
     if status == 500:
         raise HTTPException(status_code=500, detail="Error updating expired reservations")
     if status == 404:
@@ -281,7 +286,7 @@ def get_reservations(access_token: str = Depends(JWTHandler())):
     response_model=ResponseModels.SuccessModel,
     responses=ResponseModels.CreateReservationBuyerResponses
 )
-def create_reservation(book_now_info: CreateReservationBuyer, access_token: str = Depends(JWTHandler())):
+async def create_reservation(book_now_info: CreateReservationBuyer, access_token: str = Depends(JWTHandler())):
     """
     Create a new reservation updating the buyer's reservations list and the seller's reservations list. It checks if the buyer already has a reservation for the same property and if number of attendees is not exceeded.
 
@@ -307,9 +312,9 @@ def create_reservation(book_now_info: CreateReservationBuyer, access_token: str
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     buyer = Buyer(buyer_id=buyer_id)
-    buyer_db = BuyerDB(buyer)
+    buyer_db = AsyncBuyerDB(buyer)
     
-    status = buyer_db.get_profile_info()
+    status = await buyer_db.get_profile_info()
     if status == 404:
         raise HTTPException(status_code=404, detail="Buyer not found")
     if status == 500:
@@ -320,9 +325,9 @@ def create_reservation(book_now_info: CreateReservationBuyer, access_token: str
         raise HTTPException(status_code=500, detail="Incomplete buyer data")
 
     reservations_buyer = ReservationsBuyer(buyer_id=buyer_id)
-    reservations_buyer_db = ReservationsBuyerDB(reservations_buyer)
+    reservations_buyer_db = AsyncReservationsBuyerDB(reservations_buyer)
     
-    status = reservations_buyer_db.get_reservations_by_user()
+    status = await reservations_buyer_db.get_reservations_by_user()
     if status == 500:
         raise HTTPException(status_code=500, detail="Error decoding reservations data")
     if status == 400:
@@ -334,7 +339,7 @@ def create_reservation(book_now_info: CreateReservationBuyer, access_token: str
                 raise HTTPException(status_code=409, detail="Reservation already exists")
             
     reservations_seller = ReservationsSeller(property_on_sale_id=book_now_info.property_on_sale_id)
-    reservations_seller_db = ReservationsSellerDB(reservations_seller)
+    reservations_seller_db = AsyncReservationsSellerDB(reservations_seller)
 
     new_reservation = ReservationS(
         buyer_id=buyer_id, 
@@ -343,9 +348,11 @@ def create_reservation(book_now_info: CreateReservationBuyer, access_token: str
         phone=buyer.phone_number
     )
 
-    status = reservations_seller_db.handle_book_now_transaction(new_reservation, book_now_info.day, book_now_info.time, buyer_id, book_now_info.max_attendees)
+    status = await reservations_seller_db.handle_book_now_transaction(new_reservation, book_now_info.day, book_now_info.time, buyer_id, book_now_info.max_attendees)
     if status == 400:
         raise HTTPException(status_code=400, detail="Invalid input data")
+    if status == 409:
+        raise HTTPException(status_code=409, detail="Reservation already exists")
     if status == 500:
         raise HTTPException(status_code=500, detail="Error creating reservation")
     
@@ -360,11 +367,11 @@ def create_reservation(book_now_info: CreateReservationBuyer, access_token: str
             address = book_now_info.address
         )
     ]
-    status = reservations_buyer_db.create_reservation_buyer()
+    status = await reservations_buyer_db.create_reservation_buyer()
     
     # If error occurs, rollback the reservation
     if status != 201:
-        reservations_seller_db.delete_reservation_seller_by_buyer_id(buyer_id)
+        await reservations_seller_db.delete_reservation_seller_by_buyer_id(buyer_id)
         return JSONResponse(status_code=500, content={"detail": "Error creating reservation"})
 
     return JSONResponse(status_code=201, content={"detail": "Reservation created successfully"})
@@ -374,7 +381,7 @@ def create_reservation(book_now_info: CreateReservationBuyer, access_token: str
     response_model=ResponseModels.SuccessModel,
     responses=ResponseModels.DeleteReservationsBuyerResponses
 )
-def delete_reservation_by_buyer_and_property(property_on_sale_id: str, access_token: str = Depends(JWTHandler())):
+async def delete_reservation_by_buyer_and_property(property_on_sale_id: str, access_token: str = Depends(JWTHandler())):
     """
     Delete a reservation for a given buyer and property, updating the buyer's reservations list and the seller's reservations list ensuring data consistency.
 
@@ -401,17 +408,17 @@ def delete_reservation_by_buyer_and_property(property_on_sale_id: str, access_to
         raise HTTPException(status_code=401, detail="Invalid access token")
 
     reservations_buyer = ReservationsBuyer(buyer_id=buyer_id)
-    reservations_buyer_db = ReservationsBuyerDB(reservations_buyer)
+    reservations_buyer_db = AsyncReservationsBuyerDB(reservations_buyer)
     reservations_seller = ReservationsSeller(property_on_sale_id=property_on_sale_id)
-    reservations_seller_db = ReservationsSellerDB(reservations_seller)
+    reservations_seller_db = AsyncReservationsSellerDB(reservations_seller)
 
-    status = reservations_buyer_db.get_reservations_by_user()
+    status = await reservations_buyer_db.get_reservations_by_user()
     if status == 500:
         raise HTTPException(status_code=500, detail="Error decoding buyer reservations data")
     if status == 404:
         raise HTTPException(status_code=404, detail="No reservations found for buyer")
 
-    status = reservations_seller_db.get_reservation_seller()
+    status = await reservations_seller_db.get_reservation_seller()
     if status == 500:
         raise HTTPException(status_code=500, detail="Error decoding seller reservations data")
     if status == 404:
@@ -434,18 +441,18 @@ def delete_reservation_by_buyer_and_property(property_on_sale_id: str, access_to
         raise HTTPException(status_code=404, detail="No reservations found for seller")
     
     # Delete the buyer reservation
-    status = reservations_buyer_db.delete_reservation_by_property_on_sale_id(property_on_sale_id)
+    status = await reservations_buyer_db.delete_reservation_by_property_on_sale_id(property_on_sale_id)
     if status == 500:
         raise HTTPException(status_code=500, detail="Error deleting buyer reservation")
     if status == 404:
         raise HTTPException(status_code=404, detail="No reservations found for buyer")
     
     # Delete the seller reservation
-    status = reservations_seller_db.delete_reservation_seller_by_buyer_id(buyer_id)
+    status = await reservations_seller_db.delete_reservation_seller_by_buyer_id(buyer_id)
     
     # If error occurs, rollback the reservation
     if status != 200:
-        reservations_buyer_db.create_reservation_buyer()
+        await reservations_buyer_db.create_reservation_buyer()
         return JSONResponse(status_code=500, content={"detail": "Error deleting reservation"})
 
     
@@ -1,27 +1,41 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from modules.Guest.models import response_models as ResponseModels
 from entities.MongoDB.PropertyOnSale.property_on_sale import PropertyOnSale
-from entities.MongoDB.PropertyOnSale.db_property_on_sale import PropertyOnSaleDB
+from entities.MongoDB.PropertyOnSale.async_db_property_on_sale import AsyncPropertyOnSaleDB
+from entities.MongoDB.PropertyOnSale.random_property_pool import random_property_pool
 
 from entities.Neo4J.PropertyOnSaleNeo4J.property_on_sale_neo4j import PropertyOnSaleNeo4J
-from entities.Neo4J.PropertyOnSaleNeo4J.db_property_on_sale_neo4j import PropertyOnSaleNeo4JDB
+from entities.Neo4J.PropertyOnSaleNeo4J.async_db_property_on_sale_neo4j import AsyncPropertyOnSaleNeo4JDB
 from entities.Neo4J.City.city import City
 from entities.Neo4J.Neighbourhood.neighbourhood import Neighbourhood
 from entities.Neo4J.POI.poi import POI
+from entities.Redis.MapResponseCache.async_db_map_response_cache import AsyncMapResponseCacheDB
+from entities.Redis.MapResponseCache.db_map_response_cache import CITY_AND_NEIGHBOURHOOD_FIELD, NEAR_POIS_FIELD, NEAR_PROPERTIES_FIELD
 from typing import List, Optional
 
 from bson.objectid import ObjectId 
 from setup.mongo_setup.mongo_setup import get_default_mongo_db
 from datetime import datetime
+import asyncio
+import json
+import logging
+import time
 
 from modules.Guest.models.guest_models import FilteredSearchInput
 from modules.Guest.models.guest_models import SummaryPropertyOnSale, RandomPropertyOnSale
 
 guest_router = APIRouter(prefix="/guest", tags=["Guest"])
 
+logger = logging.getLogger(__name__)
+
+# Time budget of every section of the property detail, a slower section is returned as missing
+DETAIL_SECTION_TIMEOUT_SECONDS = 2.0
+
 @guest_router.post("/properties_on_sale/search", response_model=List[SummaryPropertyOnSale], responses=ResponseModels.GetFilteredPropertiesOnSaleResponses)
-def filtered_search(input: FilteredSearchInput, page: int = 1, page_size: int = 10):
+async def filtered_search(input: FilteredSearchInput, page: int = 1, page_size: int = 10):
     """
     Search for properties on sale based on input parameters with pagination support.
 
@@ -39,16 +53,79 @@ def filtered_search(input: FilteredSearchInput, page: int = 1, page_size: int =
     Returns:
         List[SummaryPropertyOnSale]: The list of properties on sale that match the search criteria, with a summary of each property.
     """
-    db_property_on_sale = PropertyOnSaleDB(PropertyOnSale())
-    result_code = db_property_on_sale.filtered_search(input, page, page_size)
+    db_property_on_sale = AsyncPropertyOnSaleDB(PropertyOnSale())
+    result_code = await db_property_on_sale.filtered_search(input, page, page_size)
     if result_code == 500:
         raise HTTPException(status_code=500, detail="Internal server error.")
     if result_code == 404:
         raise HTTPException(status_code=404, detail="No properties found.")
     return db_property_on_sale.property_on_sale_list
 
+@guest_router.post("/properties_on_sale/search/cursor", response_model=ResponseModels.CursorPropertiesOnSale, responses=ResponseModels.GetCursorFilteredPropertiesOnSaleResponses)
+async def filtered_search_by_cursor(input: FilteredSearchInput, cursor: Optional[str] = None, page_size: int = 10):
+    """
+    Search for properties on sale based on input parameters with cursor pagination, newest properties first.
+    Pass the returned next_cursor to get the following page, the cost of a page does not depend on how deep it is.
+
+    Args:
+        cursor (str, optional): The next_cursor returned by the previous page, omit it for the first page.
+        page_size (int): Number of results per page (default is 10).
+
+    Body:
+        (FilteredSearchInput): Filter criteria for the search, ignores invalid argouments.
+
+    Raises:
+        HTTPException: 400 if the cursor or the page size is invalid.
+                       404 if no properties match the search criteria.
+                       500 if there is an internal server error.
+
+    Returns:
+        CursorPropertiesOnSale: The page of properties on sale and the cursor of the next page, null on the last page.
+    """
+    db_property_on_sale = AsyncPropertyOnSaleDB(PropertyOnSale())
+    result_code = await db_property_on_sale.filtered_search_by_cursor(input, cursor, page_size)
+    if result_code == 400:
+        raise HTTPException(status_code=400, detail="Invalid cursor or page size.")
+    if result_code == 500:
+        raise HTTPException(status_code=500, detail="Internal server error.")
+    if result_code == 404:
+        raise HTTPException(status_code=404, detail="No properties found.")
+    return {"properties_on_sale": db_property_on_sale.property_on_sale_list, "next_cursor": db_property_on_sale.next_cursor}
+
+@guest_router.post("/properties_on_sale/search/faceted", response_model=ResponseModels.FacetedPropertiesOnSale, responses=ResponseModels.GetFacetedPropertiesOnSaleResponses)
+async def filtered_search_with_facets(input: FilteredSearchInput, page: int = 1, page_size: int = 10):
+    """
+    Search for properties on sale based on input parameters with pagination support, returning in the same response
+    the total number of matches and the counts by type, neighbourhood, price band and bed number.
+    When total_count_capped is true the counting stopped early: total_count is a lower bound and the facets only cover the counted properties.
+
+    Args:
+        page (int): Current page number (default is 1).
+        page_size (int): Number of results per page (default is 10).
+
+    Body:
+        (FilteredSearchInput): Filter criteria for the search, ignores invalid argouments.
+
+    Raises:
+        HTTPException: 400 if page or page_size are invalid or the page is beyond the counted matches.
+                       404 if no properties match the search criteria.
+                       500 if there is an internal server error.
+
+    Returns:
+        FacetedPropertiesOnSale: The page of properties on sale, the total count and the facets.
+    """
+    db_property_on_sale = AsyncPropertyOnSaleDB(PropertyOnSale())
+    result_code = await db_property_on_sale.filtered_search_with_facets(input, page, page_size)
+    if result_code == 400:
+        raise HTTPException(status_code=400, detail="Invalid page or page size.")
+    if result_code == 500:
+        raise HTTPException(status_code=500, detail="Internal server error.")
+    if result_code == 404:
+        raise HTTPException(status_code=404, detail="No properties found.")
+    return {"properties_on_sale": db_property_on_sale.property_on_sale_list, **db_property_on_sale.facets_result}
+
 @guest_router.get("/properties_on_sale/random_properties", response_model=List[RandomPropertyOnSale], responses=ResponseModels.GetRandomPropertiesOnSaleResponses)
-def get_6_random_properties():
+async def get_6_random_properties():
     """
     Get 6 random properties on sale.
 
@@ -59,16 +136,20 @@ def get_6_random_properties():
     Returns:
         List[SummaryPropertyOnSale]: The list of the summary informations about 6 random properties on sale.
     """
-    db_property_on_sale = PropertyOnSaleDB(PropertyOnSale())
-    result_code = db_property_on_sale.get_6_random_properties()
-    if result_code == 500:
+    # Picked from the pre-sampled pool, MongoDB is not queried here
+    if random_property_pool.pool:
+        properties = random_property_pool.pick(6)
+    else:
+        # Cold start: the pool is filled with a blocking query, kept off the event loop
+        properties = await run_in_threadpool(random_property_pool.pick, 6)
+    if properties is None:
         raise HTTPException(status_code=500, detail="Internal server error.")
-    if result_code == 404:
+    if not properties:
         raise HTTPException(status_code=404, detail="No properties found.")
-    return db_property_on_sale.property_on_sale_list
+    return properties
 
 @guest_router.get("/property_on_sale/{property_on_sale_id}", response_model=PropertyOnSale, responses=ResponseModels.GetPropertyOnSaleResponses)
-def get_property_on_sale(property_on_sale_id:str):
+async def get_property_on_sale(property_on_sale_id:str):
     """
     Get all the property on sale's informations, that has the given ID.
 
@@ -85,8 +166,8 @@ def get_property_on_sale(property_on_sale_id:str):
     """
     if not ObjectId.is_valid(property_on_sale_id):
         raise HTTPException(status_code=400, detail="Invalid property_on_sale_id.")
-    db_property_on_sale = PropertyOnSaleDB(PropertyOnSale())
-    response = db_property_on_sale.get_property_on_sale_by_id(property_on_sale_id)
+    db_property_on_sale = AsyncPropertyOnSaleDB(PropertyOnSale())
+    response = await db_property_on_sale.get_property_on_sale_by_id(property_on_sale_id)
     if response == 404:
         raise HTTPException(status_code=response, detail="Property not found.")
     if response == 500:
@@ -94,10 +175,100 @@ def get_property_on_sale(property_on_sale_id:str):
     
     return db_property_on_sale.property_on_sale
 
+async def run_detail_section(name: str, coroutine) -> tuple:
+    """
+    Run one section of the property detail within DETAIL_SECTION_TIMEOUT_SECONDS.
+
+    Args:
+        name (str): The name of the section, used in the logs and in the Server-Timing header.
+        coroutine: The DB call of the section.
+
+    Returns:
+        tuple: The status code of the DB call (504 if it timed out) and the elapsed time in milliseconds.
+    """
+    start = time.perf_counter()
+    try:
+        status = await asyncio.wait_for(coroutine, timeout=DETAIL_SECTION_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Section %s of the property detail timed out.", name)
+        status = 504
+    return status, (time.perf_counter() - start) * 1000
+
+@guest_router.get("/property_on_sale/{property_on_sale_id}/detail", response_model=ResponseModels.PropertyOnSaleDetail, responses=ResponseModels.GetPropertyOnSaleDetailResponses)
+async def get_property_on_sale_detail(property_on_sale_id: str, response: Response):
+    """
+    Get everything the property page needs in one call: the property on sale, its city and neighbourhood,
+    the POIs and the properties near it. MongoDB and the three Neo4j reads run concurrently.
+    A section that fails or takes longer than DETAIL_SECTION_TIMEOUT_SECONDS is left empty and listed in missing_sections,
+    the duration of every section is returned in the Server-Timing header.
+
+    Args:
+        property_on_sale_id (str): The ID of the property on sale.
+
+    Raises:
+        HTTPException: 400 if the ID is invalid.
+                       404 if the property is not found.
+                       500 if every section failed.
+
+    Returns:
+        PropertyOnSaleDetail: The sections of the property detail and the names of the missing ones.
+    """
+    if not ObjectId.is_valid(property_on_sale_id):
+        raise HTTPException(status_code=400, detail="Invalid property_on_sale_id.")
+    db_property_on_sale = AsyncPropertyOnSaleDB(PropertyOnSale())
+    db_city_and_neighbourhood = AsyncPropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=property_on_sale_id))
+    db_pois = AsyncPropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=property_on_sale_id))
+    db_near_properties = AsyncPropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=property_on_sale_id))
+    sections = {
+        "property_on_sale": db_property_on_sale.get_property_on_sale_by_id(property_on_sale_id),
+        "city_and_neighbourhood": db_city_and_neighbourhood.get_city_and_neighbourhood(),
+        "pois": db_pois.get_near_POIs(),
+        "near_properties": db_near_properties.get_near_properties()
+    }
+    results = dict(zip(sections, await asyncio.gather(*(run_detail_section(name, coroutine) for name, coroutine in sections.items()))))
+    response.headers["Server-Timing"] = ", ".join(f"{name};dur={elapsed:.1f}" for name, (_, elapsed) in results.items())
+
+    # MongoDB is the source of truth of the listing
+    if results["property_on_sale"][0] == 404:
+        raise HTTPException(status_code=404, detail="Property not found.")
+    # A 404 from Neo4j means that there is nothing to show, not that the section is missing
+    missing_sections = [name for name, (status, _) in results.items() if status not in (200, 404)]
+    if len(missing_sections) == len(sections):
+        raise HTTPException(status_code=500, detail="Internal server error.")
+
+    detail = ResponseModels.PropertyOnSaleDetail(missing_sections=missing_sections)
+    if results["property_on_sale"][0] == 200:
+        detail.property_on_sale = db_property_on_sale.property_on_sale
+    if results["city_and_neighbourhood"][0] == 200:
+        detail.city = db_city_and_neighbourhood.city
+        detail.neighbourhood = db_city_and_neighbourhood.neighbourhood
+    if results["pois"][0] in (200, 404):
+        detail.pois = db_pois.pois or []
+    if results["near_properties"][0] in (200, 404):
+        detail.near_properties = db_near_properties.near_properties or []
+    return detail
+
 # Map
 
+async def store_map_response(map_response_cache: AsyncMapResponseCacheDB, field: str, content) -> Response:
+    """
+    Serialize a map response once, for the cache and for the client.
+
+    Args:
+        map_response_cache (AsyncMapResponseCacheDB): The cache of the property, read before computing the response.
+        field (str): The field of the endpoint.
+        content: The response.
+
+    Returns:
+        Response: The serialized response.
+    """
+    serialized = json.dumps(jsonable_encoder(content))
+    await map_response_cache.put(field, serialized)
+    return Response(content=serialized, media_type="application/json")
+
+
 @guest_router.get("/map/city_and_neighborhood", response_model= ResponseModels.CityAndNeighbourhood, responses=ResponseModels.GetCityAndNeighbourhoodResponses)
-def get_city_and_neighbourhood(property_on_sale_id:str):
+async def get_city_and_neighbourhood(property_on_sale_id:str):
     """
     Get the city and neighbourhood of the property on sale with the given ID.
 
@@ -114,18 +285,22 @@ def get_city_and_neighbourhood(property_on_sale_id:str):
     """
     if not ObjectId.is_valid(property_on_sale_id):
         raise HTTPException(status_code=400, detail="Invalid property_on_sale_id.")
-    db_property_on_sale_neo4j = PropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=property_on_sale_id))
-    response = db_property_on_sale_neo4j.get_city_and_neighbourhood()
+    map_response_cache = AsyncMapResponseCacheDB(property_on_sale_id)
+    if await map_response_cache.get(CITY_AND_NEIGHBOURHOOD_FIELD) == 200:
+        return Response(content=map_response_cache.response, media_type="application/json")
+    db_property_on_sale_neo4j = AsyncPropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=property_on_sale_id))
+    response = await db_property_on_sale_neo4j.get_city_and_neighbourhood()
     if response == 404:
         raise HTTPException(status_code=response, detail="Property not found.")
     if response == 500:
         raise HTTPException(status_code=response, detail="Internal server error.")
     
-    return ResponseModels.CityAndNeighbourhood(city=db_property_on_sale_neo4j.city, neighbourhood=db_property_on_sale_neo4j.neighbourhood)
+    city_and_neighbourhood = ResponseModels.CityAndNeighbourhood(city=db_property_on_sale_neo4j.city, neighbourhood=db_property_on_sale_neo4j.neighbourhood)
+    return await store_map_response(map_response_cache, CITY_AND_NEIGHBOURHOOD_FIELD, city_and_neighbourhood)
 
 
 @guest_router.get("/map/pois_near_property", response_model=List[POI], responses=ResponseModels.GetPOIsResponses)
-def get_pois(property_on_sale_id:str):
+async def get_pois(property_on_sale_id:str):
     """
     Get the points of interest near the property on sale with the given ID.
 
@@ -142,17 +317,20 @@ def get_pois(property_on_sale_id:str):
     """
     if not ObjectId.is_valid(property_on_sale_id):
         raise HTTPException(status_code=400, detail="Invalid property_on_sale_id.")
-    db_property_on_sale_neo4j = PropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=property_on_sale_id))
-    response = db_property_on_sale_neo4j.get_near_POIs()
+    map_response_cache = AsyncMapResponseCacheDB(property_on_sale_id)
+    if await map_response_cache.get(NEAR_POIS_FIELD) == 200:
+        return Response(content=map_response_cache.response, media_type="application/json")
+    db_property_on_sale_neo4j = AsyncPropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=property_on_sale_id))
+    response = await db_property_on_sale_neo4j.get_near_POIs()
     if response == 404:
         raise HTTPException(status_code=response, detail="POIs or property not found.")
     if response == 500:
         raise HTTPException(status_code=response, detail="Internal server error.")
     
-    return db_property_on_sale_neo4j.pois
+    return await store_map_response(map_response_cache, NEAR_POIS_FIELD, db_property_on_sale_neo4j.pois)
 
 @guest_router.get("/map/properties_near_property", response_model=List[PropertyOnSaleNeo4J], responses=ResponseModels.GetNearPropertiesResponses)
-def get_near_properties(property_on_sale_id:str):
+async def get_near_properties(property_on_sale_id:str):
     """
     Get the properties near the property on sale with the given ID and the property itself with summary informations (in particoulare the liveability score).
 
@@ -169,11 +347,14 @@ def get_near_properties(property_on_sale_id:str):
     """
     if not ObjectId.is_valid(property_on_sale_id):
         raise HTTPException(status_code=400, detail="Invalid property_on_sale_id.")
-    db_property_on_sale_neo4j = PropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=property_on_sale_id))
-    response = db_property_on_sale_neo4j.get_near_properties()
+    map_response_cache = AsyncMapResponseCacheDB(property_on_sale_id)
+    if await map_response_cache.get(NEAR_PROPERTIES_FIELD) == 200:
+        return Response(content=map_response_cache.response, media_type="application/json")
+    db_property_on_sale_neo4j = AsyncPropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=property_on_sale_id))
+    response = await db_property_on_sale_neo4j.get_near_properties()
     if response == 404:
         raise HTTPException(status_code=response, detail="Property not found.")
     if response == 500:
         raise HTTPException(status_code=response, detail="Internal server error.")
     
-    return db_property_on_sale_neo4j.near_properties
+    return await store_map_response(map_response_cache, NEAR_PROPERTIES_FIELD, db_property_on_sale_neo4j.near_properties)
@@ -4,7 +4,7 @@ from entities.Neo4J.City.city import City
 from entities.Neo4J.Neighbourhood.neighbourhood import Neighbourhood
 from entities.Neo4J.POI.poi import POI
 from entities.Neo4J.PropertyOnSaleNeo4J.property_on_sale_neo4j import PropertyOnSaleNeo4J
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from typing import Optional
 from modules.Guest.models.guest_models import SummaryPropertyOnSale
 
@@ -63,6 +63,153 @@ GetFilteredPropertiesOnSaleResponses = {
     }
 }
 
+class CursorPropertiesOnSale(BaseModel):
+    properties_on_sale: List[SummaryPropertyOnSale]
+    next_cursor: Optional[str] = None
+
+GetCursorFilteredPropertiesOnSaleResponses = {
+    200: {
+        "model": CursorPropertiesOnSale,
+        "description": "Filtered properties retrieved successfully.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "properties_on_sale": [
+                        {
+                            "property_on_sale_id": "60d5ec49f8d2e30b8c8b4567",
+                            "city": "New York",
+                            "neighbourhood": "Brooklyn",
+                            "address": "1234 Brooklyn St.",
+                            "price": 500000,
+                            "thumbnail": "https://www.example.com/thumbnail.jpg",
+                            "type": "House",
+                            "area": 2000,
+                            "registration_date": "2021-06-25T12:00:00",
+                        }
+                    ],
+                    "next_cursor": "eyJ2IjogIjIwMjEtMDYtMjVUMTI6MDA6MDAiLCAiaWQiOiAiNjBkNWVjNDlmOGQyZTMwYjhjOGI0NTY3In0="
+                }
+            }
+        }
+    },
+    400: {
+        "model": ErrorModel,
+        "description": "Invalid cursor or page size.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "Invalid cursor or page size."
+                }
+            }
+        }
+    },
+    404: {
+        "model": ErrorModel,
+        "description": "No properties found.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "No properties found."
+                }
+            }
+        }
+    },
+    500: {
+        "model": ErrorModel,
+        "description": "Internal server error.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "Internal server error."
+                }
+            }
+        }
+    }
+}
+
+class FacetBucket(BaseModel):
+    value: Optional[Union[int, float, str]] = None
+    count: int
+
+class SearchFacets(BaseModel):
+    type: List[FacetBucket]
+    neighbourhood: List[FacetBucket]
+    price: List[FacetBucket]
+    bed_number: List[FacetBucket]
+
+class FacetedPropertiesOnSale(BaseModel):
+    properties_on_sale: List[SummaryPropertyOnSale]
+    total_count: int
+    total_count_capped: bool
+    facets: SearchFacets
+
+GetFacetedPropertiesOnSaleResponses = {
+    200: {
+        "model": FacetedPropertiesOnSale,
+        "description": "Filtered properties, total count and facets retrieved successfully.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "properties_on_sale": [
+                        {
+                            "property_on_sale_id": "60d5ec49f8d2e30b8c8b4567",
+                            "city": "New York",
+                            "neighbourhood": "Brooklyn",
+                            "address": "1234 Brooklyn St.",
+                            "price": 500000,
+                            "thumbnail": "https://www.example.com/thumbnail.jpg",
+                            "type": "House",
+                            "area": 2000,
+                            "registration_date": "2021-06-25T12:00:00",
+                        }
+                    ],
+                    "total_count": 42,
+                    "total_count_capped": False,
+                    "facets": {
+                        "type": [{"value": "House", "count": 30}, {"value": "Condo", "count": 12}],
+                        "neighbourhood": [{"value": "Brooklyn", "count": 42}],
+                        "price": [{"value": "250000-500000", "count": 20}, {"value": "500000-750000", "count": 22}],
+                        "bed_number": [{"value": 2, "count": 10}, {"value": 3, "count": 32}]
+                    }
+                }
+            }
+        }
+    },
+    400: {
+        "model": ErrorModel,
+        "description": "Invalid page or page size.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "Invalid page or page size."
+                }
+            }
+        }
+    },
+    404: {
+        "model": ErrorModel,
+        "description": "No properties found.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "No properties found."
+                }
+            }
+        }
+    },
+    500: {
+        "model": ErrorModel,
+        "description": "Internal server error.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "Internal server error."
+                }
+            }
+        }
+    }
+}
+
 GetRandomPropertiesOnSaleResponses = {
     200: {
         "model": List[SummaryPropertyOnSale],
@@ -314,4 +461,119 @@ GetNearPropertiesResponses = {
             }
         }
     }   
-}
\ No newline at end of file
+}
+
+
+# Detail
+class PropertyOnSaleDetail(BaseModel):
+    property_on_sale: Optional[PropertyOnSale] = None
+    city: Optional[City] = None
+    neighbourhood: Optional[Neighbourhood] = None
+    pois: Optional[List[POI]] = None
+    near_properties: Optional[List[PropertyOnSaleNeo4J]] = None
+    missing_sections: List[str] = []
+
+GetPropertyOnSaleDetailResponses = {
+    200: {
+        "model": PropertyOnSaleDetail,
+        "description": "Property details found, missing_sections lists the sections that failed or timed out.",
+        "headers": {
+            "Server-Timing": {
+                "description": "Duration in milliseconds of every section, e.g. property_on_sale;dur=4.1, pois;dur=12.7",
+                "schema": {"type": "string"}
+            }
+        },
+        "content": {
+            "application/json": {
+                "example": {
+                    "property_on_sale": {
+                        "property_on_sale_id": "60d5ec49f8d2e30b8c8b4567",
+                        "city": "New York",
+                        "neighbourhood": "Brooklyn",
+                        "address": "1234 Brooklyn St.",
+                        "price": 500000,
+                        "thumbnail": "https://www.example.com/thumbnail.jpg",
+                        "type": "House",
+                        "area": 2000,
+                        "registration_date": "2021-06-25T12:00:00",
+                        "bed_number": 3,
+                        "bath_number": 2,
+                        "description": "Beautiful house in Brooklyn.",
+                        "photos": ["https://www.example.com/photo1.jpg"],
+                        "disponibility": {
+                            "day": "Monday",
+                            "time": "10:00 AM - 11:00 AM",
+                            "max_attendees": 5
+                        }
+                    },
+                    "city": {
+                        "name": "New York",
+                        "coordinates": {
+                            "latitude": 40.7128,
+                            "longitude": -74.0060
+                        },
+                        "safety_index": 70.5,
+                        "health_care_index": 75.3,
+                        "cost_of_living_index": 80.2,
+                        "pollution_index": 60.8
+                    },
+                    "neighbourhood": {
+                        "name": "Brooklyn",
+                        "coordinates": {
+                            "latitude": 40.6782,
+                            "longitude": -73.9442
+                        }
+                    },
+                    "pois": None,
+                    "near_properties": [
+                        {
+                            "property_on_sale_id": "60d5ec49f8d2e30b8c8b4567",
+                            "coordinates": {
+                                "latitude": 40.7128,
+                                "longitude": -74.0060
+                            },
+                            "price": 500000,
+                            "type": "House",
+                            "thumbnail": "https://www.example.com/thumbnail.jpg",
+                            "score": 67.89,
+                        }
+                    ],
+                    "missing_sections": ["pois"]
+                }
+            }
+        }
+    },
+    400: {
+        "model": ErrorModel,
+        "description": "Invalid property id.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "Invalid property id."
+                }
+            }
+        }
+    },
+    404: {
+        "model": ErrorModel,
+        "description": "Property not found.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "Property not found."
+                }
+            }
+        }
+    },
+    500: {
+        "model": ErrorModel,
+        "description": "Internal server error.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "Internal server error."
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,342 @@
+import csv
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from os import environ
+from typing import Callable, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from geopy.geocoders import Nominatim
+from config.config import settings
+from setup.neo4j_setup.neo4j_setup import get_neo4j_driver
+from setup.redis_setup.redis_setup import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Comma separated names of the providers asked in order, e.g. "gazetteer" for runs without network
+GEOCODING_PROVIDERS = environ.get('GEOCODING_PROVIDERS')
+if GEOCODING_PROVIDERS is None or GEOCODING_PROVIDERS.strip() == '':
+    GEOCODING_PROVIDERS = settings.geocoding_providers
+
+# Lifetime of the cached addresses, and of the addresses the providers could not find
+GEOCODING_CACHE_TTL_SECONDS = 30 * 24 * 3600
+GEOCODING_NOT_FOUND_TTL_SECONDS = 24 * 3600
+GEOCODING_CACHE_KEY_PREFIX = "geocoding:"
+# Timeout of a remote geocoding request
+GEOCODING_TIMEOUT_SECONDS = 3
+# Period of the reload of the gazetteer from Neo4j
+GAZETTEER_REFRESH_SECONDS = 3600
+GAZETTEER_CITIES_FILE = 'bulk/files/Neo4J/cities.csv'
+GAZETTEER_NEIGHBOURHOODS_FILE = 'bulk/files/Neo4J/neighbourhoods.csv'
+
+
+class GeocodingUnavailable(Exception):
+    """
+    Raised by a provider that cannot answer, so that the next provider of the chain is asked.
+    """
+
+
+class GeocodedLocation(BaseModel):
+    latitude: float
+    longitude: float
+    # Name of the provider that resolved the address
+    provider: str
+    # False for the approximate locations of the gazetteer, which are not cached
+    exact: bool = True
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """
+    Normalize a free text for the lookups: no accents, lower case, no punctuation, single spaces.
+
+    Args:
+        text (str, optional): The text to normalize.
+
+    Returns:
+        str: The normalized text, empty if the text is None.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class NominatimProvider:
+    """
+    Remote geocoding with OpenStreetMap Nominatim, one geolocator shared by all the requests.
+    """
+    name = "nominatim"
+    exact = True
+
+    def __init__(self, timeout: float = GEOCODING_TIMEOUT_SECONDS):
+        self.geolocator = Nominatim(user_agent="homexplore", timeout=timeout)
+
+    def geocode(self, address: str, neighbourhood: Optional[str] = None, city: Optional[str] = None) -> Optional[GeocodedLocation]:
+        """
+        Args:
+            address (str): The address to geocode.
+            neighbourhood (str, optional): The neighbourhood of the address, not used.
+            city (str, optional): The city of the address, not used.
+
+        Returns:
+            GeocodedLocation: The location of the address, None if the address is not found.
+
+        Raises:
+            GeocodingUnavailable: If Nominatim cannot be reached.
+        """
+        try:
+            location = self.geolocator.geocode(address)
+        except Exception as e:
+            raise GeocodingUnavailable(str(e))
+        if location is None:
+            return None
+        return GeocodedLocation(latitude=location.latitude, longitude=location.longitude, provider=self.name)
+
+
+class GazetteerProvider:
+    """
+    Offline geocoding with the coordinates of our own neighbourhoods and cities, read from Neo4j or,
+    when Neo4j cannot be reached, from the bulk files. The location is the one of the neighbourhood,
+    or of the city if the neighbourhood is unknown.
+    """
+    name = "gazetteer"
+    # The answers of an approximate provider are not cached
+    exact = False
+
+    def __init__(self, refresh_seconds: float = GAZETTEER_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.neighbourhoods: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self.neighbourhoods_by_name: Dict[str, Tuple[float, float]] = {}
+        self.cities: Dict[str, Tuple[float, float]] = {}
+        self.loaded_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def load_from_neo4j(self) -> Tuple[List[dict], List[dict]]:
+        """
+        Returns:
+            tuple: The cities and the neighbourhoods, with name, city, latitude and longitude.
+        """
+        with get_neo4j_driver().session() as session:
+            cities = session.run(
+                "MATCH (c:City) "
+                "RETURN c.name AS name, c.coordinates.latitude AS latitude, c.coordinates.longitude AS longitude"
+            ).data()
+            neighbourhoods = session.run(
+                "MATCH (n:Neighbourhood) "
+                "OPTIONAL MATCH (n)-[:BELONGS_TO_CITY]->(c:City) "
+                "RETURN n.name AS name, c.name AS city, n.coordinates.latitude AS latitude, n.coordinates.longitude AS longitude"
+            ).data()
+        return cities, neighbourhoods
+
+    def load_from_files(self) -> Tuple[List[dict], List[dict]]:
+        """
+        Returns:
+            tuple: The cities and the neighbourhoods of the bulk files, with name, city, latitude and longitude.
+        """
+        with open(GAZETTEER_CITIES_FILE, newline='') as cities_file:
+            cities = [{"name": row["city"], "latitude": row["latitude"], "longitude": row["longitude"]} for row in csv.DictReader(cities_file)]
+        with open(GAZETTEER_NEIGHBOURHOODS_FILE, newline='') as neighbourhoods_file:
+            neighbourhoods = [row for row in csv.DictReader(neighbourhoods_file)]
+        return cities, neighbourhoods
+
+    def load(self) -> None:
+        """
+        Load the gazetteer if it has never been loaded or it is older than refresh_seconds.
+
+        Raises:
+            GeocodingUnavailable: If neither Neo4j nor the bulk files can be read.
+        """
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.refresh_seconds:
+            return
+        with self.lock:
+            if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.refresh_seconds:
+                return
+            try:
+                cities, neighbourhoods = self.load_from_neo4j()
+            except Exception as e:
+                logger.warning("Loading the gazetteer from Neo4j failed, using the bulk files: %s", e)
+                try:
+                    cities, neighbourhoods = self.load_from_files()
+                except OSError as e:
+                    # Keep the previous gazetteer, if any
+                    if self.loaded_at is None:
+                        raise GeocodingUnavailable(str(e))
+                    return
+            self.cities = {
+                normalize_text(city["name"]): (float(city["latitude"]), float(city["longitude"]))
+                for city in cities if city["latitude"] not in (None, "")
+            }
+            self.neighbourhoods = {}
+            self.neighbourhoods_by_name = {}
+            for neighbourhood in neighbourhoods:
+                if neighbourhood["latitude"] in (None, "") or neighbourhood["name"] == "Unknown":
+                    continue
+                coordinates = (float(neighbourhood["latitude"]), float(neighbourhood["longitude"]))
+                self.neighbourhoods[(normalize_text(neighbourhood.get("city")), normalize_text(neighbourhood["name"]))] = coordinates
+                self.neighbourhoods_by_name.setdefault(normalize_text(neighbourhood["name"]), coordinates)
+            self.loaded_at = time.monotonic()
+
+    def geocode(self, address: str, neighbourhood: Optional[str] = None, city: Optional[str] = None) -> Optional[GeocodedLocation]:
+        """
+        Args:
+            address (str): The address to geocode, not used.
+            neighbourhood (str, optional): The neighbourhood of the address.
+            city (str, optional): The city of the address.
+
+        Returns:
+            GeocodedLocation: The approximate location of the address, None if neither the neighbourhood nor the city is known.
+
+        Raises:
+            GeocodingUnavailable: If the gazetteer cannot be loaded.
+        """
+        self.load()
+        city_key = normalize_text(city)
+        neighbourhood_key = normalize_text(neighbourhood)
+        coordinates = None
+        if neighbourhood_key:
+            coordinates = self.neighbourhoods.get((city_key, neighbourhood_key))
+            if coordinates is None and not city_key:
+                coordinates = self.neighbourhoods_by_name.get(neighbourhood_key)
+        if coordinates is None and city_key:
+            coordinates = self.cities.get(city_key)
+        if coordinates is None:
+            return None
+        return GeocodedLocation(latitude=coordinates[0], longitude=coordinates[1], provider=self.name, exact=False)
+
+
+# Factories of the providers that GEOCODING_PROVIDERS can name, register_provider adds new ones
+PROVIDER_FACTORIES: Dict[str, Callable[[], object]] = {
+    NominatimProvider.name: NominatimProvider,
+    GazetteerProvider.name: GazetteerProvider,
+}
+
+
+def register_provider(name: str, factory: Callable[[], object]) -> None:
+    """
+    Make a provider available to GEOCODING_PROVIDERS and Geocoder, e.g. a fake provider for the tests.
+
+    Args:
+        name (str): The name of the provider.
+        factory (callable): Builds the provider, an object with name, exact and a geocode(address, neighbourhood, city) method.
+    """
+    PROVIDER_FACTORIES[name] = factory
+
+
+class Geocoder:
+    """
+    Geocoding of the property addresses: a persistent cache of the normalized addresses in Redis,
+    in front of a chain of providers asked in order. The first provider that finds the address wins,
+    a provider that cannot answer or does not find it passes the address to the next one.
+    """
+
+    def __init__(self, provider_names: Optional[List[str]] = None, use_cache: bool = True):
+        if provider_names is None:
+            provider_names = [name.strip() for name in GEOCODING_PROVIDERS.split(',') if name.strip()]
+        self.providers = [PROVIDER_FACTORIES[name]() for name in provider_names]
+        self.use_cache = use_cache
+
+    def cache_key(self, address: str) -> str:
+        """
+        Args:
+            address (str): The address.
+
+        Returns:
+            str: The Redis key of the normalized address.
+        """
+        return GEOCODING_CACHE_KEY_PREFIX + hashlib.sha1(normalize_text(address).encode("utf-8")).hexdigest()
+
+    def read_cache(self, key: str) -> Tuple[bool, Optional[GeocodedLocation]]:
+        """
+        Args:
+            key (str): The Redis key of the address.
+
+        Returns:
+            tuple: Whether the address is cached, and its location, None if it was not found.
+        """
+        try:
+            raw = get_redis_client().get(key)
+        except Exception as e:
+            logger.warning("Error reading the geocoding cache: %s", e)
+            return False, None
+        if raw is None:
+            return False, None
+        try:
+            data = json.loads(raw)
+            return True, (GeocodedLocation(**data) if data else None)
+        except (json.JSONDecodeError, TypeError, ValueError) as e:
+            # A corrupt entry is a miss, it is overwritten by the next answer
+            logger.warning("Error decoding the geocoding cache entry %s: %s", key, e)
+            return False, None
+
+    def write_cache(self, key: str, location: Optional[GeocodedLocation]) -> None:
+        """
+        Args:
+            key (str): The Redis key of the address.
+            location (GeocodedLocation, optional): The location of the address, None if it was not found.
+        """
+        try:
+            if location is None:
+                get_redis_client().set(key, json.dumps(None), ex=GEOCODING_NOT_FOUND_TTL_SECONDS)
+            else:
+                get_redis_client().set(key, location.model_dump_json(), ex=GEOCODING_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("Error writing the geocoding cache: %s", e)
+
+    def geocode(self, address: str, neighbourhood: Optional[str] = None, city: Optional[str] = None) -> Optional[GeocodedLocation]:
+        """
+        Geocode an address. Blocking, the routes run it in the threadpool.
+
+        Args:
+            address (str): The address to geocode.
+            neighbourhood (str, optional): The neighbourhood of the address.
+            city (str, optional): The city of the address.
+
+        Returns:
+            GeocodedLocation: The location of the address, None if it is not found.
+
+        Raises:
+            GeocodingUnavailable: If no provider can answer.
+        """
+        key = self.cache_key(address)
+        # Set when the cache knows that the exact providers do not find the address
+        cached_not_found = False
+        if self.use_cache:
+            cached, location = self.read_cache(key)
+            if cached and location is not None:
+                return location
+            cached_not_found = cached
+        errors = []
+        not_found = cached_not_found
+        exact_not_found = False
+        for provider in self.providers:
+            # The approximate providers are still asked, the neighbourhood or the city may differ from the cached lookup
+            if cached_not_found and provider.exact:
+                continue
+            try:
+                location = provider.geocode(address, neighbourhood, city)
+            except GeocodingUnavailable as e:
+                logger.warning("Geocoding provider %s unavailable: %s", provider.name, e)
+                errors.append(f"{provider.name}: {e}")
+                continue
+            if location is None:
+                # The next providers may still know the address, or at least its neighbourhood
+                not_found = True
+                exact_not_found = exact_not_found or provider.exact
+                continue
+            # The approximate answers are not cached, the address is resolved again when an exact provider is back
+            if self.use_cache and provider.exact:
+                self.write_cache(key, location)
+            return location
+        if not_found:
+            # The address is cached as not found only if an exact provider missed it and every provider answered
+            if self.use_cache and exact_not_found and not errors:
+                self.write_cache(key, None)
+            return None
+        raise GeocodingUnavailable("; ".join(errors) or "No geocoding provider configured")
+
+
+geocoder = Geocoder()
@@ -1,42 +1,41 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from entities.MongoDB.Seller.seller import Seller, SoldProperty, SellerPropertyOnSale
-from entities.MongoDB.Seller.db_seller import SellerDB
+from entities.MongoDB.Seller.async_db_seller import AsyncSellerDB
 from modules.Seller.models.seller_models import UpdateSeller
 from modules.Seller.models import response_models as ResponseModels
 from entities.Redis.ReservationsSeller.reservations_seller import ReservationsSeller, ReservationS, next_weekday
-from entities.Redis.ReservationsSeller.db_reservations_seller import ReservationsSellerDB
-from entities.Redis.ReservationsBuyer.reservations_buyer import ReservationsBuyer, ReservationB
-from entities.Redis.ReservationsBuyer.db_reservations_buyer import ReservationsBuyerDB
+from entities.Redis.ReservationsSeller.async_db_reservations_seller import AsyncReservationsSellerDB
+from entities.Redis.ReservationsBuyer.reservations_buyer import ReservationB
+from entities.Redis.ReservationsBuyer.db_reservations_buyer import failed_buyer_ids
+from entities.Redis.ReservationsBuyer.async_db_reservations_buyer import propagate_property_change as async_propagate_property_change
+from entities.Redis.ReservationJobs.reservation_job import ReservationJob
+from entities.Redis.ReservationJobs.async_db_reservation_jobs import AsyncReservationJobsDB
 from entities.MongoDB.PropertyOnSale.property_on_sale import PropertyOnSale
-from entities.MongoDB.PropertyOnSale.db_property_on_sale import PropertyOnSaleDB
+from entities.MongoDB.PropertyOnSale.async_db_property_on_sale import AsyncPropertyOnSaleDB
+from entities.MongoDB.PropertyOnSale.random_property_pool import random_property_pool
 from modules.Seller.models.seller_models import CreatePropertyOnSale, UpdatePropertyOnSale
 from modules.Seller.models.seller_models import Analytics2Input, Analytics3Input
 from entities.Neo4J.PropertyOnSaleNeo4J.property_on_sale_neo4j import PropertyOnSaleNeo4J
-from entities.Neo4J.PropertyOnSaleNeo4J.db_property_on_sale_neo4j import PropertyOnSaleNeo4JDB
+from entities.Neo4J.PropertyOnSaleNeo4J.async_db_property_on_sale_neo4j import AsyncPropertyOnSaleNeo4JDB
 from entities.Neo4J.PropertyOnSaleNeo4J.property_on_sale_neo4j import Neo4jPoint
 from typing import List, Optional
 from bson.objectid import ObjectId
-from apscheduler.schedulers.background import BackgroundScheduler
-import psutil
 from setup.mongo_setup.mongo_setup import get_default_mongo_db
-from datetime import datetime, timedelta
-from geopy.geocoders import Nominatim
+from setup.redis_setup.redis_setup import LISTING_READ_PREFERENCE
+from datetime import datetime
 
 from modules.Auth.helpers.JwtHandler import JWTHandler
-from modules.Auth.helpers.auth_helpers import hash_password
+from modules.Auth.helpers.password_hasher import password_hasher, PasswordHasherBusy, password_hasher_busy
+from modules.Seller.helpers.geocoding import geocoder
 
 seller_router = APIRouter(prefix="/seller", tags=["Seller"])
 
-
-# Scheduler is used to handle the reservations when the load is low
-scheduler = BackgroundScheduler()
-scheduler.start()
-
 #Seller
 
 @seller_router.get("/profile_info", response_model=ResponseModels.SellerInfoResponseModel, responses=ResponseModels.GetSellerResponses)
-def get_seller(access_token: str = Depends(JWTHandler())):
+async def get_seller(access_token: str = Depends(JWTHandler())):
     """
     Get the profile info of the seller.
 
@@ -56,8 +55,8 @@ def get_seller(access_token: str = Depends(JWTHandler())):
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     temp_seller = Seller(seller_id=seller_id)
-    db_seller = SellerDB(temp_seller)
-    response = db_seller.get_profile_info()
+    db_seller = AsyncSellerDB(temp_seller)
+    response = await db_seller.get_profile_info()
     if response == 400:
         raise HTTPException(status_code=400, detail="Invalid seller id")
     if response == 404:
@@ -66,7 +65,7 @@ def get_seller(access_token: str = Depends(JWTHandler())):
 
 
 @seller_router.put("/", response_model=ResponseModels.SuccessModel, responses=ResponseModels.UpdateSellerResponses)
-def update_seller(seller: UpdateSeller, access_token: str = Depends(JWTHandler())):
+async def update_seller(seller: UpdateSeller, access_token: str = Depends(JWTHandler())):
     """
     Update profile info of the seller.
 
@@ -82,6 +81,7 @@ def update_seller(seller: UpdateSeller, access_token: str = Depends(JWTHandler()
                        400 if the seller ID is missing.
                        404 if the seller is not found.
                        500 if there is an error updating the seller.
+                       503 if the password hashing pool is saturated.
 
     Returns:
         JSONResponse: A success message if the update succeeds.
@@ -91,10 +91,10 @@ def update_seller(seller: UpdateSeller, access_token: str = Depends(JWTHandler()
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     seller_old = Seller(seller_id=seller_id)
-    seller_db = SellerDB(seller_old)
+    seller_db = AsyncSellerDB(seller_old)
     
     if seller.email:
-        result=seller_db.get_seller_by_email(seller.email)
+        result=await seller_db.get_seller_by_email(seller.email)
         if result == 200 and seller_db.seller.seller_id != seller_id:
             raise HTTPException(status_code=409, detail="Email already in use.")
         if result == 500:
@@ -103,10 +103,13 @@ def update_seller(seller: UpdateSeller, access_token: str = Depends(JWTHandler()
     
     # Check if there's a password to crypt
     if seller.password:
-        seller.password = hash_password(seller.password)
+        try:
+            seller.password = await password_hasher.hash_password(seller.password)
+        except PasswordHasherBusy:
+            raise password_hasher_busy()
     
     seller_db.seller.seller_id = seller_id
-    result = seller_db.update_seller(seller)
+    result = await seller_db.update_seller(seller)
     if result == 400:
         raise HTTPException(status_code=result, detail="Seller ID is required.")
     elif result == 404:
@@ -117,7 +120,7 @@ def update_seller(seller: UpdateSeller, access_token: str = Depends(JWTHandler()
         return JSONResponse(status_code=result, content={"detail": "Seller updated successfully."})
 
 @seller_router.get("/properties_on_sale", response_model=List[SellerPropertyOnSale], responses=ResponseModels.GetPropertiesOnSaleResponses)
-def get_property_on_sale_filtered(city: Optional[str] = None, neighbourhood: Optional[str] = None, address: Optional[str] = None, access_token: str = Depends(JWTHandler())):
+async def get_property_on_sale_filtered(city: Optional[str] = None, neighbourhood: Optional[str] = None, address: Optional[str] = None, access_token: str = Depends(JWTHandler())):
     """
     Get the seller's properties on sale filtered by city, neighbourhood, or address.
 
@@ -143,8 +146,8 @@ def get_property_on_sale_filtered(city: Optional[str] = None, neighbourhood: Opt
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     temp_seller = Seller(seller_id=seller_id)
-    db_seller = SellerDB(temp_seller)
-    result = db_seller.get_property_on_sale_filtered(city, neighbourhood, address)
+    db_seller = AsyncSellerDB(temp_seller)
+    result = await db_seller.get_property_on_sale_filtered(city, neighbourhood, address)
     if result == 404:
         raise HTTPException(status_code=404, detail="No seller found or no property found.")
     if result == 500:
@@ -152,7 +155,7 @@ def get_property_on_sale_filtered(city: Optional[str] = None, neighbourhood: Opt
     return db_seller.seller.properties_on_sale
 
 @seller_router.get("/sold_properties", response_model=List[SoldProperty], responses=ResponseModels.GetSoldPropertiesResponses)
-def get_sold_properties_filtered(city: Optional[str] = None, neighbourhood: Optional[str] = None, access_token: str = Depends(JWTHandler())):
+async def get_sold_properties_filtered(city: Optional[str] = None, neighbourhood: Optional[str] = None, access_token: str = Depends(JWTHandler())):
     """
     Get the seller's sold properties.
 
@@ -176,8 +179,8 @@ def get_sold_properties_filtered(city: Optional[str] = None, neighbourhood: Opti
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     temp_seller = Seller(seller_id=seller_id)
-    db_seller = SellerDB(temp_seller)
-    result=db_seller.get_sold_properties_filtered(city, neighbourhood)
+    db_seller = AsyncSellerDB(temp_seller)
+    result=await db_seller.get_sold_properties_filtered(city, neighbourhood)
     if result == 404:
         raise HTTPException(status_code=404, detail="Seller or properties not found.")
     if result== 500:
@@ -192,7 +195,7 @@ def get_sold_properties_filtered(city: Optional[str] = None, neighbourhood: Opti
 
 
 @seller_router.post("/property_on_sale", response_model=ResponseModels.CreatePropertyOnSaleResponseModel, responses=ResponseModels.CreatePropertyOnSaleResponses)
-def create_property_on_sale(input_property_on_sale: CreatePropertyOnSale, access_token: str = Depends(JWTHandler())):
+async def create_property_on_sale(input_property_on_sale: CreatePropertyOnSale, access_token: str = Depends(JWTHandler())):
     """
     Create a new property on sale for the seller inserting it in the property_on_sale collection, in the seller collection and in Neo4j. In Neo4j are also created the relationships with the neighbourhood, near properties, near POIs and the score is updated.
 
@@ -216,10 +219,9 @@ def create_property_on_sale(input_property_on_sale: CreatePropertyOnSale, access
         raise HTTPException(status_code=401, detail="Invalid access token")
 
     
-    geolocator = Nominatim(user_agent="homexplore")
     address = input_property_on_sale.address  
     try:
-        location = geolocator.geocode(address)
+        location = await run_in_threadpool(geocoder.geocode, address, input_property_on_sale.neighbourhood, input_property_on_sale.city)
     except Exception as e:
             raise HTTPException(status_code=400, detail="Wrong address.")
     if location is None:
@@ -227,8 +229,8 @@ def create_property_on_sale(input_property_on_sale: CreatePropertyOnSale, access
     
     # Insert the property on the property_on_sale collection
     property_on_sale = PropertyOnSale(**input_property_on_sale.model_dump())
-    db_property_on_sale = PropertyOnSaleDB(property_on_sale)
-    response = db_property_on_sale.create_property_on_sale()
+    db_property_on_sale = AsyncPropertyOnSaleDB(property_on_sale)
+    response = await db_property_on_sale.create_property_on_sale()
     if response == 400:
         raise HTTPException(status_code=response, detail="Data required.")
     if response == 500:
@@ -236,17 +238,17 @@ def create_property_on_sale(input_property_on_sale: CreatePropertyOnSale, access
     
     # Insert the property on the seller collection
     seller= Seller(seller_id=seller_id)
-    seller_db= SellerDB(seller)
+    seller_db= AsyncSellerDB(seller)
     embedded_property_on_sale = SellerPropertyOnSale(**input_property_on_sale.model_dump(exclude={"type", "area", "bed_number", "bath_number", "description", "photos"}))
     embedded_property_on_sale.property_on_sale_id=db_property_on_sale.property_on_sale.property_on_sale_id
-    response=seller_db.insert_property_on_sale(embedded_property_on_sale)
+    response=await seller_db.insert_property_on_sale(embedded_property_on_sale)
     if response != 200: 
         if response == 500:
             detail="Failed to create property."
         else:
             detail="Seller not found."
         # Rollback
-        response=db_property_on_sale.delete_property_on_sale_by_id(db_property_on_sale.property_on_sale.property_on_sale_id)
+        response=await db_property_on_sale.delete_property_on_sale_by_id(db_property_on_sale.property_on_sale.property_on_sale_id)
         raise HTTPException(status_code=500, detail=detail)
     
     #Neo4j
@@ -257,13 +259,16 @@ def create_property_on_sale(input_property_on_sale: CreatePropertyOnSale, access
         coordinates=Neo4jPoint(latitude=location.latitude, longitude=location.longitude)
     )
     
-    property_on_sale_neo4j_db = PropertyOnSaleNeo4JDB(property_on_sale_neo4j)
+    property_on_sale_neo4j_db = AsyncPropertyOnSaleNeo4JDB(property_on_sale_neo4j)
 
     # Create property on sale in Neo4j
-    neo4j_response = property_on_sale_neo4j_db.create_property_on_sale_neo4j(input_property_on_sale.neighbourhood)
+    neo4j_response = await property_on_sale_neo4j_db.create_property_on_sale_neo4j(input_property_on_sale.neighbourhood)
         
     # Update score
-    neo4j_response = property_on_sale_neo4j_db.update_livability_score()
+    neo4j_response = await property_on_sale_neo4j_db.update_livability_score()
+
+    # The new property can enter the landing page pool
+    random_property_pool.schedule_refresh()
 
     return JSONResponse(
         status_code=201, 
@@ -274,103 +279,27 @@ def create_property_on_sale(input_property_on_sale: CreatePropertyOnSale, access
     )
 
 
-# Function to check and update the reservations when the load is low
-def check_and_update_when_low_load(not_updated_ids: list, property_on_sale_id: str, disponibility, address):
+def reservation_changes(disponibility, address) -> dict:
     """
-    Check and update the reservations when the load on the server is low.
-    
-    Args:
-        not_updated_ids (list): The list of buyer_ids that have not been updated yet.
-        property_on_sale_id (str): The property_on_sale_id to update.
-        disponibility (ReservationS, optional): The new disponibility to update.
-        address (str, optional): The new address to update.
-    """
-    # psutil.cpu_percent() checks the current CPU load
-    current_load = psutil.cpu_percent(interval=1)
-    if current_load < 30:
-        # If the load is low, update the reservations
-        for buyer_id in not_updated_ids:
-            reservation_buyer = ReservationsBuyer(buyer_id=buyer_id)
-            reservation_buyer_db = ReservationsBuyerDB(reservation_buyer)
-            status = reservation_buyer_db.get_reservations_by_user()
-            if status != 200:
-                continue
-            for reservation in reservation_buyer_db.reservations_buyer.reservations:
-                if reservation.property_on_sale_id == property_on_sale_id:
-                    if disponibility is not None:
-                        reservation.date = next_weekday(disponibility.day)
-                        reservation.time = disponibility.time
-                    if address is not None:
-                        reservation.address = address
-            status = reservation_buyer_db.update_reservation_buyer()
-            # If the update do not fail, remove the buyer_id from the list
-            if status == 200:
-                not_updated_ids.remove(buyer_id)
-
-        if not_updated_ids:
-            # If there are still reservations to update, re-schedule the update
-            next_run = datetime.now() + timedelta(minutes=5)
-            scheduler.add_job(
-                check_and_update_when_low_load,
-                'date',
-                run_date=next_run,
-                args=[not_updated_ids, property_on_sale_id, disponibility, address]
-            )
+    Build the fields to update in the buyer reservations after an update of the property on sale.
 
-    else:
-        # If the load is still high, re-schedule the update
-        next_run = datetime.now() + timedelta(minutes=5)
-        scheduler.add_job(
-            check_and_update_when_low_load,
-            'date',
-            run_date=next_run,
-            args=[not_updated_ids, property_on_sale_id, disponibility, address]
-        )
-
-def check_and_delete_when_low_load(not_deleted_ids: list, property_on_sale_id: str):
-    """
-    Check and delete the reservations when the load on the server is low.
-   
     Args:
-        not_deleted_ids (list): The list of buyer_ids that have not been deleted yet.
-        property_on_sale_id (str): The property_on_sale_id to delete.
+        disponibility (ReservationS, optional): The new disponibility.
+        address (str, optional): The new address.
+
+    Returns:
+        dict: The fields to update.
     """
-    # psutil.cpu_percent() checks the current CPU load
-    current_load = psutil.cpu_percent(interval=1)
-    if current_load < 30:
-        # If the load is low, update the reservations
-        for buyer_id in not_deleted_ids:
-            reservation_buyer = ReservationsBuyer(buyer_id=buyer_id)
-            reservation_buyer_db = ReservationsBuyerDB(reservation_buyer)
-            status = reservation_buyer_db.get_reservations_by_user()
-            if status != 200:
-                continue
-            status = reservation_buyer_db.delete_reservation_by_property_on_sale_id(property_on_sale_id)    
-            # If the delete do not fail, remove the buyer_id from the list
-            if status == 200:
-                not_deleted_ids.remove(buyer_id)
-
-        if not_deleted_ids:
-            # If there are still reservations to delete, re-schedule the delete
-            next_run = datetime.now() + timedelta(minutes=5)
-            scheduler.add_job(
-                check_and_delete_when_low_load,
-                'date',
-                run_date=next_run,
-                args=[not_deleted_ids, property_on_sale_id]
-            )
-    else:
-        # If the load is still high, re-schedule the delete
-        next_run = datetime.now() + timedelta(minutes=5)
-        scheduler.add_job(
-            check_and_delete_when_low_load,
-            'date',
-            run_date=next_run,
-            args=[not_deleted_ids, property_on_sale_id]
-        )
+    updated_data = {}
+    if disponibility is not None:
+        updated_data["date"] = next_weekday(disponibility.day)
+        updated_data["time"] = disponibility.time
+    if address is not None:
+        updated_data["address"] = address
+    return updated_data
 
 @seller_router.put("/property_on_sale", response_model=ResponseModels.SuccessModel, responses=ResponseModels.UpdatePropertyOnSaleResponses)
-def update_property_on_sale(input_property_on_sale: UpdatePropertyOnSale, access_token: str = Depends(JWTHandler())):
+async def update_property_on_sale(input_property_on_sale: UpdatePropertyOnSale, access_token: str = Depends(JWTHandler())):
     """
     Update an existing property on sale for the seller.
 
@@ -394,10 +323,9 @@ def update_property_on_sale(input_property_on_sale: UpdatePropertyOnSale, access
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     if input_property_on_sale.address is not None:
-        geolocator = Nominatim(user_agent="homexplore")
         address = input_property_on_sale.address  
         try:
-            location = geolocator.geocode(address)
+            location = await run_in_threadpool(geocoder.geocode, address, input_property_on_sale.neighbourhood, input_property_on_sale.city)
         except Exception as e:
             raise HTTPException(status_code=400, detail="Wrong address.")
         if location is None:
@@ -405,9 +333,9 @@ def update_property_on_sale(input_property_on_sale: UpdatePropertyOnSale, access
     
     # Update on the seller collection
     seller= Seller(seller_id=seller_id)
-    db_seller= SellerDB(seller)
+    db_seller= AsyncSellerDB(seller)
     embedded_property_on_sale = SellerPropertyOnSale(**input_property_on_sale.model_dump(exclude={"type", "area", "bed_number", "bath_number", "description", "photos"}))
-    response=db_seller.update_property_on_sale(embedded_property_on_sale)
+    response=await db_seller.update_property_on_sale(embedded_property_on_sale)
     if response == 404:
         detail="Seller not found or property not found."
     if response == 500:
@@ -417,63 +345,49 @@ def update_property_on_sale(input_property_on_sale: UpdatePropertyOnSale, access
     
     # Update on the property_on_sale collection
     property_on_sale = PropertyOnSale(**input_property_on_sale.model_dump())
-    db_property_on_sale = PropertyOnSaleDB(property_on_sale)
-    response = db_property_on_sale.update_property_on_sale()
+    db_property_on_sale = AsyncPropertyOnSaleDB(property_on_sale)
+    response = await db_property_on_sale.update_property_on_sale()
     if response == 404:
         raise HTTPException(status_code=response, detail="Property not found in property_on_sale collection.")
     if response == 500:
         # Rollback
-        response=db_property_on_sale.get_property_on_sale_by_id(property_on_sale.property_on_sale_id)
+        response=await db_property_on_sale.get_property_on_sale_by_id(property_on_sale.property_on_sale_id)
         if response == 200:
             embedded_property_on_sale = SellerPropertyOnSale(db_property_on_sale.property_on_sale)
-            response=db_seller.update_property_on_sale(embedded_property_on_sale)
+            response=await db_seller.update_property_on_sale(embedded_property_on_sale)
         raise HTTPException(status_code=response, detail="Failed to update property.")
+
+    # The summary in the landing page pool may be stale
+    random_property_pool.discard(input_property_on_sale.property_on_sale_id)
+    random_property_pool.schedule_refresh()
     
     # Handling redis part of the update
     if input_property_on_sale.disponibility is not None or input_property_on_sale.address is not None:
         
         reservation_seller = ReservationsSeller(property_on_sale_id=input_property_on_sale.property_on_sale_id)
-        reservation_seller_db = ReservationsSellerDB(reservation_seller)
+        reservation_seller_db = AsyncReservationsSellerDB(reservation_seller)
 
         # If disponibility has changed, update the ttl in the reservations seller
         if input_property_on_sale.disponibility is not None:
-            status = reservation_seller_db.update_day_and_time(input_property_on_sale.disponibility.day, input_property_on_sale.disponibility.time)
+            status = await reservation_seller_db.update_day_and_time(input_property_on_sale.disponibility.day, input_property_on_sale.disponibility.time)
             if status == 500:
                 raise HTTPException(status_code=500, detail="Failed to update disponibility.")
 
         # Save all the buyer_ids of the reservations
-        buyer_ids = [reservation.buyer_id for reservation in reservation_seller_db.reservations_seller.reservations]
-
-        # For each reservation buyer, update the disponibility and address
-        not_updated_ids = []
-        for buyer_id in buyer_ids.copy():
-            reservation_buyer = ReservationsBuyer(buyer_id=buyer_id)
-            reservation_buyer_db = ReservationsBuyerDB(reservation_buyer)
-            status = reservation_buyer_db.get_reservations_by_user()
-            if status != 200:
-                continue
-            for reservation in reservation_buyer_db.reservations_buyer.reservations:
-                if reservation.property_on_sale_id == input_property_on_sale.property_on_sale_id:
-                    if input_property_on_sale.disponibility is not None:
-                        reservation.date = next_weekday(input_property_on_sale.disponibility.day)
-                        reservation.time = input_property_on_sale.disponibility.time
-                    if input_property_on_sale.address is not None:
-                        reservation.address = input_property_on_sale.address
-            status = reservation_buyer_db.update_reservation_buyer()
-            # If the update do not fail, remove the buyer_id from the list
-            if status == 200:
-                buyer_ids.remove(buyer_id)
-            else: 
-                not_updated_ids.append(buyer_id)            
-                
+        status = await reservation_seller_db.get_reservation_seller()
+        if status == 500:
+            raise HTTPException(status_code=500, detail="Failed to update reservations.")
+        buyer_ids = [reservation.buyer_id for reservation in reservation_seller_db.reservations_seller.reservations or []]
+
+        # Update the disponibility and address of all the reservation buyers at once
+        updated_data = reservation_changes(input_property_on_sale.disponibility, input_property_on_sale.address)
+        statuses = await async_propagate_property_change(buyer_ids, input_property_on_sale.property_on_sale_id, updated_data)
+        not_updated_ids = failed_buyer_ids(statuses)
         if not_updated_ids:
-                run_date = datetime.now() + timedelta(minutes=5)
-                scheduler.add_job(
-                    check_and_update_when_low_load,
-                    'date',
-                    run_date=run_date,
-                    args=[not_updated_ids, input_property_on_sale.property_on_sale_id, input_property_on_sale.disponibility, input_property_on_sale.address]
-                )
+            # Retry the update in background, coalesced with the other pending changes of the property
+            reservation_job = ReservationJob(property_on_sale_id=input_property_on_sale.property_on_sale_id, buyer_ids=not_updated_ids, updated_data=updated_data)
+            if await AsyncReservationJobsDB(reservation_job).enqueue() == 500:
+                raise HTTPException(status_code=500, detail="Failed to update reservations.")
     
     neighbourhood_name = None
     if input_property_on_sale.neighbourhood is not None:
@@ -481,18 +395,18 @@ def update_property_on_sale(input_property_on_sale: UpdatePropertyOnSale, access
     # Update Neo4j
     if input_property_on_sale.address is not None:
         new_property_on_sale_neo4j = PropertyOnSaleNeo4J(**input_property_on_sale.model_dump(include={"property_on_sale_id", "price", "type", "thumbnail"}), coordinates=Neo4jPoint(latitude=location.latitude, longitude=location.longitude))
-        property_on_sale_neo4j_db = PropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=input_property_on_sale.property_on_sale_id))
-        property_on_sale_neo4j_db.update_property_on_sale_neo4j(new_property_on_sale_neo4j, neighbourhood_name)
+        property_on_sale_neo4j_db = AsyncPropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=input_property_on_sale.property_on_sale_id))
+        await property_on_sale_neo4j_db.update_property_on_sale_neo4j(new_property_on_sale_neo4j, neighbourhood_name)
     else:
         new_property_on_sale_neo4j = PropertyOnSaleNeo4J(**input_property_on_sale.model_dump(include={"property_on_sale_id", "price", "type", "thumbnail"}), coordinates=None)
-        property_on_sale_neo4j_db = PropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=input_property_on_sale.property_on_sale_id))
-        property_on_sale_neo4j_db.update_property_on_sale_neo4j(new_property_on_sale_neo4j, neighbourhood_name)
+        property_on_sale_neo4j_db = AsyncPropertyOnSaleNeo4JDB(PropertyOnSaleNeo4J(property_on_sale_id=input_property_on_sale.property_on_sale_id))
+        await property_on_sale_neo4j_db.update_property_on_sale_neo4j(new_property_on_sale_neo4j, neighbourhood_name)
     
     return JSONResponse(status_code=200, content={"detail": "Property updated successfully."})
 
-def handleReservations(property_on_sale_id: str) -> int:
+async def handleReservationsAsync(property_on_sale_id: str) -> int:
     """
-    Handle the reservations when a property is sold or deleted.
+    Handle the reservations when a property is sold or deleted. The reservations that cannot be deleted are left to the reservation jobs.
     
     Args:
         property_on_sale_id (str): The ID of the property on sale.
@@ -501,36 +415,25 @@ def handleReservations(property_on_sale_id: str) -> int:
         int: The status code.
     """
     reservation_seller = ReservationsSeller(property_on_sale_id=property_on_sale_id)
-    reservation_seller_db = ReservationsSellerDB(reservation_seller)
-    status = reservation_seller_db.get_reservation_seller()
+    reservation_seller_db = AsyncReservationsSellerDB(reservation_seller)
+    status = await reservation_seller_db.get_reservation_seller()
     if status == 500:
         return 500
-    buyer_ids = [reservation.buyer_id for reservation in reservation_seller_db.reservations_seller.reservations]
-
-    not_deleted_ids = []
-    for buyer_id in buyer_ids:
-        reservation_buyer = ReservationsBuyer(buyer_id=buyer_id)
-        reservation_buyer_db = ReservationsBuyerDB(reservation_buyer)
-        status = reservation_buyer_db.delete_reservation_by_property_on_sale_id(property_on_sale_id)
-        if status == 200:
-            buyer_ids.remove(buyer_id)
-        else: 
-            not_deleted_ids.append(buyer_id)   
+    buyer_ids = [reservation.buyer_id for reservation in reservation_seller_db.reservations_seller.reservations or []]
+
+    statuses = await async_propagate_property_change(buyer_ids, property_on_sale_id)
+    not_deleted_ids = failed_buyer_ids(statuses)
 
     if not_deleted_ids:
-        run_date = datetime.now() + timedelta(minutes=5)
-        scheduler.add_job(
-            check_and_delete_when_low_load,
-            'date',
-            run_date=run_date,
-            args=[not_deleted_ids, property_on_sale_id]
-        )
+        reservation_job = ReservationJob(property_on_sale_id=property_on_sale_id, buyer_ids=not_deleted_ids, delete=True)
+        if await AsyncReservationJobsDB(reservation_job).enqueue() == 500:
+            return 500
     return 200
 
 @seller_router.post("/sell_property_on_sale", response_model=ResponseModels.SuccessModel, responses=ResponseModels.SellPropertyOnSaleResponses)
-def sell_property_on_sale(property_to_sell_id: str, access_token: str = Depends(JWTHandler())):
+async def sell_property_on_sale(property_to_sell_id: str, access_token: str = Depends(JWTHandler())):
     """
-    Sell a property on sale eliminating it from the property_on_sale collection, inserting it in the sold_properties list embedded in the seller collection and deleting it from Neo4j. The reservations are handled when the load is low.
+    Sell a property on sale eliminating it from the property_on_sale collection, inserting it in the SoldProperty collection and in the recent sold_properties embedded in the seller collection and deleting it from Neo4j. The reservations are handled when the load is low.
 
     Args:
         property_to_sell_id (str): The ID of the property to sell.
@@ -554,8 +457,8 @@ def sell_property_on_sale(property_to_sell_id: str, access_token: str = Depends(
     
     # Check if property belongs to the seller
     seller= Seller(seller_id=seller_id)
-    db_seller = SellerDB(seller)
-    response=db_seller.check_property_on_sale(property_to_sell_id)
+    db_seller = AsyncSellerDB(seller)
+    response=await db_seller.check_property_on_sale(property_to_sell_id)
     if response == 404:
         raise HTTPException(status_code=404, detail="Property not found or seller not found.")
     if response == 500:
@@ -563,8 +466,8 @@ def sell_property_on_sale(property_to_sell_id: str, access_token: str = Depends(
 
     # Retrieve info about the property to sell
     property_to_sell=PropertyOnSale(property_on_sale_id=property_to_sell_id)
-    db_property_on_sale=PropertyOnSaleDB(property_to_sell)
-    result=db_property_on_sale.delete_and_return_property(property_to_sell_id)
+    db_property_on_sale=AsyncPropertyOnSaleDB(property_to_sell)
+    result=await db_property_on_sale.delete_and_return_property(property_to_sell_id)
     if result == 404:
         raise HTTPException(status_code=404, detail="Property not found.")
     if result == 500:
@@ -572,34 +475,33 @@ def sell_property_on_sale(property_to_sell_id: str, access_token: str = Depends(
     
     # Move the property from properties_on_sale to sold_properties
     embedded_sold_property = SoldProperty(sell_date=datetime.now(),sold_property_id=property_to_sell.property_on_sale_id,**db_property_on_sale.property_on_sale.model_dump(include={"city", "neighbourhood", "price", "thumbnail", "type", "area", "registration_date"}))
-    result = db_seller.sell_property(embedded_sold_property)
+    result = await db_seller.sell_property(embedded_sold_property)
     if result != 200:
         if result == 500:
             detail="Failed to sell property."
         if result == 404:
             detail="Seller not found or property not found in the seller collection."
         # Rollback
-        result=db_property_on_sale.insert_property()
+        result=await db_property_on_sale.insert_property()
         raise HTTPException(status_code=500, detail=detail)
 
+    # Remove the sold property from the landing page pool
+    random_property_pool.discard(property_to_sell_id)
+    random_property_pool.schedule_refresh()
+
     # Delete in Neo4j
     property_on_sale_neo4j = PropertyOnSaleNeo4J(property_on_sale_id=property_to_sell_id)
-    property_on_sale_neo4j_db = PropertyOnSaleNeo4JDB(property_on_sale_neo4j)
-    property_on_sale_neo4j_db.delete_property_on_sale_neo4j()   
+    property_on_sale_neo4j_db = AsyncPropertyOnSaleNeo4JDB(property_on_sale_neo4j)
+    await property_on_sale_neo4j_db.delete_property_on_sale_neo4j()   
 
 
 
     # Call the function that handles the reservations
-    status = handleReservations(property_to_sell_id)
+    status = await handleReservationsAsync(property_to_sell_id)
     if status == 500:
-        # Schedule the deletion of the reservations when the load is low
-        run_date = datetime.now() + timedelta(minutes=5)
-        scheduler.add_job(
-            handleReservations,
-            'date',
-            run_date=run_date,
-            args=[property_to_sell_id]
-        )
+        # Delete the reservations in background, the buyers are read again from the seller reservations
+        reservation_job = ReservationJob(property_on_sale_id=property_to_sell_id, delete=True, all_buyers=True)
+        await AsyncReservationJobsDB(reservation_job).enqueue()
         raise HTTPException(status_code=500, detail="Failed to handle reservations")
     return JSONResponse(status_code=200, content={"detail": "Property sold successfully."})
     
@@ -609,7 +511,7 @@ def sell_property_on_sale(property_to_sell_id: str, access_token: str = Depends(
     response_model=List[ResponseModels.OpenHouseOccurrence],
     responses=ResponseModels.GetOpenHouseEventsResponses
 )
-def get_open_house_events(access_token: str = Depends(JWTHandler())):
+async def get_open_house_events(access_token: str = Depends(JWTHandler())):
     """
     Get all open house events for today associated with the seller, for every open house event is retrieved the address, the time and the city.
     
@@ -632,8 +534,8 @@ def get_open_house_events(access_token: str = Depends(JWTHandler())):
         raise HTTPException(status_code=401, detail="Invalid access token")
     
     temp_seller = Seller(seller_id=seller_id)
-    db_seller = SellerDB(temp_seller)
-    result = db_seller.get_open_house_today()
+    db_seller = AsyncSellerDB(temp_seller)
+    result = await db_seller.get_open_house_today()
     if result == 404:
         raise HTTPException(status_code=404, detail="No open house events found for today.")
     if result == 500:
@@ -643,7 +545,7 @@ def get_open_house_events(access_token: str = Depends(JWTHandler())):
 
 
 @seller_router.delete("/property_on_sale", response_model=ResponseModels.SuccessModel, responses=ResponseModels.DeletePropertyOnSaleResponses)
-def delete_property_on_sale(property_on_sale_id: str, access_token: str = Depends(JWTHandler())):
+async def delete_property_on_sale(property_on_sale_id: str, access_token: str = Depends(JWTHandler())):
     """
     Delete a property on sale.
     
@@ -674,43 +576,42 @@ def delete_property_on_sale(property_on_sale_id: str, access_token: str = Depend
     
     # Delete the property from the seller collection
     seller= Seller(seller_id=seller_id)
-    db_seller= SellerDB(seller)
-    response=db_seller.delete_embedded(property_on_sale_id)
+    db_seller= AsyncSellerDB(seller)
+    response=await db_seller.delete_embedded(property_on_sale_id)
     if response == 404:
         raise HTTPException(status_code=response, detail="Property not found or seller not found.")
     if response == 500:
         raise HTTPException(status_code=response, detail="Failed to delete property.")
     
     # Delete the property from the property_on_sale collection
-    db_property_on_sale = PropertyOnSaleDB(PropertyOnSale())
-    response = db_property_on_sale.delete_property_on_sale_by_id(property_on_sale_id)
+    db_property_on_sale = AsyncPropertyOnSaleDB(PropertyOnSale())
+    response = await db_property_on_sale.delete_property_on_sale_by_id(property_on_sale_id)
     if response == 404:
         # Rollback not possible
         raise HTTPException(status_code=response, detail="Property not found.")
     if response == 500:
         # Rollback
-        response=db_property_on_sale.get_property_on_sale_by_id(property_on_sale_id)
+        response=await db_property_on_sale.get_property_on_sale_by_id(property_on_sale_id)
         if response == 200:
             embedded_property_on_sale = SellerPropertyOnSale(db_property_on_sale.property_on_sale)
-            response=db_seller.insert_property_on_sale(embedded_property_on_sale)
+            response=await db_seller.insert_property_on_sale(embedded_property_on_sale)
         raise HTTPException(status_code=response, detail="Failed to delete property.")
+
+    # Remove the deleted property from the landing page pool
+    random_property_pool.discard(property_on_sale_id)
+    random_property_pool.schedule_refresh()
     
     # Delete in Neo4j
     property_on_sale_neo4j = PropertyOnSaleNeo4J(property_on_sale_id=property_on_sale_id)
-    property_on_sale_neo4j_db = PropertyOnSaleNeo4JDB(property_on_sale_neo4j)
-    property_on_sale_neo4j_db.delete_property_on_sale_neo4j()  
+    property_on_sale_neo4j_db = AsyncPropertyOnSaleNeo4JDB(property_on_sale_neo4j)
+    await property_on_sale_neo4j_db.delete_property_on_sale_neo4j()  
 
     # Call the function that handles the reservations
-    status = handleReservations(property_on_sale_id)
+    status = await handleReservationsAsync(property_on_sale_id)
     if status == 500:
-        # Schedule the deletion of the reservations when the load is low
-        run_date = datetime.now() + timedelta(minutes=5)
-        scheduler.add_job(
-            handleReservations,
-            'date',
-            run_date=run_date,
-            args=[property_on_sale_id]
-        )
+        # Delete the reservations in background, the buyers are read again from the seller reservations
+        reservation_job = ReservationJob(property_on_sale_id=property_on_sale_id, delete=True, all_buyers=True)
+        await AsyncReservationJobsDB(reservation_job).enqueue()
         raise HTTPException(status_code=500, detail="Failed to handle reservations")
     return JSONResponse(status_code=200, content={"detail": "Property deleted successfully."})
 
@@ -721,7 +622,7 @@ def delete_property_on_sale(property_on_sale_id: str, access_token: str = Depend
     response_model=ReservationsSeller,
     responses=ResponseModels.GetReservationsSellerResponseModelResponses
 )
-def get_reservations_seller(property_on_sale_id: str, access_token: str = Depends(JWTHandler())):
+async def get_reservations_seller(property_on_sale_id: str, access_token: str = Depends(JWTHandler())):
     """
     Get the reservations list for a specific property on sale, on the list there are the contact details of the buyers.
 
@@ -748,8 +649,8 @@ def get_reservations_seller(property_on_sale_id: str, access_token: str = Depend
     if not property_on_sale_id:
         raise HTTPException(status_code=400, detail="Property on sale ID is required.")
     reservations_seller = ReservationsSeller(property_on_sale_id=property_on_sale_id)
-    reservations_seller_db = ReservationsSellerDB(reservations_seller)
-    status = reservations_seller_db.get_reservation_seller()
+    reservations_seller_db = AsyncReservationsSellerDB(reservations_seller)
+    status = await reservations_seller_db.get_reservation_seller(LISTING_READ_PREFERENCE)
     if status == 404:
         raise HTTPException(status_code=404, detail="No reservations found.")
     if status == 500:
@@ -759,7 +660,7 @@ def get_reservations_seller(property_on_sale_id: str, access_token: str = Depend
 # Analytics routes
 
 @seller_router.post("/analytics/analytics_2", response_model=ResponseModels.Analytics2ResponseModel, responses=ResponseModels.Analytics2Responses)
-def analytics_2(input : Analytics2Input, access_token: str = Depends(JWTHandler())):
+async def analytics_2(input : Analytics2Input, access_token: str = Depends(JWTHandler())):
     """
     Given a city, and a range of dates, return the number of properties sold in that city in that range of dates and the total amount of money earned from those sales break down by neighbourhood.
 
@@ -781,8 +682,8 @@ def analytics_2(input : Analytics2Input, access_token: str = Depends(JWTHandler(
     if seller_id is None or user_type != "seller":
         raise HTTPException(status_code=401, detail="Invalid access token")
     
-    seller_db = SellerDB(Seller(seller_id=seller_id))
-    status = seller_db.get_sold_properties_statistics(input)
+    seller_db = AsyncSellerDB(Seller(seller_id=seller_id))
+    status = await seller_db.get_sold_properties_statistics(input)
     aggregation_result = seller_db.analytics_2_result
     if status == 500:
         raise HTTPException(status_code=500, detail="Error in fetching data.")
@@ -793,7 +694,7 @@ def analytics_2(input : Analytics2Input, access_token: str = Depends(JWTHandler(
 
 
 @seller_router.post("/analytics/analytics_3", response_model=ResponseModels.Analytics3ResponseModel, responses=ResponseModels.Analytics3Responses)
-def analytics_3(input : Analytics3Input, access_token: str = Depends(JWTHandler())):
+async def analytics_3(input : Analytics3Input, access_token: str = Depends(JWTHandler())):
     """
     Given a city and a range of dates, return the average time to sell a property in days in that city in that range of dates break down by neighbourhood.
 
@@ -816,9 +717,9 @@ def analytics_3(input : Analytics3Input, access_token: str = Depends(JWTHandler(
         raise HTTPException(status_code=401, detail="Invalid access token")
 
     
-    seller_db = SellerDB(Seller(seller_id=seller_id))
+    seller_db = AsyncSellerDB(Seller(seller_id=seller_id))
     
-    status = seller_db.get_avg_time_to_sell(input)
+    status = await seller_db.get_avg_time_to_sell(input)
     aggregation_result = seller_db.analytics_3_result
     if status == 500:
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional
+import psutil
+from setup.mongo_setup.mongo_setup import get_mongo_client
+from setup.redis_setup.redis_setup import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Period of the background sampling of CPU and database latency, and of the event loop probe
+SAMPLE_INTERVAL_SECONDS = 2.0
+# Weight of the newest sample in the rolling averages
+SMOOTHING = 0.3
+# The signal is considered lost after this many missed samples, and the load is not low
+STALE_SAMPLES = 5
+
+# Value of every component at which the load stops being low
+LOAD_LIMITS: Dict[str, float] = {
+    # Percentage of all the cores, system wide or of this process
+    "cpu_percent": 30.0,
+    # Delay of the event loop in running a ready callback
+    "event_loop_lag_ms": 50.0,
+    # Requests being served by this process
+    "in_flight_requests": 50.0,
+    # Round trip of a PING to the Redis master and to MongoDB
+    "redis_latency_ms": 20.0,
+    "mongo_latency_ms": 50.0,
+}
+
+
+class LoadMonitor:
+    """
+    Rolling load signal of the process and of the databases it depends on, sampled in background
+    so that the deferred jobs can check the load without waiting.
+    Each component is a moving average, the load level is the highest ratio between a component and its limit.
+    """
+
+    def __init__(self, sample_interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.sample_interval = sample_interval
+        self.averages: Dict[str, float] = {name: 0.0 for name in LOAD_LIMITS}
+        self.in_flight_requests = 0
+        self.last_sample: Optional[float] = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.process = psutil.Process()
+
+    def record(self, name: str, value: float) -> None:
+        """
+        Add a sample to the moving average of a component.
+
+        Args:
+            name (str): The component, a key of LOAD_LIMITS.
+            value (float): The sample.
+        """
+        with self.lock:
+            self.averages[name] = SMOOTHING * value + (1 - SMOOTHING) * self.averages[name]
+
+    def request_started(self) -> None:
+        """
+        Count a request entering the process, called by the middleware of the app.
+        """
+        with self.lock:
+            self.in_flight_requests += 1
+
+    def request_finished(self) -> None:
+        """
+        Count a request leaving the process, called by the middleware of the app.
+        """
+        with self.lock:
+            self.in_flight_requests -= 1
+
+    def measure_latency_ms(self, ping) -> float:
+        """
+        Args:
+            ping (callable): The round trip to measure.
+
+        Returns:
+            float: The duration of the round trip.
+        """
+        start = time.perf_counter()
+        ping()
+        return (time.perf_counter() - start) * 1000
+
+    def sample(self) -> None:
+        """
+        Take one sample of the CPU load, of the requests in flight and of the database latencies.
+        """
+        # Both measures are non-blocking, they cover the time elapsed since the previous call
+        system_cpu = psutil.cpu_percent(interval=None)
+        process_cpu = self.process.cpu_percent(interval=None) / (psutil.cpu_count() or 1)
+        self.record("cpu_percent", max(system_cpu, process_cpu))
+        self.record("in_flight_requests", self.in_flight_requests)
+        for name, ping in (
+            ("redis_latency_ms", lambda: get_redis_client().ping()),
+            ("mongo_latency_ms", lambda: get_mongo_client().admin.command("ping")),
+        ):
+            try:
+                self.record(name, self.measure_latency_ms(ping))
+            except Exception as e:
+                # An unreachable database counts as overloaded
+                logger.warning("Load sample of %s failed: %s", name, e)
+                self.record(name, 2 * LOAD_LIMITS[name])
+        self.last_sample = time.monotonic()
+
+    def run(self) -> None:
+        """
+        Sample the load until stop is called.
+        """
+        while not self.stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error("Error sampling the load: %s", e)
+            self.stop_event.wait(self.sample_interval)
+
+    def start(self) -> None:
+        """
+        Start the background sampling, if it is not running yet.
+        """
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name="load-monitor", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background sampling.
+        """
+        self.stop_event.set()
+
+    async def probe_event_loop(self) -> None:
+        """
+        Measure the lag of the running event loop, as the delay of a sleep beyond its duration.
+        Runs until cancelled, as a task of the loop to measure.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.sample_interval)
+            lag = loop.time() - start - self.sample_interval
+            self.record("event_loop_lag_ms", max(lag, 0.0) * 1000)
+
+    def load_levels(self) -> Dict[str, float]:
+        """
+        Returns:
+            dict: The ratio between every component and its limit.
+        """
+        with self.lock:
+            return {name: self.averages[name] / limit for name, limit in LOAD_LIMITS.items()}
+
+    def is_low(self) -> bool:
+        """
+        Returns:
+            bool: True if every component is below its limit and the signal is up to date.
+        """
+        if self.last_sample is None or time.monotonic() - self.last_sample > STALE_SAMPLES * self.sample_interval:
+            return False
+        return max(self.load_levels().values()) < 1.0
+
+
+load_monitor = LoadMonitor()
@@ -0,0 +1,94 @@
+import logging
+from typing import Dict, List, Any
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from setup.mongo_setup.mongo_setup import get_default_mongo_db
+
+logger = logging.getLogger(__name__)
+
+# Declarative index registry, one list of IndexModel per collection.
+# The compound indexes follow the equality -> sort -> range order of the real query shapes.
+MONGO_INDEXES: Dict[str, List[IndexModel]] = {
+    "PropertyOnSale": [
+        # filtered_search on city/neighbourhood/type with a price range
+        IndexModel([("city", ASCENDING), ("neighbourhood", ASCENDING), ("type", ASCENDING), ("price", ASCENDING)], name="city_neighbourhood_type_price"),
+        # filtered_search on city/type with a price range
+        IndexModel([("city", ASCENDING), ("type", ASCENDING), ("price", ASCENDING)], name="city_type_price"),
+        # filtered_search on city with a price range only
+        IndexModel([("city", ASCENDING), ("price", ASCENDING)], name="city_price"),
+        # Cursor search sort, with and without the city filter
+        IndexModel([("city", ASCENDING), ("registration_date", DESCENDING), ("_id", DESCENDING)], name="city_registration_date_id"),
+        IndexModel([("registration_date", DESCENDING), ("_id", DESCENDING)], name="registration_date_id"),
+        # Address search on the normalized tokens, with and without the city filter
+        IndexModel([("city", ASCENDING), ("address_tokens", ASCENDING)], name="city_address_tokens"),
+        IndexModel([("address_tokens", ASCENDING)], name="address_tokens"),
+    ],
+    "PropertyOnSaleRollup": [
+        # Upserts of the rollup writes, analytics_1, analytics_4 and analytics_5 by city or city/neighbourhood
+        IndexModel([("city", ASCENDING), ("neighbourhood", ASCENDING), ("type", ASCENDING)], name="city_neighbourhood_type_unique", unique=True),
+    ],
+    "SoldProperty": [
+        # analytics_2 and analytics_3 on a sell_date range of a seller in a city, and the city filter of sold_properties
+        IndexModel([("seller_id", ASCENDING), ("city", ASCENDING), ("sell_date", ASCENDING)], name="seller_id_city_sell_date"),
+        # sold_properties of a seller without the city filter, most recent first
+        IndexModel([("seller_id", ASCENDING), ("sell_date", DESCENDING)], name="seller_id_sell_date"),
+    ],
+    "Seller": [
+        # Login and registration lookups
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "Buyer": [
+        # Login and registration lookups
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+}
+
+
+def ensure_mongo_indexes() -> Dict[str, Any]:
+    """
+    Create every index of the registry that does not exist yet. Creating an index that
+    already exists with the same specification is a no-op, so the function is idempotent.
+
+    Returns:
+        dict: For each collection, the names of the indexes ensured and the errors encountered.
+    """
+    db = get_default_mongo_db()
+    report = {}
+    for collection_name, indexes in MONGO_INDEXES.items():
+        collection_report = {"ensured": [], "errors": {}}
+        for index in indexes:
+            name = index.document["name"]
+            try:
+                db[collection_name].create_indexes([index])
+                collection_report["ensured"].append(name)
+            except OperationFailure as e:
+                # e.g. duplicated emails for a unique index or an index with the same name and different options
+                logger.error("Error creating index %s on %s: %s", name, collection_name, e)
+                collection_report["errors"][name] = str(e)
+        report[collection_name] = collection_report
+    return report
+
+
+def get_mongo_index_report() -> Dict[str, Any]:
+    """
+    Compare the indexes on the database with the registry and collect their usage statistics.
+
+    Returns:
+        dict: For each collection, the indexes that are missing from the database, the ones
+              not declared in the registry and the ones never used since the server started.
+    """
+    db = get_default_mongo_db()
+    report = {}
+    for collection_name, indexes in MONGO_INDEXES.items():
+        declared = {index.document["name"] for index in indexes}
+        existing = set(db[collection_name].index_information().keys())
+        usage = {
+            stat["name"]: {"ops": stat["accesses"]["ops"], "since": stat["accesses"]["since"].isoformat()}
+            for stat in db[collection_name].aggregate([{"$indexStats": {}}])
+        }
+        report[collection_name] = {
+            "missing": sorted(declared - existing),
+            "unmanaged": sorted(existing - declared - {"_id_"}),
+            "unused": {name: stats for name, stats in usage.items() if stats["ops"] == 0 and name != "_id_"},
+        }
+    return report
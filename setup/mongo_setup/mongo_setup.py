@@ -1,5 +1,6 @@
 from os import environ
 from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from bson.objectid import ObjectId
 from typing import Dict, List, Union, Any
 from config.config import settings
@@ -19,6 +20,8 @@ if MONGO_URL is None:
     raise Exception('MONGO_URL environment variable not set')
 
 client = MongoClient(MONGO_URL)
+# Non-blocking client used by the async request path
+async_client = AsyncIOMotorClient(MONGO_URL)
 
 def get_mongo_client():
     """
@@ -34,6 +37,13 @@ def get_default_mongo_db():
     """
     return client[DEFAULT_MONGO_DB]
 
+def get_default_async_mongo_db():
+    """
+    Returns:
+        AsyncIOMotorDatabase: The default MongoDB database, accessed through the Motor async client.
+    """
+    return async_client[DEFAULT_MONGO_DB]
+
 def convert_object_id(result: Union[Dict[str, Any], List[Dict[str, Any]]]):
     """
     Converts the _id field(s) of a mongo result to string(s).
@@ -0,0 +1,55 @@
+import logging
+from typing import Dict, Any
+from setup.neo4j_setup.neo4j_setup import get_neo4j_driver
+
+logger = logging.getLogger(__name__)
+
+# Declarative schema registry, one statement per index or constraint.
+# IF NOT EXISTS makes every statement idempotent.
+NEO4J_SCHEMA: Dict[str, str] = {
+    # MERGE and MATCH by id on every write and read of a property, the constraint also backs an index
+    "property_on_sale_id_unique": (
+        "CREATE CONSTRAINT property_on_sale_id_unique IF NOT EXISTS "
+        "FOR (p:PropertyOnSale) REQUIRE p.property_on_sale_id IS UNIQUE"
+    ),
+    # point.withinBBox predicates of the NEAR and NEAR_PROPERTY linking
+    "property_on_sale_coordinates": (
+        "CREATE POINT INDEX property_on_sale_coordinates IF NOT EXISTS "
+        "FOR (p:PropertyOnSale) ON (p.coordinates)"
+    ),
+    "poi_coordinates": (
+        "CREATE POINT INDEX poi_coordinates IF NOT EXISTS "
+        "FOR (poi:POI) ON (poi.coordinates)"
+    ),
+    # MERGE of the neighbourhood on property creation and update
+    "neighbourhood_name": (
+        "CREATE INDEX neighbourhood_name IF NOT EXISTS "
+        "FOR (n:Neighbourhood) ON (n.name)"
+    ),
+    # MATCH of the city by name in the bulk loading of the neighbourhoods and in the City reads and updates
+    "city_name": (
+        "CREATE INDEX city_name IF NOT EXISTS "
+        "FOR (c:City) ON (c.name)"
+    ),
+}
+
+
+def ensure_neo4j_indexes() -> Dict[str, Any]:
+    """
+    Create every index and constraint of the registry that does not exist yet.
+
+    Returns:
+        dict: The names of the indexes and constraints ensured and the errors encountered.
+    """
+    neo4j_driver = get_neo4j_driver()
+    report = {"ensured": [], "errors": {}}
+    with neo4j_driver.session() as session:
+        for name, statement in NEO4J_SCHEMA.items():
+            try:
+                session.run(statement).consume()
+                report["ensured"].append(name)
+            except Exception as e:
+                # e.g. duplicated property_on_sale_id for the uniqueness constraint
+                logger.error("Error creating %s on Neo4j: %s", name, e)
+                report["errors"][name] = str(e)
+    return report
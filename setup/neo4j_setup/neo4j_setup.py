@@ -1,6 +1,6 @@
 from os import environ
 from typing import Dict, Any
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from config.config import settings
 
 NEO4J_URI = environ.get('NEO4J_URL')
@@ -20,6 +20,8 @@ if NEO4J_URI is None or NEO4J_USER is None or NEO4J_PASSWORD is None:
     raise Exception('Neo4j environment variables not set')
 
 neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+# Non-blocking driver used by the async request path
+async_neo4j_driver = AsyncGraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
 
 def get_neo4j_driver():
     """
@@ -28,6 +30,13 @@ def get_neo4j_driver():
     """
     return neo4j_driver
 
+def get_async_neo4j_driver():
+    """
+    Returns:
+        neo4j.AsyncDriver: The async Neo4j driver instance.
+    """
+    return async_neo4j_driver
+
 def convert_neo4j_result(result: Dict[str, Any]):
     """
     Converts the Neo4j result into a list of dictionaries or returns it as is if unsupported.
@@ -1,5 +1,8 @@
 from os import environ
+from time import monotonic
+from typing import Dict, Iterator
 from redis.sentinel import Sentinel
+from redis.asyncio.sentinel import Sentinel as AsyncSentinel
 from redis import exceptions
 from config.config import settings
 
@@ -25,9 +28,36 @@ REDIS_DB = environ.get('REDIS_DB')
 if REDIS_DB is None or REDIS_DB.strip() == '':
     REDIS_DB = settings.redis_db
 
+# Read preferences of the reservation reads. Replica reads may lag the master by the replication delay,
+# when Sentinel knows no replica they are served by the master.
+READ_FROM_MASTER = "master"
+READ_FROM_REPLICA = "replica"
+
+# Read preference of the listing endpoints, which tolerate stale data
+LISTING_READ_PREFERENCE = environ.get('REDIS_LISTING_READ_PREFERENCE')
+if LISTING_READ_PREFERENCE is None or LISTING_READ_PREFERENCE.strip() == '':
+    LISTING_READ_PREFERENCE = settings.redis_listing_read_preference
+
+# Seconds after a write of this process during which the reads of the written key go to the master,
+# so that a client always reads its own writes despite the replication delay. The writes are recorded
+# in the memory of the process, so that deciding where to read never costs a round trip to the master.
+READ_YOUR_WRITES_SECONDS = 5.0
+# Size of the registry of the recent writes beyond which the writes out of the window are forgotten
+RECENT_WRITES_MAX_SIZE = 10000
+
 sentinel = Sentinel(sentinel_hosts, socket_timeout=5.0)
 
 redis_client = sentinel.master_for(MASTER_NAME, socket_timeout=1.0, db=int(REDIS_DB))
+redis_replica_client = sentinel.slave_for(MASTER_NAME, socket_timeout=1.0, db=int(REDIS_DB))
+
+# Non-blocking client used by the async request path
+async_sentinel = AsyncSentinel(sentinel_hosts, socket_timeout=5.0)
+
+async_redis_client = async_sentinel.master_for(MASTER_NAME, socket_timeout=1.0, db=int(REDIS_DB))
+async_redis_replica_client = async_sentinel.slave_for(MASTER_NAME, socket_timeout=1.0, db=int(REDIS_DB))
+
+# Last write time of the keys written by this process
+recent_writes: Dict[str, float] = {}
 
 def get_redis_client():
     """
@@ -36,6 +66,83 @@ def get_redis_client():
     """
     return redis_client
 
+def get_async_redis_client():
+    """
+    Returns:
+        redis.asyncio.Redis: The async Redis client instance connected to the current master.
+    """
+    return async_redis_client
+
+def mark_redis_write(*keys: str) -> None:
+    """
+    Records a successful write of the keys, so that the reads of the next READ_YOUR_WRITES_SECONDS go to the master.
+
+    Args:
+        *keys (str): The keys written, all the keys of a batch are recorded at once.
+    """
+    now = monotonic()
+    for key in keys:
+        recent_writes[key] = now
+    # Forget the writes out of the window once in a while, so that the registry stays small
+    if len(recent_writes) > RECENT_WRITES_MAX_SIZE:
+        for written_key, written_at in list(recent_writes.items()):
+            if now - written_at > READ_YOUR_WRITES_SECONDS:
+                recent_writes.pop(written_key, None)
+
+def read_from_replica(key: str, read_preference: str) -> bool:
+    """
+    Args:
+        key (str): The key to read.
+        read_preference (str): READ_FROM_MASTER or READ_FROM_REPLICA.
+
+    Returns:
+        bool: True if the read can be served by a replica, False if this process wrote the key recently.
+    """
+    if read_preference != READ_FROM_REPLICA:
+        return False
+    written_at = recent_writes.get(key)
+    return written_at is None or monotonic() - written_at > READ_YOUR_WRITES_SECONDS
+
+def get_redis_read_client(key: str, read_preference: str = READ_FROM_MASTER):
+    """
+    Args:
+        key (str): The key to read.
+        read_preference (str): READ_FROM_MASTER or READ_FROM_REPLICA (default is READ_FROM_MASTER).
+
+    Returns:
+        redis.Redis: The Redis client instance to read the key with.
+    """
+    return redis_replica_client if read_from_replica(key, read_preference) else redis_client
+
+def get_async_redis_read_client(key: str, read_preference: str = READ_FROM_MASTER):
+    """
+    Args:
+        key (str): The key to read.
+        read_preference (str): READ_FROM_MASTER or READ_FROM_REPLICA (default is READ_FROM_MASTER).
+
+    Returns:
+        redis.asyncio.Redis: The async Redis client instance to read the key with.
+    """
+    return async_redis_replica_client if read_from_replica(key, read_preference) else async_redis_client
+
+# Keys asked to the server per SCAN call and keys removed per UNLINK round trip
+SCAN_COUNT = 1000
+UNLINK_BATCH_SIZE = 500
+
+def scan_redis_keys(pattern: str = '*', count: int = SCAN_COUNT) -> Iterator:
+    """
+    Iterates over the Redis keys matching the specified pattern with SCAN, so that the master
+    is never blocked for a whole keyspace walk like with KEYS. A key may be returned more than once.
+
+    Args:
+        pattern (str): The pattern to match keys (default is '*').
+        count (int): The number of keys examined by each SCAN call (default is SCAN_COUNT).
+
+    Returns:
+        Iterator: The keys matching the pattern.
+    """
+    return redis_client.scan_iter(match=pattern, count=count)
+
 def get_redis_keys(pattern: str = '*'):
     """
     Retrieves all Redis keys matching the specified pattern.
@@ -46,7 +153,30 @@ def get_redis_keys(pattern: str = '*'):
     Returns:
         list: A list of keys matching the pattern.
     """
-    return redis_client.keys(pattern)
+    return list(dict.fromkeys(scan_redis_keys(pattern)))
+
+def unlink_redis_keys(pattern: str, batch_size: int = UNLINK_BATCH_SIZE) -> int:
+    """
+    Deletes the Redis keys matching the specified pattern while scanning them. The keys are removed
+    with UNLINK, which frees the memory in background, in pipelines of batch_size keys.
+
+    Args:
+        pattern (str): The pattern to match keys.
+        batch_size (int): The number of keys per UNLINK round trip (default is UNLINK_BATCH_SIZE).
+
+    Returns:
+        int: The number of keys deleted.
+    """
+    deleted = 0
+    batch = []
+    for key in scan_redis_keys(pattern):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            deleted += redis_client.unlink(*batch)
+            batch = []
+    if batch:
+        deleted += redis_client.unlink(*batch)
+    return deleted
 
 RedisError = exceptions.RedisError
 WatchError = exceptions.WatchError
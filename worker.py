@@ -0,0 +1,18 @@
+import logging
+import signal
+from dotenv import load_dotenv
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    load_dotenv()
+    from entities.Redis.ReservationJobs.reservation_jobs_worker import reservation_jobs_worker
+    # Stop after the job being run on SIGTERM, the jobs left are run by the other workers or after the restart
+    signal.signal(signal.SIGTERM, lambda signum, frame: reservation_jobs_worker.stop_event.set())
+    logger.info("Starting the reservation jobs worker.")
+    try:
+        reservation_jobs_worker.run()
+    except KeyboardInterrupt:
+        logger.info("Reservation jobs worker interrupted.")